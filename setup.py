@@ -70,6 +70,7 @@ setup(
     extras_require={
         "gpu": ["gputil>=1.4.0"],
         "web": ["flask>=2.0.0", "dash>=2.0.0"],
+        "parquet": ["pyarrow>=7.0.0"],
         "full": [
             "gputil>=1.4.0",
             "flask>=2.0.0",
@@ -8,6 +8,8 @@ __license__ = "MIT"
 
 from .monitor import SystemMonitor, MonitorLevel, SystemMetrics
 from .exporters.console_exporter import ConsoleExporter
+from .exporters.csv_exporter import CSVExporter
+from .exporters.json_exporter import JSONExporter
 
 # 导出主要类
 __all__ = [
@@ -15,13 +17,32 @@ __all__ = [
     "MonitorLevel",
     "SystemMetrics",
     "ConsoleExporter",
+    "CSVExporter",
+    "JSONExporter",
 ]
 
-# 尝试导入可选模块
+# 尝试导入可选模块，每个模块单独导入，一个失败不影响其他模块
 try:
-    from .exporters.csv_exporter import CSVExporter
-    from .exporters.json_exporter import JSONExporter
-    __all__.extend(["CSVExporter", "JSONExporter"])
+    from .exporters.archive_exporter import ArchiveExporter
+    __all__.append("ArchiveExporter")
+except ImportError:
+    pass
+
+try:
+    from .exporters.prometheus_exporter import PrometheusExporter
+    __all__.append("PrometheusExporter")
+except ImportError:
+    pass
+
+try:
+    from .exporters.udp_exporter import UDPExporter
+    __all__.append("UDPExporter")
+except ImportError:
+    pass
+
+try:
+    from .exporters.parquet_exporter import ParquetExporter
+    __all__.append("ParquetExporter")
 except ImportError:
     pass
 
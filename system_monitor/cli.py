@@ -4,13 +4,25 @@
 """
 
 import argparse
+import os
 import sys
 import json
 import time
 from datetime import datetime
 from typing import Optional
 
-from . import SystemMonitor, ConsoleExporter, CSVExporter, JSONExporter
+from tabulate import tabulate
+
+from . import SystemMonitor, MonitorLevel, ConsoleExporter, CSVExporter, JSONExporter, ArchiveExporter
+from .remote import AgentExporter, run_aggregator
+from .scheduler import DeadlineScheduler
+from .collectors.disk_collector import DEFAULT_EXCLUDED_FSTYPES
+from .exporters.json_exporter import NDJSON_SUFFIXES
+from .exporters.prometheus_exporter import PrometheusExporter
+from .exporters.udp_exporter import PROTOCOLS, UDPExporter
+from .storage import ColumnarStore, RollupPipeline, fleet_query, is_columnar_store, iter_records, summarize
+from .storage.fleet import FLEET_STATS
+from .storage.reader import iter_json_items, parse_time
 
 
 def parse_args():
@@ -24,6 +36,17 @@ def parse_args():
   sysmon monitor                 # 实时监控
   sysmon monitor --output data.csv --interval 2  # 保存到CSV文件
   sysmon monitor --format json --quiet          # JSON格式静默输出
+  sysmon monitor --output data.ndjson --rotate-size 100 --compress  # 追加写入并按大小轮转
+  sysmon monitor --output data.smc --quiet      # 写入列式存储目录
+  sysmon monitor --output data.smz --quiet      # 写入压缩归档文件
+  sysmon stats --file data.smc --summary        # 统计列式存储中的数据
+  sysmon monitor --udp 127.0.0.1:8125 --quiet  # 以StatsD格式推送到UDP端口
+  sysmon top --interval 0.1 --refresh 0.5       # 全屏界面，10Hz采样、每0.5秒刷新
+  sysmon aggregate --output-dir /var/lib/sysmon # 接收各主机推送的数据
+  sysmon agent --server collector:9120 --spool /var/spool/sysmon  # 推送本机数据
+  sysmon serve --port 9110                      # 以Prometheus格式发布监控数据
+  sysmon stats --file data.csv --summary --from 2024-01-01T00:00:00  # 统计指定时间之后的数据
+  sysmon stats --file data.ndjson --ndjson      # 每行输出一条展开的记录
         """
     )
 
@@ -49,7 +72,47 @@ def parse_args():
     monitor_parser.add_argument(
         "--output", "-o",
         type=str,
-        help="输出文件路径（支持.csv和.json格式）"
+        help="输出文件路径（支持.csv、.json、.ndjson、.jsonl、.smz压缩归档、.parquet格式及.smc列式存储目录）"
+    )
+    monitor_parser.add_argument(
+        "--rollup",
+        type=str,
+        help="将数据汇总为1秒/1分钟/1小时多级统计并保存到该JSON文件（已存在则继续累计）"
+    )
+    monitor_parser.add_argument(
+        "--udp",
+        type=str,
+        metavar="HOST:PORT",
+        help="同时通过UDP推送数据"
+    )
+    monitor_parser.add_argument(
+        "--udp-protocol",
+        choices=PROTOCOLS,
+        default="statsd",
+        help="UDP推送的协议，statsd或influx行协议，默认statsd"
+    )
+    monitor_parser.add_argument(
+        "--csv-schema",
+        choices=["narrow", "wide"],
+        default="narrow",
+        help="CSV表结构，wide为每个核心、挂载点和进程各占一列，默认narrow"
+    )
+    monitor_parser.add_argument(
+        "--rotate-size",
+        type=float,
+        default=0,
+        help="NDJSON文件达到该大小（MB）时轮转，默认0（不轮转）"
+    )
+    monitor_parser.add_argument(
+        "--rotate-interval",
+        type=float,
+        default=0,
+        help="NDJSON文件按时间轮转的间隔（秒），默认0（不轮转）"
+    )
+    monitor_parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="gzip压缩轮转出的NDJSON文件"
     )
     monitor_parser.add_argument(
         "--format", "-f",
@@ -62,12 +125,187 @@ def parse_args():
         action="store_true",
         help="静默模式，不显示实时输出"
     )
+    monitor_parser.add_argument(
+        "--level", "-l",
+        choices=[level.value for level in MonitorLevel],
+        default=MonitorLevel.STANDARD.value,
+        help="监控级别，决定磁盘、连接数、进程等指标的采样周期，默认standard"
+    )
+    monitor_parser.add_argument(
+        "--align",
+        action="store_true",
+        help="将采样点对齐到整数倍间隔的时钟边界"
+    )
     monitor_parser.add_argument(
         "--top-processes",
         type=int,
         default=0,
         help="显示占用资源最多的进程数，默认0（不显示）"
     )
+    monitor_parser.add_argument(
+        "--process-workers",
+        type=int,
+        default=0,
+        help="用多个工作进程按PID分片采样进程，适合进程数极多的主机，默认0（不分片）"
+    )
+    monitor_parser.add_argument(
+        "--exclude-fstypes",
+        type=str,
+        nargs="?",
+        const=",".join(sorted(DEFAULT_EXCLUDED_FSTYPES)),
+        default="",
+        metavar="TYPES",
+        help=f"磁盘使用率中忽略的文件系统类型（逗号分隔），不指定TYPES时忽略{'、'.join(sorted(DEFAULT_EXCLUDED_FSTYPES))}，默认不忽略"
+    )
+    monitor_parser.add_argument(
+        "--watch-pid",
+        type=int,
+        action="append",
+        default=[],
+        metavar="PID",
+        help="关注指定pid的进程，可重复指定"
+    )
+    monitor_parser.add_argument(
+        "--watch-name",
+        type=str,
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="关注进程名匹配的进程（支持*?通配符），进程重启后自动重新关注，可重复指定"
+    )
+    monitor_parser.add_argument(
+        "--watch-pidfile",
+        type=str,
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="关注pid文件中记录的进程，进程重启后跟随新的pid，可重复指定"
+    )
+    monitor_parser.add_argument(
+        "--cgroups",
+        type=str,
+        metavar="PATTERN",
+        help="按cgroup v2统计匹配的cgroup的资源使用，PATTERN为相对/sys/fs/cgroup的路径通配符，如'*'或'system.slice/*'"
+    )
+    monitor_parser.add_argument(
+        "--cgroup-depth",
+        type=int,
+        default=2,
+        help="遍历cgroup层级的最大深度，默认2"
+    )
+
+    # top命令
+    top_parser = subparsers.add_parser("top", help="全屏实时监控界面")
+    top_parser.add_argument(
+        "--interval", "-i",
+        type=float,
+        default=0.5,
+        help="采样间隔（秒），默认0.5"
+    )
+    top_parser.add_argument(
+        "--refresh", "-r",
+        type=float,
+        default=1.0,
+        help="界面刷新间隔（秒），与采样间隔分开限速，默认1.0"
+    )
+    top_parser.add_argument(
+        "--level", "-l",
+        choices=[level.value for level in MonitorLevel],
+        default=MonitorLevel.STANDARD.value,
+        help="监控级别，默认standard"
+    )
+
+    # serve命令
+    serve_parser = subparsers.add_parser("serve", help="以Prometheus格式通过HTTP发布监控数据")
+    serve_parser.add_argument(
+        "--host",
+        type=str,
+        default="0.0.0.0",
+        help="监听地址，默认0.0.0.0"
+    )
+    serve_parser.add_argument(
+        "--port", "-p",
+        type=int,
+        default=9110,
+        help="监听端口，默认9110"
+    )
+    serve_parser.add_argument(
+        "--interval", "-i",
+        type=float,
+        default=5.0,
+        help="采样间隔（秒），抓取时返回最近一次采样的结果，默认5.0"
+    )
+    serve_parser.add_argument(
+        "--level", "-l",
+        choices=[level.value for level in MonitorLevel],
+        default=MonitorLevel.STANDARD.value,
+        help="监控级别，默认standard"
+    )
+
+    # agent命令
+    agent_parser = subparsers.add_parser("agent", help="把本机监控数据推送到汇聚服务")
+    agent_parser.add_argument(
+        "--server", "-s",
+        type=str,
+        required=True,
+        metavar="HOST:PORT",
+        help="汇聚服务地址"
+    )
+    agent_parser.add_argument(
+        "--interval", "-i",
+        type=float,
+        default=1.0,
+        help="采样间隔（秒），默认1.0"
+    )
+    agent_parser.add_argument(
+        "--batch",
+        type=int,
+        default=60,
+        help="每批最多的采样数，默认60"
+    )
+    agent_parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=5.0,
+        help="批次最长等待时间（秒），默认5.0"
+    )
+    agent_parser.add_argument(
+        "--spool",
+        type=str,
+        help="未确认数据的本地缓存目录，断线或重启期间的数据不丢失"
+    )
+    agent_parser.add_argument(
+        "--hostname",
+        type=str,
+        help="上报的主机名，默认为本机主机名"
+    )
+    agent_parser.add_argument(
+        "--level", "-l",
+        choices=[level.value for level in MonitorLevel],
+        default=MonitorLevel.STANDARD.value,
+        help="监控级别，默认standard"
+    )
+
+    # aggregate命令
+    aggregate_parser = subparsers.add_parser("aggregate", help="接收代理推送的数据，按主机写入归档文件")
+    aggregate_parser.add_argument(
+        "--output-dir", "-o",
+        type=str,
+        required=True,
+        help="输出目录，每个主机写入<主机名>.smz"
+    )
+    aggregate_parser.add_argument(
+        "--host",
+        type=str,
+        default="0.0.0.0",
+        help="监听地址，默认0.0.0.0"
+    )
+    aggregate_parser.add_argument(
+        "--port", "-p",
+        type=int,
+        default=9120,
+        help="监听端口，默认9120"
+    )
 
     # stats命令
     stats_parser = subparsers.add_parser("stats", help="显示统计信息")
@@ -75,13 +313,86 @@ def parse_args():
         "--file",
         type=str,
         required=True,
-        help="数据文件路径"
+        help="数据文件路径（.csv、.json、.ndjson、.jsonl、.smz或.smc目录）"
     )
     stats_parser.add_argument(
         "--summary",
         action="store_true",
         help="显示摘要统计"
     )
+    stats_parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="每行输出一条展开的记录（JSON格式的文件默认输出JSON文档）"
+    )
+    stats_parser.add_argument(
+        "--from",
+        dest="start",
+        type=parse_time,
+        help="起始时间（Unix时间戳或ISO格式，如2024-01-01T12:00:00）"
+    )
+    stats_parser.add_argument(
+        "--to",
+        dest="end",
+        type=parse_time,
+        help="结束时间（Unix时间戳或ISO格式）"
+    )
+
+    # fleet命令
+    fleet_parser = subparsers.add_parser("fleet", help="并行查询目录中多个主机的记录")
+    fleet_parser.add_argument(
+        "--dir", "-d",
+        dest="directory",
+        type=str,
+        required=True,
+        help="记录目录，每个主机一个文件（如aggregate命令的输出目录）"
+    )
+    fleet_parser.add_argument(
+        "--metric", "-m",
+        type=str,
+        default="cpu_percent",
+        help="排序的指标，默认cpu_percent"
+    )
+    fleet_parser.add_argument(
+        "--stat", "-s",
+        type=str,
+        default="mean",
+        help=f"排序的统计量（{'、'.join(FLEET_STATS)}或任意pNN），默认mean"
+    )
+    fleet_parser.add_argument(
+        "--top", "-n",
+        type=int,
+        default=10,
+        help="显示的主机数，0表示全部，默认10"
+    )
+    fleet_parser.add_argument(
+        "--ascending",
+        action="store_true",
+        help="从小到大排序"
+    )
+    fleet_parser.add_argument(
+        "--from",
+        dest="start",
+        type=parse_time,
+        help="起始时间（Unix时间戳或ISO格式）"
+    )
+    fleet_parser.add_argument(
+        "--last",
+        type=float,
+        help="只查询最近多少秒，与--from同时指定时以--from为准"
+    )
+    fleet_parser.add_argument(
+        "--to",
+        dest="end",
+        type=parse_time,
+        help="结束时间（Unix时间戳或ISO格式）"
+    )
+    fleet_parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=None,
+        help="工作进程数，默认为CPU核心数"
+    )
 
     return parser.parse_args()
 
@@ -132,7 +443,16 @@ def display_system_info():
 
 def monitor_command(args):
     """执行监控命令"""
-    monitor = SystemMonitor()
+    monitor = SystemMonitor(level=MonitorLevel(args.level), process_workers=args.process_workers,
+                            cgroup_pattern=args.cgroups, cgroup_depth=args.cgroup_depth,
+                            exclude_fstypes=[fstype.strip() for fstype in args.exclude_fstypes.split(",")
+                                             if fstype.strip()])
+    for pid in args.watch_pid:
+        monitor.watch(pid=pid)
+    for pattern in args.watch_name:
+        monitor.watch(name=pattern)
+    for pidfile in args.watch_pidfile:
+        monitor.watch(pidfile=pidfile)
 
     # 设置输出器
     exporters = []
@@ -142,13 +462,43 @@ def monitor_command(args):
 
     if args.output:
         if args.output.endswith('.csv'):
-            exporters.append(CSVExporter(args.output))
+            exporters.append(CSVExporter(args.output, schema=args.csv_schema, buffered=True))
+        elif args.output.endswith('.parquet'):
+            try:
+                from .exporters.parquet_exporter import ParquetExporter
+            except ImportError:
+                print("错误: 导出Parquet需要安装pyarrow", file=sys.stderr)
+                sys.exit(1)
+            exporters.append(ParquetExporter(args.output))
+        elif args.output.endswith('.smz'):
+            exporters.append(ArchiveExporter(args.output))
         elif args.output.endswith('.json'):
             exporters.append(JSONExporter(args.output))
+        elif args.output.rstrip('/\\').endswith('.smc'):
+            exporters.append(ColumnarStore(args.output))
+        elif args.output.endswith(NDJSON_SUFFIXES):
+            exporters.append(JSONExporter(
+                args.output,
+                max_bytes=int(args.rotate_size * 1024 * 1024),
+                rotate_interval=args.rotate_interval,
+                compress=args.compress
+            ))
         else:
             print(f"错误: 不支持的文件格式: {args.output}", file=sys.stderr)
             sys.exit(1)
 
+    if args.udp:
+        host, _, port = args.udp.rpartition(':')
+        if not host or not port.isdigit():
+            print(f"错误: UDP地址格式应为HOST:PORT: {args.udp}", file=sys.stderr)
+            sys.exit(1)
+        exporters.append(UDPExporter(host.strip('[]'), int(port), protocol=args.udp_protocol))
+
+    rollup = None
+    if args.rollup:
+        rollup = RollupPipeline.load(args.rollup) if os.path.exists(args.rollup) else RollupPipeline()
+        exporters.append(rollup)
+
     if not exporters:
         # 如果没有输出器，使用静默的JSON导出器
         exporters.append(JSONExporter("system_monitor_log.json"))
@@ -156,11 +506,12 @@ def monitor_command(args):
     print(f"开始监控，间隔: {args.interval}秒", file=sys.stderr)
     print("按 Ctrl+C 停止监控", file=sys.stderr)
 
+    scheduler = DeadlineScheduler(args.interval, align_to_wall_clock=args.align)
     start_time = time.time()
     count = 0
 
     try:
-        while True:
+        while scheduler.wait():
             # 检查持续时间
             if args.duration > 0 and (time.time() - start_time) > args.duration:
                 break
@@ -175,54 +526,187 @@ def monitor_command(args):
 
             count += 1
 
-            # 等待
-            time.sleep(args.interval)
-
     except KeyboardInterrupt:
         print(f"\n监控已停止，共收集 {count} 次数据", file=sys.stderr)
+        if scheduler.stats.overruns:
+            print(f"超时 {scheduler.stats.overruns} 次，跳过 {scheduler.stats.skipped} 个采样点", file=sys.stderr)
     except Exception as e:
         print(f"错误: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        for exporter in exporters:
+            if hasattr(exporter, 'close'):
+                exporter.close()
+        if rollup is not None:
+            rollup.save(args.rollup)
+        monitor.close()
+
+
+def top_command(args):
+    """启动全屏监控界面"""
+    from .tui import run_top
+
+    # 历史数据覆盖约5分钟，用于绘制走势
+    history_size = max(int(300 / args.interval), 60)
+    monitor = SystemMonitor(level=MonitorLevel(args.level), history_size=history_size)
+    run_top(args.interval, args.refresh, monitor)
+
+
+def serve_command(args):
+    """采样并通过HTTP发布Prometheus格式的数据"""
+    monitor = SystemMonitor(level=MonitorLevel(args.level))
+    exporter = PrometheusExporter(host=args.host, port=args.port)
+    # 先采样一次，服务启动后立即有数据可抓取
+    exporter.export_single(monitor.get_metrics())
+    exporter.start()
+
+    host, port = exporter.address
+    print(f"Prometheus数据地址: http://{host}:{port}{exporter.path}", file=sys.stderr)
+    print("按 Ctrl+C 停止", file=sys.stderr)
+
+    scheduler = DeadlineScheduler(args.interval)
+    try:
+        while scheduler.wait():
+            exporter.export_single(monitor.get_metrics())
+    except KeyboardInterrupt:
+        print("\n服务已停止", file=sys.stderr)
+    finally:
+        exporter.close()
+
+
+def _parse_address(address: str, default_port: int):
+    """解析HOST:PORT"""
+    host, _, port = address.rpartition(':')
+    if not host:
+        return address.strip('[]'), default_port
+    if not port.isdigit():
+        raise ValueError(f"地址格式应为HOST:PORT: {address}")
+    return host.strip('[]'), int(port)
+
+
+def agent_command(args):
+    """采样并推送到汇聚服务"""
+    host, port = _parse_address(args.server, 9120)
+    monitor = SystemMonitor(level=MonitorLevel(args.level))
+    agent = AgentExporter(host, port, hostname=args.hostname, batch_size=args.batch,
+                          flush_interval=args.flush_interval, spool_dir=args.spool)
+    agent.start()
+    print(f"推送到 {host}:{port}，间隔: {args.interval}秒", file=sys.stderr)
+
+    scheduler = DeadlineScheduler(args.interval)
+    try:
+        while scheduler.wait():
+            agent.export_single(monitor.get_metrics())
+    except KeyboardInterrupt:
+        print(f"\n代理已停止，未确认的批次: {len(agent.spool)}", file=sys.stderr)
+    finally:
+        agent.close()
 
 
-def stats_command(args):
-    """显示统计信息"""
-    if not args.file.endswith('.json'):
-        print("错误: 目前只支持JSON格式的统计文件", file=sys.stderr)
+def aggregate_command(args):
+    """运行汇聚服务"""
+    print(f"汇聚服务监听 {args.host}:{args.port}，输出目录: {args.output_dir}", file=sys.stderr)
+    try:
+        run_aggregator(args.output_dir, args.host, args.port)
+    except KeyboardInterrupt:
+        print("\n汇聚服务已停止", file=sys.stderr)
+
+
+def _format_value(value) -> str:
+    """格式化统计值"""
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_summary(records):
+    """单遍统计并打印每个指标的摘要"""
+    count, bounds, summaries = summarize(records)
+    if not count:
+        print("错误: 没有找到数据", file=sys.stderr)
         sys.exit(1)
 
+    print(f"数据记录数: {count}")
+    print(f"时间范围: {datetime.fromtimestamp(bounds[0]).isoformat()} ~ "
+          f"{datetime.fromtimestamp(bounds[1]).isoformat()}")
+
+    rows = []
+    for name, summary in summaries.items():
+        result = summary.to_dict()
+        rows.append([name, result.pop("count")] + [_format_value(value) for value in result.values()])
+    headers = ["指标", "数量", "平均", "最小", "最大", "标准差", "p50", "p95", "p99"]
+    print(tabulate(rows, headers=headers, tablefmt="simple"))
+
+
+def print_json_document(items) -> int:
+    """逐条输出记录组成的JSON数组，格式与json.dumps(列表, indent=2)相同，返回记录数"""
+    count = 0
+    for item in items:
+        text = json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        print(("[\n  " if not count else ",\n  ") + text, end="")
+        count += 1
+    if count:
+        print("\n]")
+    return count
+
+
+def stats_command(args):
+    """流式读取数据文件并显示统计信息"""
     try:
-        exporter = JSONExporter(args.file)
-        data = exporter.load_data()
+        if args.summary:
+            print_summary(iter_records(args.file, args.start, args.end))
+            return
 
-        if not data:
+        if not args.ndjson and args.file.endswith(('.json',) + NDJSON_SUFFIXES) \
+                and not is_columnar_store(args.file):
+            # JSON格式的文件按原有格式输出原始记录组成的JSON文档
+            count = print_json_document(iter_json_items(args.file, args.start, args.end))
+        else:
+            count = 0
+            for timestamp, values in iter_records(args.file, args.start, args.end):
+                record = {"timestamp": datetime.fromtimestamp(timestamp).isoformat()}
+                record.update(values)
+                print(json.dumps(record, ensure_ascii=False))
+                count += 1
+        if not count:
             print("错误: 没有找到数据", file=sys.stderr)
             sys.exit(1)
 
-        if args.summary:
-            print(f"数据记录数: {len(data)}")
-
-            # CPU统计
-            cpu_values = [item.get('cpu', {}).get('total_percent', 0) for item in data]
-            if cpu_values:
-                avg_cpu = sum(cpu_values) / len(cpu_values)
-                max_cpu = max(cpu_values)
-                print(f"CPU使用率: 平均 {avg_cpu:.1f}%, 最高 {max_cpu:.1f}%")
-
-            # 内存统计
-            mem_values = [item.get('memory', {}).get('percent', 0) for item in data]
-            if mem_values:
-                avg_mem = sum(mem_values) / len(mem_values)
-                max_mem = max(mem_values)
-                print(f"内存使用率: 平均 {avg_mem:.1f}%, 最高 {max_mem:.1f}%")
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        sys.exit(1)
 
-        else:
-            print(json.dumps(data, indent=2, ensure_ascii=False))
 
-    except Exception as e:
+def fleet_command(args):
+    """并行扫描多个主机的记录，输出全体统计和主机排名"""
+    start = args.start
+    if start is None and args.last:
+        start = time.time() - args.last
+    try:
+        result = fleet_query(args.directory, start, args.end, metrics=[args.metric], workers=args.workers)
+        ranked = result.rank(args.metric, args.stat, top=args.top or None, ascending=args.ascending)
+    except (OSError, ValueError) as e:
         print(f"错误: {e}", file=sys.stderr)
         sys.exit(1)
 
+    total = result.fleet.get(args.metric)
+    if total is None:
+        print(f"错误: 没有找到指标 {args.metric} 的数据", file=sys.stderr)
+        sys.exit(1)
+
+    samples = sum(summary.count for summary in result.hosts.values())
+    print(f"主机数: {len(result.hosts)}，数据记录数: {samples}")
+    stats = ["mean", "min", "max", "p50", "p95", "p99"]
+    print(f"{args.metric}（全部主机）: " + "  ".join(
+        f"{stat}={_format_value(total.value(stat))}" for stat in stats))
+    print()
+
+    rows = []
+    for rank, (host, value) in enumerate(ranked, 1):
+        aggregate = result.hosts[host].metrics[args.metric]
+        rows.append([rank, host, _format_value(value), aggregate.stats.count,
+                     _format_value(aggregate.value("mean")), _format_value(aggregate.value("max"))])
+    print(tabulate(rows, headers=["#", "主机", f"{args.metric} {args.stat}", "数量", "平均", "最大"],
+                   tablefmt="simple"))
+
 
 def main():
     """主函数"""
@@ -240,6 +724,16 @@ def main():
             monitor_command(args)
         elif args.command == "stats":
             stats_command(args)
+        elif args.command == "top":
+            top_command(args)
+        elif args.command == "agent":
+            agent_command(args)
+        elif args.command == "aggregate":
+            aggregate_command(args)
+        elif args.command == "serve":
+            serve_command(args)
+        elif args.command == "fleet":
+            fleet_command(args)
         else:
             print(f"未知命令: {args.command}", file=sys.stderr)
             sys.exit(1)
@@ -7,6 +7,10 @@ from .memory_collector import MemoryCollector
 from .disk_collector import DiskCollector
 from .network_collector import NetworkCollector
 from .process_collector import ProcessCollector
+from .cgroup_collector import CgroupCollector, CgroupStats
+from .sharded_process import ProcessSample, ShardedProcessSampler
+from .snapshot import KernelSnapshot, SnapshotReader
+from .watchlist import ProcessWatchlist, WatchedProcess
 
 __all__ = [
     'CPUCollector',
@@ -14,4 +18,12 @@ __all__ = [
     'DiskCollector',
     'NetworkCollector',
     'ProcessCollector',
+    'CgroupCollector',
+    'CgroupStats',
+    'ProcessSample',
+    'ShardedProcessSampler',
+    'KernelSnapshot',
+    'SnapshotReader',
+    'ProcessWatchlist',
+    'WatchedProcess',
 ]
\ No newline at end of file
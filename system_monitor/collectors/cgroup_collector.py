@@ -0,0 +1,192 @@
+"""
+cgroup v2资源收集器：按容器/服务统计资源使用
+"""
+
+import fnmatch
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CGROUP_ROOT = "/sys/fs/cgroup"
+
+# 默认统计深度范围内的所有cgroup
+DEFAULT_PATTERN = "*"
+
+
+@dataclass
+class CgroupStats:
+    """一个cgroup的一次采样，速率为与上次采样之间的平均值"""
+    path: str
+    cpu_percent: float = 0.0
+    cpu_throttled_percent: float = 0.0
+    memory_current: Optional[int] = None
+    memory_anon: Optional[int] = None
+    memory_file: Optional[int] = None
+    io_read_bytes_per_sec: Optional[float] = None
+    io_write_bytes_per_sec: Optional[float] = None
+    pids: Optional[int] = None
+
+
+def is_available(root: str = DEFAULT_CGROUP_ROOT) -> bool:
+    """root是否为cgroup v2（统一层级）挂载点"""
+    return os.path.isfile(os.path.join(root, "cgroup.controllers"))
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 65536)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _read_int(path: str) -> Optional[int]:
+    data = _read(path)
+    try:
+        return int(data) if data else None
+    except ValueError:
+        return None
+
+
+def _read_keyed(path: str) -> Optional[Dict[bytes, int]]:
+    """读取"键 值"格式的文件（cpu.stat、memory.stat）"""
+    data = _read(path)
+    if data is None:
+        return None
+    values = {}
+    for line in data.splitlines():
+        fields = line.split()
+        if len(fields) == 2:
+            try:
+                values[fields[0]] = int(fields[1])
+            except ValueError:
+                continue
+    return values
+
+
+def _read_io(path: str) -> Optional[Tuple[int, int]]:
+    """读取io.stat中所有设备的(读字节数, 写字节数)之和"""
+    data = _read(path)
+    if data is None:
+        return None
+    read_bytes = write_bytes = 0
+    for field in data.split():
+        if field.startswith(b"rbytes="):
+            read_bytes += int(field[7:])
+        elif field.startswith(b"wbytes="):
+            write_bytes += int(field[7:])
+    return read_bytes, write_bytes
+
+
+class CgroupCollector:
+    """
+    cgroup v2收集器
+
+    遍历cgroup层级（限制深度并按通配符筛选），每个cgroup读取cpu.stat、
+    memory.current、memory.stat、io.stat和pids.current，开销与cgroup数成正比，
+    与进程数无关；CPU和I/O速率由与上次采样的差值计算
+    """
+
+    SORT_KEYS = ('cpu_percent', 'memory_current', 'io_read_bytes_per_sec', 'io_write_bytes_per_sec', 'pids')
+
+    def __init__(self, root: str = DEFAULT_CGROUP_ROOT, max_depth: int = 2, pattern: str = DEFAULT_PATTERN):
+        """
+        初始化收集器
+
+        Args:
+            root: cgroup v2挂载点，混合模式下自动使用其中的unified目录
+            max_depth: 遍历的最大深度，1表示只统计root下的第一级
+            pattern: 相对root的cgroup路径通配符，如"system.slice/*.service"；
+                     *也匹配/，默认统计所有cgroup
+        """
+        if max_depth < 1:
+            raise ValueError("max_depth必须大于0")
+        if not is_available(root):
+            # 混合模式下v2层级挂载在unified子目录
+            unified = os.path.join(root, "unified")
+            if not is_available(unified):
+                raise ValueError(f"{root}不是cgroup v2挂载点")
+            root = unified
+        self.root = root
+        self.max_depth = max_depth
+        self.pattern = pattern
+        # 每个cgroup的上次采样：(采样时刻, CPU微秒, 限流微秒, I/O累计值)
+        self._previous: Dict[str, Tuple[float, Optional[int], Optional[int], Optional[Tuple[int, int]]]] = {}
+
+    def list_cgroups(self) -> List[str]:
+        """列出深度范围内匹配的cgroup，返回相对root的路径"""
+        matched = []
+        stack = [("", 0)]
+        while stack:
+            relative, depth = stack.pop()
+            if relative and fnmatch.fnmatchcase(relative, self.pattern):
+                matched.append(relative)
+            if depth >= self.max_depth:
+                continue
+            try:
+                entries = os.scandir(os.path.join(self.root, relative) if relative else self.root)
+            except OSError:
+                continue
+            with entries:
+                children = sorted(entry.name for entry in entries if entry.is_dir(follow_symlinks=False))
+            for name in children:
+                stack.append((f"{relative}/{name}" if relative else name, depth + 1))
+        return sorted(matched)
+
+    def _read_cgroup(self, relative: str, now: float) -> CgroupStats:
+        directory = os.path.join(self.root, relative)
+        stats = CgroupStats(relative)
+        cpu = _read_keyed(os.path.join(directory, "cpu.stat"))
+        usage = cpu.get(b"usage_usec") if cpu else None
+        throttled = cpu.get(b"throttled_usec") if cpu else None
+        stats.memory_current = _read_int(os.path.join(directory, "memory.current"))
+        memory = _read_keyed(os.path.join(directory, "memory.stat"))
+        if memory:
+            stats.memory_anon = memory.get(b"anon")
+            stats.memory_file = memory.get(b"file")
+        io = _read_io(os.path.join(directory, "io.stat"))
+        stats.pids = _read_int(os.path.join(directory, "pids.current"))
+
+        previous = self._previous.get(relative)
+        if previous is not None and now > previous[0]:
+            elapsed_usec = (now - previous[0]) * 1e6
+            if usage is not None and previous[1] is not None:
+                stats.cpu_percent = round(max(usage - previous[1], 0) / elapsed_usec * 100, 1)
+            if throttled is not None and previous[2] is not None:
+                stats.cpu_throttled_percent = round(max(throttled - previous[2], 0) / elapsed_usec * 100, 1)
+            if io is not None and previous[3] is not None:
+                stats.io_read_bytes_per_sec = max(io[0] - previous[3][0], 0) / (now - previous[0])
+                stats.io_write_bytes_per_sec = max(io[1] - previous[3][1], 0) / (now - previous[0])
+        elif io is not None:
+            stats.io_read_bytes_per_sec = stats.io_write_bytes_per_sec = 0.0
+
+        self._previous[relative] = (now, usage, throttled, io)
+        return stats
+
+    def collect(self) -> List[CgroupStats]:
+        """采样所有匹配的cgroup，已删除的cgroup不再保留状态"""
+        cgroups = self.list_cgroups()
+        results = [self._read_cgroup(relative, time.monotonic()) for relative in cgroups]
+        for relative in set(self._previous) - set(cgroups):
+            del self._previous[relative]
+        return results
+
+    def get_top_cgroups(self, count: int = 10, sort_by: str = 'cpu_percent') -> List[CgroupStats]:
+        """
+        获取占用资源最多的cgroup
+
+        Args:
+            count: 返回的cgroup数
+            sort_by: 排序字段，见SORT_KEYS
+        """
+        if sort_by not in self.SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_by}")
+        results = self.collect()
+        results.sort(key=lambda stats: getattr(stats, sort_by) or 0, reverse=True)
+        return results[:count]
\ No newline at end of file
@@ -2,10 +2,83 @@
 CPU信息收集器
 """
 
+import os
 import psutil
 import platform
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .procfs import CLOCK_TICKS
+from .snapshot import KernelSnapshot, cpu_times_pair
+
+# 每个核心至少经过一个时钟滴答才计算使用率，间隔过短时只有0或100两种结果
+MIN_CORE_DELTA = 1.0 / CLOCK_TICKS
+
+
+def _usage(last: Tuple[float, float], current: Tuple[float, float], minimum: float) -> Optional[float]:
+    """根据两次(忙碌时间, 总时间)计算使用率，总时间差小于minimum时返回None"""
+    total_delta = current[1] - last[1]
+    if total_delta < minimum or total_delta <= 0:
+        return None
+    busy_delta = current[0] - last[0]
+    return round(min(max(busy_delta / total_delta * 100, 0.0), 100.0), 1)
+
+
+class CPUEngine:
+    """
+    基于cpu_times差值的CPU使用率计算引擎，不会阻塞等待
+
+    与基线的差值不足一个时钟滴答时保留上次的值，基线不前移，直到累计的差值足够
+    """
+
+    def __init__(self):
+        self._last_total: Optional[Tuple[float, float]] = None
+        self._last_percpu: List[Tuple[float, float]] = []
+        self._last_sample: Optional[float] = None
+        self.cpu_percent = 0.0
+        self.cpu_per_core: List[float] = []
+
+    def update(self, total: Tuple[float, float], percpu: List[Tuple[float, float]],
+               sample_id: Optional[float] = None):
+        """
+        用新的CPU时间更新使用率
+
+        Args:
+            total: 总体(忙碌时间, 总时间)
+            percpu: 每个核心的(忙碌时间, 总时间)
+            sample_id: 采样标识，同一标识重复更新时直接忽略
+        """
+        if sample_id is not None and sample_id == self._last_sample:
+            return
+        self._last_sample = sample_id
+
+        if self._last_total is None:
+            self._last_total = total
+        else:
+            usage = _usage(self._last_total, total, MIN_CORE_DELTA * max(len(percpu), 1))
+            if usage is not None:
+                self.cpu_percent = usage
+                self._last_total = total
+
+        # 核心数变化（CPU热插拔）时重新建立基线，有足够差值之前各核心为0
+        if len(self._last_percpu) != len(percpu):
+            self.cpu_per_core = [0.0] * len(percpu)
+            self._last_percpu = list(percpu)
+            return
+        for index, (last, current) in enumerate(zip(self._last_percpu, percpu)):
+            usage = _usage(last, current, MIN_CORE_DELTA)
+            if usage is not None:
+                self.cpu_per_core[index] = usage
+                self._last_percpu[index] = current
+
+    def update_from_snapshot(self, snapshot: KernelSnapshot):
+        """用内核快照更新使用率"""
+        self.update(snapshot.cpu_times, snapshot.cpu_times_percpu, snapshot.monotonic)
+
+    def update_from_psutil(self):
+        """直接读取psutil更新使用率"""
+        percpu = [cpu_times_pair(times) for times in psutil.cpu_times(percpu=True)]
+        self.update((sum(pair[0] for pair in percpu), sum(pair[1] for pair in percpu)), percpu)
 
 
 class CPUCollector:
@@ -16,13 +89,49 @@ class CPUCollector:
         self.cpu_count_physical = psutil.cpu_count(logical=False)
         self.cpu_freq = psutil.cpu_freq()
 
-    def get_cpu_percent(self, interval: float = 0.1) -> float:
-        """获取CPU使用率"""
-        return psutil.cpu_percent(interval=interval)
+        # 建立CPU时间基线，此后累计的差值足够时才有有效值，之前为0
+        self.engine = CPUEngine()
+        self.engine.update_from_psutil()
+        # 最近一对psutil采样中尚未被读取的值，另一方法读取时直接使用同一对采样
+        self._unread: Set[str] = set()
+
+    def _update(self, snapshot: Optional[KernelSnapshot], part: str):
+        if snapshot is not None:
+            self.engine.update_from_snapshot(snapshot)
+            self._unread = set()
+        elif part in self._unread:
+            self._unread.discard(part)
+        else:
+            self.engine.update_from_psutil()
+            self._unread = {"cpu_percent", "cpu_per_core"} - {part}
+
+    def get_cpu_percent(self, interval: Optional[float] = None,
+                        snapshot: Optional[KernelSnapshot] = None) -> float:
+        """
+        获取CPU使用率
+
+        Args:
+            interval: 阻塞采样间隔（秒），为None时使用与上次采样的差值，不阻塞
+            snapshot: 内核快照，与get_cpu_per_core共用同一对采样；
+                      不指定时两个方法交替调用也使用同一对采样
+        """
+        if interval:
+            return psutil.cpu_percent(interval=interval)
+        self._update(snapshot, "cpu_percent")
+        return self.engine.cpu_percent
+
+    def get_cpu_per_core(self, snapshot: Optional[KernelSnapshot] = None) -> List[float]:
+        """获取每个核心的使用率，与get_cpu_percent使用同一对采样"""
+        self._update(snapshot, "cpu_per_core")
+        return list(self.engine.cpu_per_core)
 
-    def get_cpu_per_core(self) -> List[float]:
-        """获取每个核心的使用率"""
-        return psutil.cpu_percent(percpu=True)
+    def get_load_average(self, snapshot: Optional[KernelSnapshot] = None) -> Tuple[float, float, float]:
+        """获取1、5、15分钟平均负载"""
+        if snapshot is not None:
+            return snapshot.load_avg
+        if hasattr(os, "getloadavg"):
+            return os.getloadavg()
+        return (0.0, 0.0, 0.0)
 
     def get_cpu_frequency(self) -> Dict[str, float]:
         """获取CPU频率"""
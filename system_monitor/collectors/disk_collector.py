@@ -2,30 +2,209 @@
 磁盘信息收集器
 """
 
+import os
+import queue
+import select
+import threading
+import time
 import psutil
-from typing import Dict, Any, List
+from concurrent.futures import Future, wait
+from typing import Dict, Any, List, Optional, Iterable, Set
+
+# 常见的伪文件系统类型，需要时传给exclude_fstypes忽略
+DEFAULT_EXCLUDED_FSTYPES = frozenset({"tmpfs", "devtmpfs", "overlay", "squashfs"})
+
+
+class _DaemonPool:
+    """
+    守护线程池，任务挂起（如失效的NFS挂载）时不会阻止进程退出
+
+    超时仍在运行的任务由replace()补充一个线程，挂起的任务不占用池的容量；
+    该任务最终返回后，执行它的线程退出，线程数恢复原值
+    """
+
+    def __init__(self, workers: int):
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        # 已补充线程的挂起任务
+        self._hung: Set[Future] = set()
+        self._started = 0
+        for _ in range(workers):
+            self._spawn()
+
+    def _spawn(self):
+        thread = threading.Thread(target=self._worker, name=f"statvfs-{self._started}", daemon=True)
+        self._started += 1
+        thread.start()
+
+    def submit(self, fn, *args) -> Future:
+        """提交任务"""
+        future: Future = Future()
+        self._tasks.put((future, fn, args))
+        return future
+
+    def replace(self, future: Future):
+        """任务超时仍在运行时补充一个线程，同一任务只补充一次"""
+        with self._lock:
+            if future in self._hung or not future.running():
+                return
+            self._hung.add(future)
+            self._spawn()
+
+    def _worker(self):
+        while True:
+            future, fn, args = self._tasks.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            with self._lock:
+                if future in self._hung:
+                    # 已有补充的线程代替
+                    self._hung.discard(future)
+                    return
+
+
+class MountWatcher:
+    """挂载表变化检测：Linux下轮询/proc/self/mountinfo，其他系统按时间间隔刷新"""
+
+    def __init__(self, mountinfo_path: str = "/proc/self/mountinfo", refresh_interval: float = 60.0):
+        self.refresh_interval = refresh_interval
+        self._last_refresh: Optional[float] = None
+        self._poller = None
+        self._fd = -1
+
+        if hasattr(select, "poll"):
+            try:
+                self._fd = os.open(mountinfo_path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+                self._poller = select.poll()
+                self._poller.register(self._fd, select.POLLPRI | select.POLLERR)
+            except OSError:
+                self._poller = None
+
+    def changed(self) -> bool:
+        """挂载表自上次调用后是否变化，首次调用返回True"""
+        now = time.monotonic()
+        if self._last_refresh is None:
+            self._last_refresh = now
+            return True
+
+        if self._poller is not None:
+            # 挂载表变化时内核对该文件触发一次POLLPRI|POLLERR
+            events = self._poller.poll(0)
+            if events:
+                self._last_refresh = now
+                return True
+            return False
+
+        if now - self._last_refresh >= self.refresh_interval:
+            self._last_refresh = now
+            return True
+        return False
+
+    def close(self):
+        """关闭文件"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
 
 
 class DiskCollector:
     """磁盘信息收集器"""
 
+    def __init__(self, exclude_fstypes: Iterable[str] = (),
+                 timeout: float = 1.0, workers: int = 4,
+                 mountinfo_path: str = "/proc/self/mountinfo"):
+        """
+        初始化磁盘收集器
+
+        Args:
+            exclude_fstypes: 忽略的文件系统类型，默认不忽略，
+                             可使用DEFAULT_EXCLUDED_FSTYPES忽略常见的伪文件系统
+            timeout: 单次采样等待statvfs的最长时间（秒），超时的挂载点标记为失效
+            workers: 执行statvfs的线程数
+            mountinfo_path: 用于检测挂载表变化的文件
+        """
+        self.exclude_fstypes = frozenset(exclude_fstypes)
+        self.timeout = timeout
+        self.workers = workers
+        self.mountinfo_path = mountinfo_path
+
+        self.stale: Set[str] = set()
+        self._partitions: List[Any] = []
+        self._watcher: Optional[MountWatcher] = None
+        self._pool: Optional[_DaemonPool] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_partitions(self) -> List[Any]:
+        """获取分区列表，仅在挂载表变化时重新读取"""
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = MountWatcher(self.mountinfo_path)
+            if self._watcher.changed():
+                self._partitions = [
+                    partition for partition in psutil.disk_partitions()
+                    if partition.fstype not in self.exclude_fstypes
+                ]
+            return self._partitions
+
+    def _usage_of(self, mountpoints: List[str]) -> Dict[str, Any]:
+        """
+        并行获取各挂载点的使用情况，超时的挂载点标记为失效并跳过
+
+        多个线程同时采样时依次执行，每次最多等待timeout
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = _DaemonPool(self.workers)
+
+            # 已卸载的挂载点不再标记为失效，挂起的调用由线程池自行回收
+            for mountpoint in set(self._pending) - set(mountpoints):
+                del self._pending[mountpoint]
+
+            futures = {}
+            for mountpoint in mountpoints:
+                pending = self._pending.get(mountpoint)
+                if pending is not None:
+                    if not pending.done():
+                        # 上次的调用仍未返回，不再重复提交
+                        continue
+                    del self._pending[mountpoint]
+                futures[mountpoint] = self._pool.submit(psutil.disk_usage, mountpoint)
+
+            wait(futures.values(), timeout=self.timeout)
+
+            usage = {}
+            for mountpoint, future in futures.items():
+                if not future.done():
+                    self._pending[mountpoint] = future
+                    continue
+                if future.exception() is None:
+                    usage[mountpoint] = future.result()
+
+            # 排队时超时的任务之后才开始运行，每次都检查所有未返回的任务
+            for future in self._pending.values():
+                self._pool.replace(future)
+            self.stale = set(self._pending)
+            return usage
+
     def get_disk_usage(self, path: str = "/") -> float:
         """获取磁盘使用率"""
         return psutil.disk_usage(path).percent
 
     def get_all_disk_usage(self) -> Dict[str, float]:
         """获取所有磁盘分区的使用率"""
-        partitions = psutil.disk_partitions()
-        disk_usage = {}
+        partitions = self.get_partitions()
+        usage = self._usage_of([partition.mountpoint for partition in partitions])
 
-        for partition in partitions:
-            try:
-                usage = psutil.disk_usage(partition.mountpoint)
-                disk_usage[partition.mountpoint] = usage.percent
-            except Exception:
-                continue
-
-        return disk_usage
+        return {
+            partition.mountpoint: usage[partition.mountpoint].percent
+            for partition in partitions
+            if partition.mountpoint in usage
+        }
 
     def get_disk_io_counters(self) -> Dict[str, Any]:
         """获取磁盘IO统计"""
@@ -43,22 +222,22 @@ class DiskCollector:
 
     def get_disk_info(self) -> List[Dict[str, Any]]:
         """获取磁盘详细信息"""
-        partitions = psutil.disk_partitions()
+        partitions = self.get_partitions()
+        usage_map = self._usage_of([partition.mountpoint for partition in partitions])
         disk_info = []
 
         for partition in partitions:
-            try:
-                usage = psutil.disk_usage(partition.mountpoint)
-                disk_info.append({
-                    "device": partition.device,
-                    "mountpoint": partition.mountpoint,
-                    "fstype": partition.fstype,
-                    "total": usage.total,
-                    "used": usage.used,
-                    "free": usage.free,
-                    "percent": usage.percent,
-                })
-            except Exception:
+            usage = usage_map.get(partition.mountpoint)
+            if usage is None:
                 continue
+            disk_info.append({
+                "device": partition.device,
+                "mountpoint": partition.mountpoint,
+                "fstype": partition.fstype,
+                "total": usage.total,
+                "used": usage.used,
+                "free": usage.free,
+                "percent": usage.percent,
+            })
 
         return disk_info
\ No newline at end of file
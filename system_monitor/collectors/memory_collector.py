@@ -3,26 +3,36 @@
 """
 
 import psutil
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from .snapshot import KernelSnapshot
 
 
 class MemoryCollector:
     """内存信息收集器"""
 
-    def get_memory_percent(self) -> float:
+    def get_memory_percent(self, snapshot: Optional[KernelSnapshot] = None) -> float:
         """获取内存使用百分比"""
+        if snapshot is not None:
+            return snapshot.memory_percent
         return psutil.virtual_memory().percent
 
-    def get_memory_used(self) -> float:
+    def get_memory_used(self, snapshot: Optional[KernelSnapshot] = None) -> float:
         """获取已用内存（GB）"""
+        if snapshot is not None:
+            return snapshot.memory_used / (1024 ** 3)
         return psutil.virtual_memory().used / (1024 ** 3)
 
-    def get_memory_total(self) -> float:
+    def get_memory_total(self, snapshot: Optional[KernelSnapshot] = None) -> float:
         """获取总内存（GB）"""
+        if snapshot is not None:
+            return snapshot.memory_total / (1024 ** 3)
         return psutil.virtual_memory().total / (1024 ** 3)
 
-    def get_memory_available(self) -> float:
+    def get_memory_available(self, snapshot: Optional[KernelSnapshot] = None) -> float:
         """获取可用内存（GB）"""
+        if snapshot is not None:
+            return snapshot.memory_available / (1024 ** 3)
         return psutil.virtual_memory().available / (1024 ** 3)
 
     def get_swap_percent(self) -> float:
@@ -2,28 +2,80 @@
 网络信息收集器
 """
 
+import os
 import psutil
 import socket
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+
+from .procfs import ProcFile
+from .snapshot import KernelSnapshot
+
+# /proc/net/tcp 中的连接状态编码
+TCP_STATES = {
+    b"01": "ESTABLISHED",
+    b"02": "SYN_SENT",
+    b"03": "SYN_RECV",
+    b"04": "FIN_WAIT1",
+    b"05": "FIN_WAIT2",
+    b"06": "TIME_WAIT",
+    b"07": "CLOSE",
+    b"08": "CLOSE_WAIT",
+    b"09": "LAST_ACK",
+    b"0A": "LISTEN",
+    b"0B": "CLOSING",
+    b"0C": "NEW_SYN_RECV",
+}
+
+# 各连接类型对应的sockstat计数项
+SOCKSTAT_KINDS = {
+    "all": ("TCP.inuse", "TCP.tw", "UDP.inuse", "UDPLITE.inuse", "RAW.inuse",
+            "TCP6.inuse", "UDP6.inuse", "UDPLITE6.inuse", "RAW6.inuse", "UNIX.inuse"),
+    "inet": ("TCP.inuse", "TCP.tw", "UDP.inuse", "UDPLITE.inuse", "RAW.inuse",
+             "TCP6.inuse", "UDP6.inuse", "UDPLITE6.inuse", "RAW6.inuse"),
+    "inet4": ("TCP.inuse", "TCP.tw", "UDP.inuse", "UDPLITE.inuse", "RAW.inuse"),
+    "inet6": ("TCP6.inuse", "UDP6.inuse", "UDPLITE6.inuse", "RAW6.inuse"),
+    "tcp": ("TCP.inuse", "TCP.tw", "TCP6.inuse"),
+    "tcp4": ("TCP.inuse", "TCP.tw"),
+    "tcp6": ("TCP6.inuse",),
+    "udp": ("UDP.inuse", "UDP6.inuse"),
+    "udp4": ("UDP.inuse",),
+    "udp6": ("UDP6.inuse",),
+    "unix": ("UNIX.inuse",),
+}
 
 
 class NetworkCollector:
     """网络信息收集器"""
 
-    def __init__(self):
+    def __init__(self, procfs_path: str = "/proc"):
         self.last_bytes_sent = 0
         self.last_bytes_recv = 0
+        self.procfs_path = procfs_path
+        self._sockstat_files: Optional[List[ProcFile]] = None
 
-    def get_bytes_sent(self) -> float:
+    def get_bytes_sent(self, snapshot: Optional[KernelSnapshot] = None) -> float:
         """获取发送的字节数（MB）"""
+        if snapshot is not None:
+            return snapshot.net_bytes_sent / (1024 ** 2)
         counters = psutil.net_io_counters()
         return counters.bytes_sent / (1024 ** 2)
 
-    def get_bytes_recv(self) -> float:
+    def get_bytes_recv(self, snapshot: Optional[KernelSnapshot] = None) -> float:
         """获取接收的字节数（MB）"""
+        if snapshot is not None:
+            return snapshot.net_bytes_recv / (1024 ** 2)
         counters = psutil.net_io_counters()
         return counters.bytes_recv / (1024 ** 2)
 
+    def get_interface_io(self, snapshot: Optional[KernelSnapshot] = None) -> Dict[str, Tuple[float, float]]:
+        """获取每个网卡的(发送MB, 接收MB)"""
+        if snapshot is not None:
+            counters = snapshot.net_io_per_interface
+        else:
+            counters = {name: (nic.bytes_sent, nic.bytes_recv)
+                        for name, nic in psutil.net_io_counters(pernic=True).items()}
+        return {name: (sent / (1024 ** 2), recv / (1024 ** 2)) for name, (sent, recv) in counters.items()}
+
     def get_network_speed(self) -> Dict[str, float]:
         """获取网络速度"""
         current_counters = psutil.net_io_counters()
@@ -39,8 +91,86 @@ class NetworkCollector:
             "recv_speed": recv_speed,
         }
 
-    def get_connections_count(self, kind: str = 'all') -> int:
-        """获取连接数"""
+    def _open_sockstat(self) -> List[ProcFile]:
+        """打开sockstat文件，保持打开以便重复读取"""
+        if self._sockstat_files is None:
+            files = []
+            for name in ("sockstat", "sockstat6"):
+                path = os.path.join(self.procfs_path, "net", name)
+                if os.path.exists(path):
+                    files.append(ProcFile(path, 1024))
+            self._sockstat_files = files
+        return self._sockstat_files
+
+    def get_socket_summary(self) -> Dict[str, int]:
+        """
+        读取/proc/net/sockstat与sockstat6中的汇总计数
+
+        Returns:
+            以"协议.字段"为键的计数，如 {"TCP.inuse": 10, "TCP.tw": 2}
+        """
+        summary = {}
+        for proc_file in self._open_sockstat():
+            buf = proc_file.read()
+            for line in buf[:proc_file.size].splitlines():
+                protocol, _, rest = line.partition(b":")
+                fields = rest.split()
+                for index in range(0, len(fields) - 1, 2):
+                    key = f"{protocol.decode()}.{fields[index].decode()}"
+                    summary[key] = int(fields[index + 1])
+        return summary
+
+    def _count_unix_sockets(self) -> int:
+        """按块统计/proc/net/unix的行数，sockstat中没有unix套接字计数"""
+        count = -1  # 表头
+        try:
+            with open(os.path.join(self.procfs_path, "net", "unix"), "rb") as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    count += chunk.count(b"\n")
+        except FileNotFoundError:
+            return 0
+        return max(count, 0)
+
+    def get_tcp_states(self) -> Dict[str, int]:
+        """
+        统计各TCP连接状态的数量
+
+        逐行读取/proc/net/tcp与tcp6，只解析状态字段，不为每个连接创建对象
+        """
+        states: Dict[str, int] = {}
+        for name in ("tcp", "tcp6"):
+            path = os.path.join(self.procfs_path, "net", name)
+            try:
+                with open(path, "rb") as f:
+                    next(f, None)  # 表头
+                    for line in f:
+                        code = line.split(None, 4)[3]
+                        state = TCP_STATES.get(code, "UNKNOWN")
+                        states[state] = states.get(state, 0) + 1
+            except FileNotFoundError:
+                continue
+        return states
+
+    def get_connections_count(self, kind: str = 'all', method: str = 'auto') -> int:
+        """
+        获取连接数
+
+        Args:
+            kind: 连接类型，与psutil.net_connections的kind一致
+            method: 统计方式，sockstat读取内核汇总计数，enumerate逐个枚举连接，
+                    auto在支持时使用sockstat
+        """
+        if method not in ('auto', 'sockstat', 'enumerate'):
+            raise ValueError(f"不支持的统计方式: {method}")
+
+        if method != 'enumerate' and kind in SOCKSTAT_KINDS and self._open_sockstat():
+            summary = self.get_socket_summary()
+            if "UNIX.inuse" in SOCKSTAT_KINDS[kind]:
+                summary["UNIX.inuse"] = self._count_unix_sockets()
+            return sum(summary.get(key, 0) for key in SOCKSTAT_KINDS[kind])
+
+        if method == 'sockstat':
+            raise ValueError(f"sockstat不支持连接类型: {kind}")
         return len(psutil.net_connections(kind=kind))
 
     def get_interface_info(self) -> Dict[str, Any]:
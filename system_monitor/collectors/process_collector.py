@@ -2,31 +2,138 @@
 进程信息收集器
 """
 
+import heapq
+import time
 import psutil
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from .procfs import CLOCK_TICKS
+
+# 进程CPU时间以时钟滴答为单位，间隔至少10个滴答才计算使用率，量化误差不超过10%
+MIN_SAMPLE_INTERVAL = 10.0 / CLOCK_TICKS
+
+
+class _ProcessEntry:
+    """进程表条目，保存上次采样的CPU时间"""
+
+    __slots__ = ('process', 'create_time', 'name', 'cpu_time', 'sample_time',
+                 'cpu_percent', 'memory_percent')
+
+    def __init__(self, process: psutil.Process, create_time: float, name: str):
+        self.process = process
+        self.create_time = create_time
+        self.name = name
+        self.cpu_time: Optional[float] = None
+        self.sample_time = 0.0
+        self.cpu_percent = 0.0
+        self.memory_percent = 0.0
 
 
 class ProcessCollector:
     """进程信息收集器"""
 
-    def get_top_processes(self, count: int = 10) -> List[Dict[str, Any]]:
-        """获取占用资源最多的进程"""
-        processes = []
+    SORT_KEYS = ('cpu_percent', 'memory_percent')
 
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                processes.append(proc.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+    def __init__(self):
+        # 持久进程表，以(pid, create_time)识别同一进程
+        self._table: Dict[int, _ProcessEntry] = {}
+        self._memory_total = psutil.virtual_memory().total
+
+        # 建立CPU时间基线，间隔足够后获取即可按CPU使用率排序，之前为0
+        self.refresh()
+
+    def _new_entry(self, pid: int) -> Optional[_ProcessEntry]:
+        """为新出现的进程建立条目"""
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                return _ProcessEntry(process, process.create_time(), process.name())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+    def _update_entry(self, entry: _ProcessEntry, now: float) -> bool:
+        """
+        更新条目的CPU与内存使用率
+
+        Returns:
+            进程是否仍然存在
+        """
+        process = entry.process
+        try:
+            with process.oneshot():
+                # pid被复用时create_time不同，视为新进程
+                if process.create_time() != entry.create_time:
+                    return False
+                times = process.cpu_times()
+                rss = process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return False
+        except psutil.AccessDenied:
+            return True
+
+        cpu_time = times.user + times.system
+        if entry.cpu_time is None:
+            entry.cpu_time = cpu_time
+            entry.sample_time = now
+        elif now - entry.sample_time >= MIN_SAMPLE_INTERVAL:
+            # 间隔过短时保留上次的使用率，基线不前移
+            entry.cpu_percent = round(max(cpu_time - entry.cpu_time, 0.0) / (now - entry.sample_time) * 100, 1)
+            entry.cpu_time = cpu_time
+            entry.sample_time = now
+        entry.memory_percent = rss / self._memory_total * 100 if self._memory_total else 0.0
+        return True
+
+    def refresh(self):
+        """刷新进程表：更新存活进程、加入新进程、移除已退出的进程"""
+        now = time.monotonic()
+        pids = psutil.pids()
+        table = self._table
+
+        for pid in set(table) - set(pids):
+            del table[pid]
+
+        for pid in pids:
+            entry = table.get(pid)
+            if entry is not None and self._update_entry(entry, now):
+                continue
+
+            entry = self._new_entry(pid)
+            if entry is None or not self._update_entry(entry, now):
+                table.pop(pid, None)
+                continue
+            table[pid] = entry
+
+    def get_top_processes(self, count: int = 10, sort_by: str = 'cpu_percent') -> List[Dict[str, Any]]:
+        """
+        获取占用资源最多的进程
+
+        Args:
+            count: 返回的进程数
+            sort_by: 排序字段，cpu_percent或memory_percent
+        """
+        if sort_by not in self.SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_by}")
+
+        self.refresh()
 
-        # 按CPU使用率排序
-        processes.sort(key=lambda x: x.get('cpu_percent', 0), reverse=True)
+        if sort_by == 'cpu_percent':
+            top = heapq.nlargest(count, self._table.items(), key=lambda item: item[1].cpu_percent)
+        else:
+            top = heapq.nlargest(count, self._table.items(), key=lambda item: item[1].memory_percent)
 
-        return processes[:count]
+        return [
+            {
+                'pid': pid,
+                'name': entry.name,
+                'cpu_percent': entry.cpu_percent,
+                'memory_percent': entry.memory_percent,
+            }
+            for pid, entry in top
+        ]
 
     def get_process_count(self) -> int:
         """获取进程总数"""
-        return len(list(psutil.process_iter()))
+        return len(psutil.pids())
 
     def get_process_by_name(self, name: str) -> List[Dict[str, Any]]:
         """根据进程名查找进程"""
@@ -0,0 +1,144 @@
+"""
+Linux /proc 快速读取后端
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+# /proc/stat 中的时间单位（时钟滴答）
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def is_available(procfs_path: str = "/proc") -> bool:
+    """当前系统是否可以使用/proc后端"""
+    return hasattr(os, "preadv") and os.access(os.path.join(procfs_path, "stat"), os.R_OK)
+
+
+class ProcFile:
+    """保持打开的/proc文件，每次用os.preadv从头读入复用的缓冲区"""
+
+    def __init__(self, path: str, bufsize: int = 8192):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        self.buf = bytearray(bufsize)
+        self.size = 0
+
+    def read(self) -> bytearray:
+        """
+        读取文件全部内容
+
+        Returns:
+            复用的缓冲区，有效数据长度为self.size
+        """
+        while True:
+            self.size = os.preadv(self.fd, [self.buf], 0)
+            if self.size < len(self.buf):
+                return self.buf
+            # 缓冲区不足（如CPU核心很多），扩容后重读
+            self.buf = bytearray(len(self.buf) * 2)
+
+    def close(self):
+        """关闭文件"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __del__(self):
+        try:
+            self.close()
+        except OSError:
+            pass
+
+
+def _field(buf: bytearray, size: int, key: bytes, default: Optional[int] = None) -> Optional[int]:
+    """在meminfo格式的缓冲区中查找字段值"""
+    start = buf.find(key, 0, size)
+    if start < 0:
+        return default
+    end = buf.find(b"\n", start, size)
+    return int(buf[start + len(key):end].split()[0])
+
+
+class ProcfsReader:
+    """直接解析/proc的读取器，只解析需要的字段"""
+
+    def __init__(self, procfs_path: str = "/proc"):
+        self._stat = ProcFile(os.path.join(procfs_path, "stat"), 16384)
+        self._meminfo = ProcFile(os.path.join(procfs_path, "meminfo"))
+        self._net_dev = ProcFile(os.path.join(procfs_path, "net", "dev"))
+        self._loadavg = ProcFile(os.path.join(procfs_path, "loadavg"), 256)
+
+    def read_cpu_times(self) -> List[Tuple[float, float]]:
+        """读取每个核心的(忙碌时间, 总时间)，单位秒"""
+        buf = self._stat.read()
+        size = self._stat.size
+        percpu = []
+
+        # 跳过第一行的总体数据，总体值由各核心累加得到
+        pos = buf.find(b"\ncpu", 0, size)
+        while pos >= 0:
+            end = buf.find(b"\n", pos + 1, size)
+            fields = buf[pos + 1:end].split()
+            # user nice system idle iowait irq softirq steal（guest已计入user/nice）
+            values = [int(value) for value in fields[1:9]]
+            total = sum(values) / CLOCK_TICKS
+            idle = (values[3] + values[4]) / CLOCK_TICKS
+            percpu.append((total - idle, total))
+            pos = buf.find(b"\ncpu", end, size)
+
+        return percpu
+
+    def read_memory(self) -> Tuple[int, int, int, float]:
+        """读取内存(总量, 已用, 可用, 使用率)，与psutil.virtual_memory一致"""
+        buf = self._meminfo.read()
+        size = self._meminfo.size
+
+        total = _field(buf, size, b"MemTotal:") * 1024
+        available = _field(buf, size, b"MemAvailable:", 0) * 1024
+        if available <= 0:
+            # 旧内核没有MemAvailable
+            free = _field(buf, size, b"MemFree:", 0)
+            buffers = _field(buf, size, b"Buffers:", 0)
+            cached = _field(buf, size, b"Cached:", 0) + _field(buf, size, b"SReclaimable:", 0)
+            available = (free + buffers + cached) * 1024
+        available = min(available, total)
+
+        used = total - available
+        percent = round(used / total * 100, 1) if total else 0.0
+        return total, used, available, percent
+
+    def read_net_io(self) -> Tuple[int, int]:
+        """读取所有网卡的(发送字节数, 接收字节数)"""
+        counters = self.read_net_io_per_interface()
+        return sum(sent for sent, _ in counters.values()), sum(recv for _, recv in counters.values())
+
+    def read_net_io_per_interface(self) -> Dict[str, Tuple[int, int]]:
+        """读取每个网卡的(发送字节数, 接收字节数)"""
+        buf = self._net_dev.read()
+        size = self._net_dev.size
+        counters = {}
+
+        # 前两行为表头
+        pos = buf.find(b"\n", buf.find(b"\n", 0, size) + 1, size)
+        while 0 <= pos < size - 1:
+            end = buf.find(b"\n", pos + 1, size)
+            if end < 0:
+                end = size
+            colon = buf.rfind(b":", pos, end)
+            fields = buf[colon + 1:end].split()
+            name = bytes(buf[pos + 1:colon]).strip().decode("ascii", "replace")
+            counters[name] = (int(fields[8]), int(fields[0]))
+            pos = end
+
+        return counters
+
+    def read_loadavg(self) -> Tuple[float, float, float]:
+        """读取1、5、15分钟平均负载"""
+        buf = self._loadavg.read()
+        fields = buf[:self._loadavg.size].split()
+        return float(fields[0]), float(fields[1]), float(fields[2])
+
+    def close(self):
+        """关闭所有文件"""
+        for proc_file in (self._stat, self._meminfo, self._net_dev, self._loadavg):
+            proc_file.close()
\ No newline at end of file
@@ -0,0 +1,325 @@
+"""
+按PID分片的多进程进程采样器，用于进程数极多的主机
+"""
+
+import heapq
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+from .process_collector import MIN_SAMPLE_INTERVAL
+from .procfs import CLOCK_TICKS
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# 内核截断进程名的长度（TASK_COMM_LEN - 1），达到该长度的进程名需要另外补全
+_COMM_LENGTH = 15
+
+# 分片内每个进程的CPU时间基线与上次的使用率：(启动时间, CPU时间滴答数, 采样时刻, CPU使用率)
+_ShardState = Dict[int, Tuple[int, int, float, float]]
+
+# 分片返回的进程条目：(pid, 进程名, CPU使用率, 常驻内存字节数)
+_Entry = Tuple[int, str, float, int]
+
+
+@dataclass
+class ShardResult:
+    """一个分片的采样结果"""
+    top: List[_Entry] = field(default_factory=list)
+    processes: int = 0
+    threads: int = 0
+    cpu_percent: float = 0.0
+    rss: int = 0
+
+
+@dataclass
+class ProcessSample:
+    """合并后的进程采样结果"""
+    top_processes: List[Dict[str, Any]]
+    process_count: int
+    thread_count: int
+    cpu_percent: float
+    memory_rss: int
+
+
+def _sort_key(sort_by: str):
+    """排序键，值相同时按pid排序，保证分片方式不影响结果"""
+    index = 2 if sort_by == "cpu_percent" else 3
+    return lambda entry: (entry[index], -entry[0])
+
+
+def _read_stat(procfs_path: str, pid: int) -> Optional[bytes]:
+    try:
+        fd = os.open(f"{procfs_path}/{pid}/stat", os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 4096)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def list_pids(procfs_path: str) -> List[int]:
+    """列出/proc中的所有pid"""
+    return [int(name) for name in os.listdir(procfs_path) if name.isdigit()]
+
+
+def sample_shard(state: _ShardState, procfs_path: str, pids: List[int],
+                 count: int, sort_by: str) -> ShardResult:
+    """
+    采样一个分片的进程
+
+    只读取/proc/[pid]/stat：其中的rss与statm的resident是同一计数，
+    CPU时间与psutil.Process.cpu_times()相同，启动时间用于识别pid复用
+
+    Args:
+        state: 分片的上次采样状态，原地更新
+        procfs_path: /proc路径
+        pids: 分片的pid，由主进程列出/proc后分配
+        count: 返回的进程数
+        sort_by: 排序字段，cpu_percent或memory_percent
+    """
+    result = ShardResult()
+    entries: List[_Entry] = []
+    previous = dict(state)
+    state.clear()
+
+    for pid in pids:
+        data = _read_stat(procfs_path, pid)
+        if not data:
+            continue
+        now = time.monotonic()
+
+        # 进程名可能包含空格和括号，以最后一个')'为界
+        close = data.rfind(b")")
+        fields = data[close + 2:].split()
+        try:
+            ticks = int(fields[11]) + int(fields[12])
+            threads = int(fields[17])
+            start_time = int(fields[19])
+            rss = int(fields[21]) * PAGE_SIZE
+        except (IndexError, ValueError):
+            continue
+
+        last = previous.get(pid)
+        # 启动时间不同说明pid被复用，视为新进程
+        if last is None or last[0] != start_time:
+            cpu_percent = 0.0
+            state[pid] = (start_time, ticks, now, cpu_percent)
+        elif now - last[2] >= MIN_SAMPLE_INTERVAL:
+            cpu_percent = round(max(ticks - last[1], 0) / CLOCK_TICKS / (now - last[2]) * 100, 1)
+            state[pid] = (start_time, ticks, now, cpu_percent)
+        else:
+            # 间隔过短时保留上次的使用率，基线不前移
+            cpu_percent = last[3]
+            state[pid] = last
+
+        comm = data[data.find(b"(") + 1:close].decode("utf-8", "replace")
+        entries.append((pid, comm, cpu_percent, rss))
+        result.processes += 1
+        result.threads += threads
+        result.cpu_percent += cpu_percent
+        result.rss += rss
+
+    result.top = heapq.nlargest(count, entries, key=_sort_key(sort_by))
+    return result
+
+
+def _worker(conn, procfs_path: str):
+    """工作进程：持有一个分片的状态，按请求中的pid采样，采样出错时把异常发回主进程"""
+    state: _ShardState = {}
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        try:
+            result = sample_shard(state, procfs_path, *request)
+        except Exception as e:
+            result = e
+        conn.send(result)
+    conn.close()
+
+
+def _read_memory_total(procfs_path: str) -> int:
+    try:
+        with open(os.path.join(procfs_path, "meminfo"), "rb") as f:
+            for line in f:
+                if line.startswith(b"MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return psutil.virtual_memory().total
+
+
+class ShardedProcessSampler:
+    """
+    按PID分片的进程采样器
+
+    主进程每次采样只列出一次/proc，把pid % workers == shard的进程随请求发给
+    对应的工作进程；工作进程直接读取/proc/[pid]/stat并保存各自进程的上次
+    CPU时间，并行返回前N个进程和汇总值，在主进程中合并。
+    接口与ProcessCollector相同，可直接替换。
+    工作进程意外退出时自动重启，重启的分片在当次采样中CPU使用率为0
+    """
+
+    SORT_KEYS = ('cpu_percent', 'memory_percent')
+
+    def __init__(self, workers: Optional[int] = None, procfs_path: str = "/proc"):
+        """
+        初始化采样器
+
+        Args:
+            workers: 工作进程数，默认为CPU核心数；1表示在当前进程中采样
+            procfs_path: /proc路径
+        """
+        if not os.path.isdir(procfs_path):
+            raise ValueError(f"不支持的系统，找不到{procfs_path}")
+
+        self.workers = max(workers or os.cpu_count() or 1, 1)
+        self.procfs_path = procfs_path
+        self._memory_total = _read_memory_total(procfs_path)
+        self._state: _ShardState = {}
+        self._connections = []
+        self._processes = []
+        self.restarts = 0
+
+        if self.workers > 1:
+            for _ in range(self.workers):
+                conn, process = self._start_worker()
+                self._connections.append(conn)
+                self._processes.append(process)
+        # 建立CPU时间基线，间隔足够后的采样即可得到有效的使用率
+        self._collect(0, "cpu_percent")
+
+    def _start_worker(self):
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_worker, args=(child, self.procfs_path), daemon=True)
+        process.start()
+        child.close()
+        return parent, process
+
+    def _restart(self, shard: int):
+        """重启退出的工作进程"""
+        self._connections[shard].close()
+        if self._processes[shard].is_alive():
+            self._processes[shard].terminate()
+        self._processes[shard].join(1)
+        self._connections[shard], self._processes[shard] = self._start_worker()
+        self.restarts += 1
+
+    def _collect(self, count: int, sort_by: str) -> List[ShardResult]:
+        pids = list_pids(self.procfs_path)
+        if not self._connections:
+            return [sample_shard(self._state, self.procfs_path, pids, count, sort_by)]
+
+        # 按pid取模分配，同一进程始终由同一工作进程采样，保留其CPU时间基线
+        slices: List[List[int]] = [[] for _ in self._connections]
+        for pid in pids:
+            slices[pid % self.workers].append(pid)
+
+        alive = []
+        for shard, conn in enumerate(self._connections):
+            try:
+                conn.send((slices[shard], count, sort_by))
+                alive.append(True)
+            except OSError:
+                alive.append(False)
+
+        results = []
+        error: Optional[Exception] = None
+        for shard, conn in enumerate(self._connections):
+            result = None
+            if alive[shard]:
+                try:
+                    result = conn.recv()
+                except (EOFError, OSError):
+                    pass
+            if result is None:
+                # 工作进程已退出：重启，本次在主进程中采样该分片（没有上次的CPU时间）
+                self._restart(shard)
+                result = sample_shard({}, self.procfs_path, slices[shard], count, sort_by)
+            elif isinstance(result, Exception):
+                # 先读完所有分片的结果，保持各管道的请求与应答一一对应
+                error = error or result
+            results.append(result)
+        if error is not None:
+            raise error
+        return results
+
+    def _full_name(self, pid: int, name: str) -> str:
+        """补全被内核截断的进程名，与psutil.Process.name()一致"""
+        if len(name) < _COMM_LENGTH or self.procfs_path != "/proc":
+            return name
+        try:
+            return psutil.Process(pid).name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return name
+
+    def sample(self, count: int = 10, sort_by: str = 'cpu_percent') -> ProcessSample:
+        """
+        采样所有进程
+
+        Args:
+            count: 返回的进程数
+            sort_by: 排序字段，cpu_percent或memory_percent
+        """
+        if sort_by not in self.SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_by}")
+
+        results = self._collect(count, sort_by)
+        top = heapq.nlargest(count, (entry for result in results for entry in result.top),
+                             key=_sort_key(sort_by))
+        memory_total = self._memory_total
+        return ProcessSample(
+            top_processes=[
+                {
+                    'pid': pid,
+                    'name': self._full_name(pid, name),
+                    'cpu_percent': cpu_percent,
+                    'memory_percent': rss / memory_total * 100 if memory_total else 0.0,
+                }
+                for pid, name, cpu_percent, rss in top
+            ],
+            process_count=sum(result.processes for result in results),
+            thread_count=sum(result.threads for result in results),
+            cpu_percent=round(sum(result.cpu_percent for result in results), 1),
+            memory_rss=sum(result.rss for result in results),
+        )
+
+    def get_top_processes(self, count: int = 10, sort_by: str = 'cpu_percent') -> List[Dict[str, Any]]:
+        """获取占用资源最多的进程"""
+        return self.sample(count, sort_by).top_processes
+
+    def get_process_count(self) -> int:
+        """获取进程总数"""
+        return len(list_pids(self.procfs_path))
+
+    def close(self):
+        """停止工作进程"""
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self) -> "ShardedProcessSampler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
\ No newline at end of file
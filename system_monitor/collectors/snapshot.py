@@ -0,0 +1,117 @@
+"""
+内核数据快照
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import psutil
+
+from . import procfs
+
+
+@dataclass
+class KernelSnapshot:
+    """单次采样的内核原始数据快照"""
+    timestamp: datetime
+    monotonic: float
+    cpu_times: Tuple[float, float]
+    cpu_times_percpu: List[Tuple[float, float]]
+    memory_total: int
+    memory_used: int
+    memory_available: int
+    memory_percent: float
+    net_bytes_sent: int
+    net_bytes_recv: int
+    load_avg: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    # 每个网卡的(发送字节数, 接收字节数)
+    net_io_per_interface: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+
+def cpu_times_pair(times) -> Tuple[float, float]:
+    """将cpu_times转换为(忙碌时间, 总时间)"""
+    total = sum(times)
+    # Linux下guest时间已计入user/nice，避免重复计算
+    total -= getattr(times, 'guest', 0) + getattr(times, 'guest_nice', 0)
+    idle = times.idle + getattr(times, 'iowait', 0)
+    return total - idle, total
+
+
+class SnapshotReader:
+    """快照读取器，每个数据源每次采样只读取一次"""
+
+    BACKENDS = ("auto", "procfs", "psutil")
+
+    def __init__(self, backend: str = "auto"):
+        """
+        初始化快照读取器
+
+        Args:
+            backend: 数据源后端，auto在Linux上优先使用/proc，否则使用psutil
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"不支持的后端: {backend}")
+
+        self._procfs = None
+        if backend == "procfs" or (backend == "auto" and procfs.is_available()):
+            try:
+                self._procfs = procfs.ProcfsReader()
+            except OSError:
+                if backend == "procfs":
+                    raise
+        self.backend = "procfs" if self._procfs else "psutil"
+
+    def read(self) -> KernelSnapshot:
+        """读取一次快照"""
+        if self._procfs is not None:
+            return self._read_procfs()
+        return self._read_psutil()
+
+    def _read_procfs(self) -> KernelSnapshot:
+        """通过/proc快速路径读取快照"""
+        reader = self._procfs
+        percpu = reader.read_cpu_times()
+        total, used, available, percent = reader.read_memory()
+        interfaces = reader.read_net_io_per_interface()
+
+        return KernelSnapshot(
+            timestamp=datetime.now(),
+            monotonic=time.monotonic(),
+            cpu_times=(sum(pair[0] for pair in percpu), sum(pair[1] for pair in percpu)),
+            cpu_times_percpu=percpu,
+            memory_total=total,
+            memory_used=used,
+            memory_available=available,
+            memory_percent=percent,
+            net_bytes_sent=sum(sent for sent, _ in interfaces.values()),
+            net_bytes_recv=sum(recv for _, recv in interfaces.values()),
+            load_avg=reader.read_loadavg(),
+            net_io_per_interface=interfaces,
+        )
+
+    def _read_psutil(self) -> KernelSnapshot:
+        """通过psutil读取快照"""
+        # 总体CPU时间由各核心累加得到，/proc/stat只需读取一次
+        percpu = [cpu_times_pair(times) for times in psutil.cpu_times(percpu=True)]
+        virtual = psutil.virtual_memory()
+        # 总量由各网卡累加得到，只读取一次/proc/net/dev
+        pernic = psutil.net_io_counters(pernic=True) or {}
+        interfaces = {name: (counters.bytes_sent, counters.bytes_recv) for name, counters in pernic.items()}
+
+        return KernelSnapshot(
+            timestamp=datetime.now(),
+            monotonic=time.monotonic(),
+            cpu_times=(sum(busy for busy, _ in percpu), sum(total for _, total in percpu)),
+            cpu_times_percpu=percpu,
+            memory_total=virtual.total,
+            memory_used=virtual.used,
+            memory_available=virtual.available,
+            memory_percent=virtual.percent,
+            net_bytes_sent=sum(sent for sent, _ in interfaces.values()),
+            net_bytes_recv=sum(recv for _, recv in interfaces.values()),
+            load_avg=os.getloadavg() if hasattr(os, "getloadavg") else (0.0, 0.0, 0.0),
+            net_io_per_interface=interfaces,
+        )
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+进程关注列表：持续跟踪指定进程的资源使用率
+"""
+
+import fnmatch
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+# 按名称关注的进程多久重新扫描一次进程列表（秒），以发现新启动的进程
+DEFAULT_RESCAN_INTERVAL = 10.0
+
+_GONE = (psutil.NoSuchProcess, psutil.ZombieProcess)
+
+
+@dataclass
+class WatchedProcess:
+    """关注进程的一次采样，速率为与上次采样之间的平均值"""
+    label: str
+    pid: Optional[int]
+    name: str
+    running: bool
+    cpu_percent: float = 0.0
+    memory_rss: int = 0
+    num_threads: int = 0
+    num_fds: Optional[int] = None
+    read_bytes_per_sec: Optional[float] = None
+    write_bytes_per_sec: Optional[float] = None
+    ctx_switches_per_sec: float = 0.0
+    restarts: int = 0
+
+
+class _Handle:
+    """保持的进程句柄及上次采样的累计值"""
+
+    __slots__ = ('process', 'create_time', 'name', 'cpu_time', 'io', 'ctx_switches', 'sample_time')
+
+    def __init__(self, process: psutil.Process, create_time: float, name: str):
+        self.process = process
+        self.create_time = create_time
+        self.name = name
+        self.cpu_time: Optional[float] = None
+        self.io: Optional[Tuple[int, int]] = None
+        self.ctx_switches = 0
+        self.sample_time = 0.0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def read(self, label: str, restarts: int) -> Optional[WatchedProcess]:
+        """
+        在oneshot()中一次读取进程的所有数据
+
+        Returns:
+            采样结果，进程已退出（或pid被复用）时返回None
+        """
+        process = self.process
+        try:
+            with process.oneshot():
+                if process.create_time() != self.create_time:
+                    return None
+                times = process.cpu_times()
+                rss = process.memory_info().rss
+                threads = process.num_threads()
+                ctx = process.num_ctx_switches()
+                try:
+                    counters = process.io_counters()
+                    io = (counters.read_bytes, counters.write_bytes)
+                except (psutil.AccessDenied, AttributeError):
+                    io = None
+                try:
+                    fds = process.num_fds()
+                except (psutil.AccessDenied, AttributeError):
+                    fds = None
+        except _GONE:
+            return None
+        except psutil.AccessDenied:
+            return WatchedProcess(label, self.pid, self.name, True, restarts=restarts)
+
+        now = time.monotonic()
+        cpu_time = times.user + times.system
+        ctx_switches = ctx.voluntary + ctx.involuntary
+        sample = WatchedProcess(label, self.pid, self.name, True, memory_rss=rss, num_threads=threads,
+                                num_fds=fds, restarts=restarts)
+
+        elapsed = now - self.sample_time
+        if self.cpu_time is not None and elapsed > 0:
+            sample.cpu_percent = round(max(cpu_time - self.cpu_time, 0.0) / elapsed * 100, 1)
+            sample.ctx_switches_per_sec = max(ctx_switches - self.ctx_switches, 0) / elapsed
+            if io is not None and self.io is not None:
+                sample.read_bytes_per_sec = max(io[0] - self.io[0], 0) / elapsed
+                sample.write_bytes_per_sec = max(io[1] - self.io[1], 0) / elapsed
+        elif io is not None:
+            sample.read_bytes_per_sec = sample.write_bytes_per_sec = 0.0
+
+        self.cpu_time = cpu_time
+        self.ctx_switches = ctx_switches
+        self.io = io
+        self.sample_time = now
+        return sample
+
+
+def _attach(pid: int) -> Optional[_Handle]:
+    try:
+        process = psutil.Process(pid)
+        with process.oneshot():
+            return _Handle(process, process.create_time(), process.name())
+    except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+        return None
+
+
+def _read_pidfile(path: str) -> Optional[int]:
+    try:
+        with open(path, 'r') as f:
+            return int(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Target:
+    """一个关注项：固定pid、进程名模式或pid文件"""
+
+    __slots__ = ('kind', 'value', 'label', 'handles', 'restarts', 'lost', 'scanned_at')
+
+    def __init__(self, kind: str, value, label: str):
+        self.kind = kind
+        self.value = value
+        self.label = label
+        self.handles: Dict[int, _Handle] = {}
+        self.restarts = 0
+        # 曾经关注的进程已退出，下次附加到新进程时计为一次重启
+        self.lost = False
+        self.scanned_at = -float('inf')
+
+    def attach(self, handle: _Handle):
+        self.handles[handle.pid] = handle
+        if self.lost:
+            self.restarts += 1
+            self.lost = False
+
+
+class ProcessWatchlist:
+    """
+    进程关注列表
+
+    对每个关注的进程保持psutil.Process句柄，每次采样在oneshot()中读取一次，
+    用与上次采样的差值计算CPU、I/O和上下文切换速率。
+    进程名和pid文件方式的关注项在进程重启后自动附加到新进程
+    """
+
+    def __init__(self, rescan_interval: float = DEFAULT_RESCAN_INTERVAL):
+        """
+        初始化关注列表
+
+        Args:
+            rescan_interval: 按名称关注时重新扫描进程列表的间隔（秒）；
+                             没有匹配的存活进程时每次采样都扫描
+        """
+        self.rescan_interval = rescan_interval
+        self._targets: Dict[str, _Target] = {}
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self._targets)
+
+    def add(self, pid: Optional[int] = None, name: Optional[str] = None, pidfile: Optional[str] = None,
+            label: Optional[str] = None) -> str:
+        """
+        加入一个关注项，pid、name、pidfile三者指定其一
+
+        Args:
+            pid: 进程ID，进程退出后不会重新附加
+            name: 进程名，支持*和?通配符，匹配的所有进程都会被关注
+            pidfile: pid文件路径，每次采样重新读取，进程重启后跟随新的pid
+            label: 关注项名称，默认为pid、进程名模式或pid文件名
+
+        Returns:
+            关注项名称
+        """
+        if sum(value is not None for value in (pid, name, pidfile)) != 1:
+            raise ValueError("pid、name、pidfile必须且只能指定一个")
+
+        if pid is not None:
+            target = _Target('pid', int(pid), label or str(pid))
+            handle = _attach(int(pid))
+            if handle is None:
+                raise ValueError(f"进程不存在: {pid}")
+            target.attach(handle)
+        elif name is not None:
+            target = _Target('name', name, label or name)
+        else:
+            target = _Target('pidfile', pidfile, label or os.path.splitext(os.path.basename(pidfile))[0])
+
+        if target.label in self._targets:
+            raise ValueError(f"关注项已存在: {target.label}")
+        self._targets[target.label] = target
+        return target.label
+
+    def remove(self, label: str):
+        """移除关注项"""
+        if self._targets.pop(label, None) is None:
+            raise KeyError(label)
+
+    def _resolve_pidfile(self, target: _Target):
+        """pid文件中的pid变化时附加到新进程"""
+        pid = _read_pidfile(target.value)
+        if pid is None or pid in target.handles:
+            return
+        if target.handles:
+            target.handles.clear()
+            target.lost = True
+        handle = _attach(pid)
+        if handle is not None:
+            target.attach(handle)
+
+    def _rescan(self, targets: List[_Target], now: float):
+        """一次遍历进程列表，为所有需要扫描的名称关注项附加新进程"""
+        for process in psutil.process_iter(['name']):
+            name = process.info['name'] or ''
+            for target in targets:
+                if process.pid not in target.handles and fnmatch.fnmatchcase(name, target.value):
+                    handle = _attach(process.pid)
+                    if handle is not None:
+                        target.attach(handle)
+        for target in targets:
+            target.scanned_at = now
+
+    def sample(self) -> List[WatchedProcess]:
+        """
+        采样所有关注的进程
+
+        Returns:
+            每个存活进程一项；没有存活进程的关注项返回一项running=False的结果
+        """
+        now = time.monotonic()
+        rescan = []
+        for target in self._targets.values():
+            if target.kind == 'pidfile':
+                self._resolve_pidfile(target)
+            elif target.kind == 'name' and (not target.handles or now - target.scanned_at >= self.rescan_interval):
+                rescan.append(target)
+        if rescan:
+            self._rescan(rescan, now)
+
+        results = []
+        for target in self._targets.values():
+            for pid, handle in list(target.handles.items()):
+                sample = handle.read(target.label, target.restarts)
+                if sample is None:
+                    del target.handles[pid]
+                    target.lost = True
+                else:
+                    results.append(sample)
+            if not target.handles:
+                pid = target.value if target.kind == 'pid' else None
+                results.append(WatchedProcess(target.label, pid, '', False, restarts=target.restarts))
+        return results
\ No newline at end of file
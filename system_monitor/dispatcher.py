@@ -0,0 +1,263 @@
+"""
+回调分发器
+"""
+
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class DropPolicy(Enum):
+    """订阅者队列满时的处理策略"""
+    BLOCK = "block"              # 阻塞发布方直到队列有空位
+    DROP_OLDEST = "drop_oldest"  # 丢弃队列中最旧的数据
+    DROP_NEWEST = "drop_newest"  # 丢弃新到达的数据
+    COALESCE = "coalesce"        # 只保留最新的一条数据
+
+
+# 订阅者已取消时take()的返回值
+_CLOSED = object()
+
+_subscriber_ids = itertools.count(1)
+
+
+@dataclass
+class SubscriberStats:
+    """订阅者统计"""
+    depth: int = 0
+    max_depth: int = 0
+    published: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+
+
+class Subscriber:
+    """订阅者，持有独立的有界队列"""
+
+    def __init__(self, callback: Callable[[Any], None], maxsize: int = 1000,
+                 policy: DropPolicy = DropPolicy.DROP_OLDEST):
+        """
+        初始化订阅者
+
+        Args:
+            callback: 回调函数
+            maxsize: 队列容量，COALESCE策略下固定为1
+            policy: 队列满时的处理策略
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize必须大于0")
+
+        self.callback = callback
+        self.policy = policy
+        self.maxsize = 1 if policy is DropPolicy.COALESCE else maxsize
+        self.stats = SubscriberStats()
+        self.active = True
+        self.id = next(_subscriber_ids)
+
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._scheduled = False
+        # 是否有工作线程正在调用回调
+        self._running = False
+
+    @property
+    def name(self) -> str:
+        """订阅者名称，带编号以区分同名的回调"""
+        return f"{getattr(self.callback, '__qualname__', repr(self.callback))}#{self.id}"
+
+    def offer(self, item: Any) -> bool:
+        """
+        放入一条数据
+
+        Returns:
+            是否需要将订阅者加入待处理队列
+        """
+        with self._lock:
+            if not self.active:
+                return False
+            self.stats.published += 1
+
+            if len(self._queue) >= self.maxsize:
+                if self.policy is DropPolicy.BLOCK:
+                    while len(self._queue) >= self.maxsize and self.active:
+                        self._not_full.wait(0.1)
+                    if not self.active:
+                        self.stats.dropped += 1
+                        return False
+                elif self.policy is DropPolicy.DROP_NEWEST:
+                    self.stats.dropped += 1
+                    return False
+                else:
+                    self._queue.popleft()
+                    self.stats.dropped += 1
+
+            self._queue.append(item)
+            self.stats.depth = len(self._queue)
+            self.stats.max_depth = max(self.stats.max_depth, self.stats.depth)
+
+            if self._scheduled:
+                return False
+            self._scheduled = True
+            return True
+
+    def take(self) -> Any:
+        """取出一条数据，订阅者已取消或队列为空时返回_CLOSED"""
+        with self._lock:
+            if not self.active or not self._queue:
+                return _CLOSED
+            item = self._queue.popleft()
+            self.stats.depth = len(self._queue)
+            self._running = True
+            self._not_full.notify()
+            return item
+
+    @property
+    def pending(self) -> bool:
+        """是否有待处理或正在处理的数据"""
+        with self._lock:
+            return bool(self._queue) or self._scheduled
+
+    def reset_schedule(self) -> bool:
+        """重新启动分发器时重置调度状态，返回是否有待处理数据"""
+        with self._lock:
+            if self._running:
+                # 上次停止时超时未退出的线程仍在调用回调，由它完成后重新排队
+                return False
+            self._scheduled = bool(self._queue) and self.active
+            return self._scheduled
+
+    def reschedule(self) -> bool:
+        """处理完一条数据后判断是否仍有待处理数据"""
+        with self._lock:
+            self._running = False
+            if self._queue and self.active:
+                return True
+            self._scheduled = False
+            return False
+
+    def close(self):
+        """关闭订阅者，丢弃未处理的数据并唤醒阻塞的发布方"""
+        with self._lock:
+            self.active = False
+            self.stats.dropped += len(self._queue)
+            self._queue.clear()
+            self.stats.depth = 0
+            self._not_full.notify_all()
+
+
+class CallbackDispatcher:
+    """回调分发器，通过工作线程池异步调用各订阅者"""
+
+    def __init__(self, workers: int = 2):
+        """
+        初始化分发器
+
+        Args:
+            workers: 工作线程数
+        """
+        self.workers = max(1, workers)
+        self.subscribers: List[Subscriber] = []
+        self._ready: "queue.Queue[Optional[Subscriber]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """是否正在运行"""
+        return bool(self._threads)
+
+    def subscribe(self, callback: Callable[[Any], None], maxsize: int = 1000,
+                  policy: DropPolicy = DropPolicy.DROP_OLDEST) -> Subscriber:
+        """添加订阅者"""
+        subscriber = Subscriber(callback, maxsize=maxsize, policy=policy)
+        with self._lock:
+            self.subscribers = self.subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, callback: Callable[[Any], None]):
+        """移除订阅者"""
+        with self._lock:
+            removed = [s for s in self.subscribers if s.callback == callback]
+            self.subscribers = [s for s in self.subscribers if s.callback != callback]
+        for subscriber in removed:
+            subscriber.close()
+
+    def publish(self, item: Any):
+        """向所有订阅者发布数据"""
+        for subscriber in self.subscribers:
+            if subscriber.active and subscriber.offer(item):
+                self._ready.put(subscriber)
+
+    def start(self):
+        """启动工作线程"""
+        if self._threads:
+            return
+
+        # 上次停止时未处理完的数据重新排队
+        with self._lock:
+            ready: "queue.Queue[Optional[Subscriber]]" = queue.Queue()
+            self._ready = ready
+            for subscriber in self.subscribers:
+                if subscriber.reset_schedule():
+                    ready.put(subscriber)
+
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                args=(ready,),
+                name=f"callback-worker-{index}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 2.0):
+        """等待已排队的数据处理完毕（最多timeout秒）后停止工作线程"""
+        deadline = time.monotonic() + timeout
+        while self._threads and time.monotonic() < deadline:
+            if not any(subscriber.pending for subscriber in self.subscribers):
+                break
+            time.sleep(0.01)
+
+        for _ in self._threads:
+            self._ready.put(None)
+        for thread in self._threads:
+            thread.join(timeout=max(deadline - time.monotonic(), 0.1))
+        self._threads = []
+
+    def _worker(self, ready: "queue.Queue[Optional[Subscriber]]"):
+        """
+        工作线程：每次取出一个订阅者处理一条数据，保证同一订阅者按顺序执行
+
+        线程只从启动时的队列取数据；停止时超时未退出的线程在分发器重新启动后
+        处理完当前回调即退出，不加入新的线程池
+        """
+        while True:
+            subscriber = ready.get()
+            if subscriber is None or ready is not self._ready:
+                break
+
+            item = subscriber.take()
+            if item is not _CLOSED:
+                try:
+                    subscriber.callback(item)
+                    subscriber.stats.delivered += 1
+                except Exception as e:
+                    subscriber.stats.errors += 1
+                    print(f"Callback error: {e}")
+
+            # 与start()互斥，重新启动后排入新的队列
+            with self._lock:
+                if subscriber.reschedule():
+                    self._ready.put(subscriber)
+
+    def get_stats(self) -> Dict[str, SubscriberStats]:
+        """获取各订阅者的队列深度与丢弃统计，键为带编号的订阅者名称"""
+        return {subscriber.name: subscriber.stats for subscriber in self.subscribers}
\ No newline at end of file
@@ -5,11 +5,25 @@
 
 
 __all__ = [
+    'ArchiveExporter',
+    'ArchiveReader',
     'ConsoleExporter',
     'CSVExporter',
     'JSONExporter',
+    'PrometheusExporter',
+    'UDPExporter',
 ]
 
+from .archive_exporter import ArchiveExporter, ArchiveReader
 from .console_exporter import ConsoleExporter
 from .csv_exporter import CSVExporter
-from .json_exporter import JSONExporter
\ No newline at end of file
+from .json_exporter import JSONExporter
+from .prometheus_exporter import PrometheusExporter
+from .udp_exporter import UDPExporter
+
+# Parquet导出需要安装pyarrow
+try:
+    from .parquet_exporter import ParquetExporter
+    __all__.append('ParquetExporter')
+except ImportError:
+    pass
\ No newline at end of file
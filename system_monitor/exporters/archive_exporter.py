@@ -0,0 +1,374 @@
+"""
+压缩归档导出器
+
+采用Gorilla风格编码：时间戳按微秒做二阶差分（delta-of-delta），浮点数与前值做异或，
+只保存有效位。数据按块写入，每个块头记录起止时间，按时间范围读取时只解码相关的块。
+
+缓冲中尚未写出的数据在进程崩溃时丢失，最多为block_interval秒（默认60秒）或block_rows行；
+间隔越短越安全，但块越小压缩率越低。
+"""
+
+import math
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from system_monitor import SystemMetrics
+
+# 文件头
+FILE_MAGIC = b"SMZ1"
+# 块头：标记、起始时间、结束时间、行数、数据长度
+BLOCK_HEADER = struct.Struct("<4sddII")
+BLOCK_MAGIC = b"SMZB"
+
+# 块的默认最长时间跨度（秒），即崩溃时最多丢失的数据时长
+DEFAULT_BLOCK_INTERVAL = 60.0
+
+# 二阶差分的分档：前缀为n个1加一个0，其后为对应位数的有符号值，最后一档为64位
+_DOD_BUCKETS = (7, 9, 12, 20, 32)
+
+_FLOAT = struct.Struct(">d")
+
+
+class _BitWriter:
+    """按位写入，满字节后转存到bytearray"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, bits: int):
+        self._acc = (self._acc << bits) | (value & ((1 << bits) - 1))
+        self._bits += bits
+        if self._bits >= 64:
+            extra = self._bits & 7
+            self.buffer += (self._acc >> extra).to_bytes(self._bits >> 3, "big")
+            self._acc &= (1 << extra) - 1
+            self._bits = extra
+
+    def getvalue(self) -> bytes:
+        """返回写入的内容，末尾不足一字节的部分补0"""
+        data = bytes(self.buffer)
+        if self._bits:
+            padding = -self._bits & 7
+            data += (self._acc << padding).to_bytes((self._bits + padding) >> 3, "big")
+        return data
+
+
+class _BitReader:
+    """按位读取"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    def read(self, bits: int) -> int:
+        start = self.position >> 3
+        end = (self.position + bits + 7) >> 3
+        if end > len(self.data):
+            raise EOFError("数据块不完整")
+        value = int.from_bytes(self.data[start:end], "big")
+        value >>= (end << 3) - self.position - bits
+        self.position += bits
+        return value & ((1 << bits) - 1)
+
+    def read_bit(self) -> int:
+        byte = self.data[self.position >> 3]
+        bit = (byte >> (7 - (self.position & 7))) & 1
+        self.position += 1
+        return bit
+
+
+def _encode_timestamps(writer: _BitWriter, timestamps: List[int]):
+    """首个时间戳原样写入，之后写入二阶差分"""
+    writer.write(timestamps[0], 64)
+    previous, delta = timestamps[0], 0
+    for timestamp in timestamps[1:]:
+        new_delta = timestamp - previous
+        dod = new_delta - delta
+        previous, delta = timestamp, new_delta
+        if dod == 0:
+            writer.write(0, 1)
+            continue
+        for index, bits in enumerate(_DOD_BUCKETS):
+            if -(1 << (bits - 1)) <= dod < (1 << (bits - 1)):
+                writer.write((1 << (index + 2)) - 2, index + 2)
+                writer.write(dod, bits)
+                break
+        else:
+            writer.write((1 << len(_DOD_BUCKETS)) - 1 << 1 | 1, len(_DOD_BUCKETS) + 1)
+            writer.write(dod, 64)
+
+
+def _decode_timestamps(reader: _BitReader, rows: int) -> List[int]:
+    first = reader.read(64)
+    timestamps = [first]
+    previous, delta = first, 0
+    for _ in range(rows - 1):
+        ones = 0
+        while ones <= len(_DOD_BUCKETS) and reader.read_bit():
+            ones += 1
+        if ones == 0:
+            dod = 0
+        else:
+            bits = _DOD_BUCKETS[ones - 1] if ones <= len(_DOD_BUCKETS) else 64
+            dod = reader.read(bits)
+            if dod >= 1 << (bits - 1):
+                dod -= 1 << bits
+        delta += dod
+        previous += delta
+        timestamps.append(previous)
+    return timestamps
+
+
+def _encode_floats(writer: _BitWriter, values: List[float]):
+    """首个值原样写入，之后写入与前值的异或，复用前一次的有效位窗口"""
+    previous_bits = int.from_bytes(_FLOAT.pack(values[0]), "big")
+    writer.write(previous_bits, 64)
+    leading, trailing = 65, 0
+    for value in values[1:]:
+        bits = int.from_bytes(_FLOAT.pack(value), "big")
+        xor = bits ^ previous_bits
+        previous_bits = bits
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+        new_leading = min(64 - xor.bit_length(), 31)
+        new_trailing = (xor & -xor).bit_length() - 1
+        if new_leading >= leading and new_trailing >= trailing:
+            # 落在前一次的窗口内
+            writer.write(0b10, 2)
+            writer.write(xor >> trailing, 64 - leading - trailing)
+        else:
+            leading, trailing = new_leading, new_trailing
+            meaningful = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(meaningful & 63, 6)
+            writer.write(xor >> trailing, meaningful)
+
+
+def _decode_floats(reader: _BitReader, rows: int) -> List[float]:
+    bits = reader.read(64)
+    values = [_FLOAT.unpack(bits.to_bytes(8, "big"))[0]]
+    leading, trailing = 0, 0
+    for _ in range(rows - 1):
+        if reader.read_bit():
+            if reader.read_bit():
+                leading = reader.read(5)
+                meaningful = reader.read(6) or 64
+                trailing = 64 - leading - meaningful
+            bits ^= reader.read(64 - leading - trailing) << trailing
+        values.append(_FLOAT.unpack(bits.to_bytes(8, "big"))[0])
+    return values
+
+
+def encode_block(timestamps: List[float], columns: Dict[str, List[float]]) -> bytes:
+    """
+    编码一个数据块
+
+    Args:
+        timestamps: Unix时间戳，按微秒保存
+        columns: 列名到数值的映射，缺失值为NaN
+
+    Returns:
+        含块头的二进制数据
+    """
+    names = list(columns)
+    payload = bytearray(struct.pack("<H", len(names)))
+    for name in names:
+        encoded = name.encode("utf-8")
+        payload += struct.pack("<H", len(encoded)) + encoded
+
+    streams = []
+    writer = _BitWriter()
+    _encode_timestamps(writer, [round(timestamp * 1_000_000) for timestamp in timestamps])
+    streams.append(writer.getvalue())
+    for name in names:
+        writer = _BitWriter()
+        _encode_floats(writer, columns[name])
+        streams.append(writer.getvalue())
+    for stream in streams:
+        payload += struct.pack("<I", len(stream)) + stream
+
+    header = BLOCK_HEADER.pack(BLOCK_MAGIC, timestamps[0], timestamps[-1], len(timestamps), len(payload))
+    return header + payload
+
+
+def encode_rows(timestamps: List[float], rows: List[Dict[str, float]]) -> bytes:
+    """将按行缓冲的数据编码为一个块，某行缺少的列记为NaN"""
+    columns: Dict[str, List[float]] = {}
+    for row in rows:
+        for name in row:
+            if name not in columns:
+                columns[name] = []
+    for name, column in columns.items():
+        column.extend(float(row.get(name, math.nan)) for row in rows)
+    return encode_block(timestamps, columns)
+
+
+def parse_block_header(block: bytes) -> Tuple[float, float, int]:
+    """校验一个完整的块（含块头），返回(起始时间, 结束时间, 行数)"""
+    if len(block) < BLOCK_HEADER.size:
+        raise ValueError("数据块不完整")
+    magic, start, end, rows, length = BLOCK_HEADER.unpack_from(block)
+    if magic != BLOCK_MAGIC or length != len(block) - BLOCK_HEADER.size or not rows:
+        raise ValueError("数据块格式错误")
+    return start, end, rows
+
+
+def decode_block(payload: bytes, rows: int) -> Tuple[List[float], Dict[str, List[float]]]:
+    """解码数据块内容（不含块头），返回(时间戳列表, 列名到数值的映射)"""
+    offset = 2
+    (count,) = struct.unpack_from("<H", payload)
+    names = []
+    for _ in range(count):
+        (length,) = struct.unpack_from("<H", payload, offset)
+        names.append(payload[offset + 2:offset + 2 + length].decode("utf-8"))
+        offset += 2 + length
+
+    streams = []
+    for _ in range(count + 1):
+        (length,) = struct.unpack_from("<I", payload, offset)
+        streams.append(payload[offset + 4:offset + 4 + length])
+        offset += 4 + length
+
+    timestamps = [value / 1_000_000 for value in _decode_timestamps(_BitReader(streams[0]), rows)]
+    columns = {name: _decode_floats(_BitReader(stream), rows) for name, stream in zip(names, streams[1:])}
+    return timestamps, columns
+
+
+def validate_block(block: bytes) -> Tuple[float, float, int]:
+    """完整解码一个块（含块头）以确认数据无损，返回(起始时间, 结束时间, 行数)"""
+    start, end, rows = parse_block_header(block)
+    try:
+        timestamps, columns = decode_block(block[BLOCK_HEADER.size:], rows)
+    except (struct.error, EOFError, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"数据块损坏: {e}")
+    if len(timestamps) != rows or any(len(column) != rows for column in columns.values()):
+        raise ValueError("数据块损坏: 行数不一致")
+    return start, end, rows
+
+
+class ArchiveExporter:
+    """压缩归档导出器，缓冲一个块的数据后编码追加到文件"""
+
+    def __init__(self, filename: str = "system_metrics.smz", block_rows: int = 1024,
+                 block_interval: float = DEFAULT_BLOCK_INTERVAL):
+        """
+        初始化归档导出器
+
+        Args:
+            filename: 归档文件名
+            block_rows: 每个块的最大行数
+            block_interval: 块的最长时间跨度（秒），超过则写出当前块；
+                            崩溃时最多丢失这么长时间的数据
+        """
+        self.filename = filename
+        self.filepath = Path(filename)
+        self.block_rows = block_rows
+        self.block_interval = block_interval
+
+        self._timestamps: List[float] = []
+        self._rows: List[Dict[str, float]] = []
+
+        if not self.filepath.exists() or self.filepath.stat().st_size == 0:
+            with open(self.filepath, "wb") as f:
+                f.write(FILE_MAGIC)
+        else:
+            with open(self.filepath, "rb") as f:
+                if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                    raise ValueError(f"不是归档文件: {filename}")
+
+    def append(self, timestamp: float, values: Dict[str, float]):
+        """追加一行数据"""
+        if self._timestamps and (len(self._timestamps) >= self.block_rows
+                                 or timestamp - self._timestamps[0] >= self.block_interval):
+            self.flush()
+        self._timestamps.append(timestamp)
+        self._rows.append(values)
+
+    def export_single(self, metrics: SystemMetrics):
+        """导出单次监控数据"""
+        self.append(metrics.timestamp.timestamp(), metrics.flatten())
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """批量导出监控数据"""
+        for metrics in metrics_list:
+            self.export_single(metrics)
+
+    def flush(self):
+        """将缓冲的数据编码为一个块写入文件"""
+        if not self._timestamps:
+            return
+        block = encode_rows(self._timestamps, self._rows)
+        self._timestamps = []
+        self._rows = []
+        self.write_block(block)
+
+    def write_block(self, block: bytes):
+        """追加一个已编码的块（如远程代理发来的块），不重新编码"""
+        parse_block_header(block)
+        with open(self.filepath, "ab") as f:
+            f.write(block)
+
+    def close(self):
+        """写出剩余数据"""
+        self.flush()
+
+
+class ArchiveReader:
+    """归档文件读取器"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.filepath = Path(filename)
+
+    def blocks(self) -> List[Tuple[int, float, float, int]]:
+        """只读块头，列出所有完整的块：(数据偏移, 起始时间, 结束时间, 行数)"""
+        result = []
+        with open(self.filepath, "rb") as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"不是归档文件: {self.filename}")
+            size = self.filepath.stat().st_size
+            while True:
+                header = f.read(BLOCK_HEADER.size)
+                if len(header) < BLOCK_HEADER.size:
+                    break
+                magic, start, end, rows, length = BLOCK_HEADER.unpack(header)
+                offset = f.tell()
+                if magic != BLOCK_MAGIC or offset + length > size:
+                    # 写入中断导致的不完整块
+                    break
+                result.append((offset, start, end, rows))
+                f.seek(length, 1)
+        return result
+
+    def iter_records(self, start: Optional[float] = None,
+                     end: Optional[float] = None) -> Iterator[Tuple[float, Dict[str, float]]]:
+        """逐行读取(时间戳, 指标字典)，只解码与时间范围重叠的块，跳过缺失值"""
+        blocks = self.blocks()
+        with open(self.filepath, "rb") as f:
+            for offset, block_start, block_end, rows in blocks:
+                if (start is not None and block_end < start) or (end is not None and block_start > end):
+                    continue
+                f.seek(offset - BLOCK_HEADER.size)
+                length = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))[4]
+                timestamps, columns = decode_block(f.read(length), rows)
+                for index, timestamp in enumerate(timestamps):
+                    if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+                        continue
+                    values = {}
+                    for name, column in columns.items():
+                        value = column[index]
+                        if value == value:
+                            values[name] = value
+                    yield timestamp, values
+
+    def time_bounds(self) -> Optional[Tuple[float, float]]:
+        """数据的起止时间"""
+        blocks = self.blocks()
+        if not blocks:
+            return None
+        return blocks[0][1], blocks[-1][2]
\ No newline at end of file
@@ -52,6 +52,44 @@ class ConsoleExporter:
                 ])
             print(tabulate(rows, headers=headers, tablefmt="simple"))
 
+        # 关注的进程
+        if metrics.watched_processes:
+            print(f"\n👀 关注的进程:")
+            headers = ["关注项", "PID", "CPU%", "内存MB", "读KB/s", "写KB/s", "切换/s", "FD"]
+            rows = []
+            for proc in metrics.watched_processes:
+                if not proc['running']:
+                    rows.append([proc['label'], proc['pid'] or '-', "未运行", "", "", "", "", ""])
+                    continue
+                rows.append([
+                    proc['label'][:20],
+                    proc['pid'],
+                    f"{proc['cpu_percent']:.1f}",
+                    f"{proc['memory_rss'] / (1024 ** 2):.1f}",
+                    "-" if proc['read_bytes_per_sec'] is None else f"{proc['read_bytes_per_sec'] / 1024:.1f}",
+                    "-" if proc['write_bytes_per_sec'] is None else f"{proc['write_bytes_per_sec'] / 1024:.1f}",
+                    f"{proc['ctx_switches_per_sec']:.0f}",
+                    "-" if proc['num_fds'] is None else proc['num_fds'],
+                ])
+            print(tabulate(rows, headers=headers, tablefmt="simple"))
+
+        # cgroup资源使用
+        if metrics.cgroups:
+            print(f"\n📦 cgroup资源使用（按CPU排序）:")
+            headers = ["cgroup", "CPU%", "内存MB", "读KB/s", "写KB/s", "进程数"]
+            rows = []
+            for cgroup in sorted(metrics.cgroups, key=lambda item: item['cpu_percent'], reverse=True)[:10]:
+                memory = cgroup['memory_current']
+                rows.append([
+                    cgroup['path'][-40:],
+                    f"{cgroup['cpu_percent']:.1f}",
+                    "-" if memory is None else f"{memory / (1024 ** 2):.1f}",
+                    "-" if cgroup['io_read_bytes_per_sec'] is None else f"{cgroup['io_read_bytes_per_sec'] / 1024:.1f}",
+                    "-" if cgroup['io_write_bytes_per_sec'] is None else f"{cgroup['io_write_bytes_per_sec'] / 1024:.1f}",
+                    "-" if cgroup['pids'] is None else cgroup['pids'],
+                ])
+            print(tabulate(rows, headers=headers, tablefmt="simple"))
+
     @staticmethod
     def export_summary(system_info: Dict[str, Any]):
         """导出系统信息摘要"""
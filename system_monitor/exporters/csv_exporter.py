@@ -3,54 +3,134 @@ CSV文件导出器
 """
 
 import csv
-from datetime import datetime
-from typing import List, Dict, Any
+import re
+import time
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 from system_monitor import SystemMetrics
 
+# 简表表头
+NARROW_HEADERS = [
+    'timestamp',
+    'cpu_percent',
+    'memory_percent',
+    'memory_used_gb',
+    'memory_total_gb',
+    'disk_usage_root',
+    'network_sent_mb',
+    'network_recv_mb',
+    'network_connections',
+]
+
+# 宽表中每个进程的列
+PROCESS_FIELDS = ('pid', 'name', 'cpu_percent', 'memory_percent')
+
+
+def csv_segments(path) -> List[Path]:
+    """按版本顺序列出CSV记录的所有文件段：<stem><suffix>、<stem>.v2<suffix>……"""
+    filepath = Path(path)
+    paths = [filepath] if filepath.exists() else []
+    pattern = re.compile(re.escape(filepath.stem) + r"\.v(\d+)" + re.escape(filepath.suffix) + "$")
+    versioned = []
+    for segment in filepath.parent.glob(f"{filepath.stem}.v*{filepath.suffix}"):
+        match = pattern.match(segment.name)
+        if match:
+            versioned.append((int(match.group(1)), segment))
+    return paths + [segment for _, segment in sorted(versioned)]
+
 
 class CSVExporter:
     """CSV文件导出器"""
 
-    def __init__(self, filename: str = "system_metrics.csv"):
+    def __init__(self, filename: str = "system_metrics.csv", schema: str = "narrow",
+                 buffered: bool = False, flush_rows: int = 100, flush_interval: float = 5.0,
+                 top_processes: int = 3):
         """
         初始化CSV导出器
 
         Args:
             filename: CSV文件名
+            schema: narrow为固定列（只记录根分区），wide为每个核心、每个挂载点、
+                    每个进程各占一列，列集合变化时写入新的文件段
+            buffered: 是否保持文件打开并缓冲写入，需调用close()确保数据落盘
+            flush_rows: 缓冲模式下累计多少行后刷新
+            flush_interval: 缓冲模式下距上次刷新多少秒后刷新
+            top_processes: 宽表中记录的进程数
         """
+        if schema not in ("narrow", "wide"):
+            raise ValueError(f"不支持的表结构: {schema}")
+
         self.filename = filename
         self.filepath = Path(filename)
+        self.schema = schema
+        self.buffered = buffered
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.top_processes = top_processes
+
+        self.columns: List[str] = list(NARROW_HEADERS) if schema == "narrow" else []
+        self.version = 1
+        self._file = None
+        self._writer = None
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
 
-        # 初始化文件，写入表头
-        if not self.filepath.exists():
+        if schema == "wide":
+            self._resume_wide()
+        elif not self.filepath.exists():
+            # 初始化文件，写入表头
             self._write_header()
 
     def _write_header(self):
         """写入CSV表头"""
-        headers = [
-            'timestamp',
-            'cpu_percent',
-            'memory_percent',
-            'memory_used_gb',
-            'memory_total_gb',
-            'disk_usage_root',
-            'network_sent_mb',
-            'network_recv_mb',
-            'network_connections',
-        ]
-
-        with open(self.filename, 'w', newline='', encoding='utf-8') as f:
+        with open(self.current_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            writer.writerow(headers)
+            writer.writerow(self.columns)
 
-    def export_single(self, metrics: SystemMetrics):
-        """导出单次监控数据"""
+    @property
+    def current_path(self) -> Path:
+        """当前写入的文件段"""
+        if self.version == 1:
+            return self.filepath
+        return self.filepath.with_name(f"{self.filepath.stem}.v{self.version}{self.filepath.suffix}")
+
+    def segments(self) -> List[Path]:
+        """按版本顺序列出所有文件段"""
+        return csv_segments(self.filepath)
+
+    def _resume_wide(self):
+        """宽表模式下继续写入最新的文件段"""
+        segments = self.segments()
+        if not segments:
+            return
+        latest = segments[-1]
+        match = re.search(r"\.v(\d+)" + re.escape(self.filepath.suffix) + "$", latest.name)
+        self.version = int(match.group(1)) if match and latest != self.filepath else 1
+        with open(latest, newline='', encoding='utf-8') as f:
+            self.columns = next(csv.reader(f), [])
+
+    def _wide_values(self, metrics: SystemMetrics) -> Dict[str, Any]:
+        """宽表中一行的各列取值，指标列与SystemMetrics.flatten()一致"""
+        values: Dict[str, Any] = {'timestamp': metrics.timestamp.isoformat()}
+        for name, value in metrics.flatten().items():
+            values[name] = f"{value:.2f}"
+        values['network_connections'] = metrics.network_connections
+        # 进程列固定为top_processes组，进程不足时留空，避免列集合频繁变化
+        processes = metrics.top_processes[:self.top_processes]
+        for rank in range(1, self.top_processes + 1):
+            proc = processes[rank - 1] if rank <= len(processes) else {}
+            for field in PROCESS_FIELDS:
+                value = proc.get(field, '')
+                values[f'proc_{rank}_{field}'] = f"{value:.2f}" if isinstance(value, float) else value
+        return values
+
+    def _narrow_row(self, metrics: SystemMetrics) -> List[Any]:
+        """简表中的一行"""
         # 获取根目录的磁盘使用率
         disk_root = metrics.disk_usage.get('/', 0.0) if metrics.disk_usage else 0.0
 
-        row = [
+        return [
             metrics.timestamp.isoformat(),
             f"{metrics.cpu_percent:.2f}",
             f"{metrics.memory_percent:.2f}",
@@ -62,11 +142,75 @@ class CSVExporter:
             metrics.network_connections,
         ]
 
-        with open(self.filename, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
+    def _open(self):
+        """打开当前文件段用于追加"""
+        if self._file is None:
+            self._file = open(self.current_path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
 
-    def export_batch(self, metrics_list: List[SystemMetrics]):
-        """批量导出监控数据"""
+    def _close_file(self):
+        """关闭当前文件段"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+            self._pending_rows = 0
+
+    def _rows(self, metrics_list: List[SystemMetrics]) -> List[List[Any]]:
+        """生成要写入的行，宽表列集合扩展时在中途切换文件段"""
+        rows = []
         for metrics in metrics_list:
-            self.export_single(metrics)
\ No newline at end of file
+            if self.schema == "narrow":
+                rows.append(self._narrow_row(metrics))
+                continue
+
+            values = self._wide_values(metrics)
+            if not self.columns or any(column not in self.columns for column in values):
+                # 新增挂载点、核心或进程列时写入新版本的文件段
+                self._write_rows(rows)
+                rows = []
+                self._new_segment(values)
+            rows.append([values.get(column, '') for column in self.columns])
+        return rows
+
+    def _new_segment(self, values: Dict[str, Any]):
+        """以新的列集合开始新的文件段"""
+        self._close_file()
+        existing = [column for column in self.columns if column not in values]
+        if self.columns or self.current_path.exists():
+            self.version += 1
+        self.columns = list(values) + existing
+        self._write_header()
+
+    def _write_rows(self, rows: List[List[Any]]):
+        """写入多行"""
+        if not rows:
+            return
+        self._open()
+        self._writer.writerows(rows)
+        self._pending_rows += len(rows)
+
+    def export_single(self, metrics: SystemMetrics):
+        """导出单次监控数据"""
+        self.export_batch([metrics])
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """批量导出监控数据，一次写入多行"""
+        self._write_rows(self._rows(metrics_list))
+
+        if not self.buffered:
+            self._close_file()
+        elif (self._pending_rows >= self.flush_rows
+              or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """将缓冲的数据写入文件"""
+        if self._file is not None:
+            self._file.flush()
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """刷新并关闭文件"""
+        self._close_file()
\ No newline at end of file
@@ -2,29 +2,138 @@
 JSON文件导出器
 """
 
+import gzip
 import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 
 from system_monitor import SystemMetrics
 
+# 追加写入模式使用的文件扩展名
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+
+def metrics_to_dict(metrics: SystemMetrics) -> Dict[str, Any]:
+    """将监控数据转换为字典格式"""
+    return {
+        "timestamp": metrics.timestamp.isoformat(),
+        "cpu": {
+            "total_percent": metrics.cpu_percent,
+            "per_core": metrics.cpu_per_core,
+        },
+        "memory": {
+            "percent": metrics.memory_percent,
+            "used_gb": metrics.memory_used,
+            "total_gb": metrics.memory_total,
+        },
+        "disk": metrics.disk_usage,
+        "network": {
+            "sent_mb": metrics.network_sent,
+            "recv_mb": metrics.network_recv,
+            "connections": metrics.network_connections,
+        },
+        "processes": metrics.top_processes[:3]  # 只保存前3个进程
+    }
+
+
+def ndjson_segments(path) -> List[Path]:
+    """按时间顺序列出NDJSON记录的所有文件（轮转文件在前，当前文件在最后）"""
+    filepath = Path(path)
+    # 与JSONExporter._segment_path生成的文件名一致：<stem>.<日期>-<时间>[-<序号>]<suffix>[.gz]
+    pattern = re.compile(re.escape(filepath.stem) + r"\.(\d{8})-(\d{6})(?:-(\d+))?"
+                         + re.escape(filepath.suffix) + r"(\.gz)?$")
+    rotated = []
+    for segment in filepath.parent.glob(f"{filepath.stem}.*"):
+        match = pattern.match(segment.name)
+        if match is None:
+            continue
+        # 压缩刚完成、原文件尚未删除时只读取压缩文件
+        if not match.group(4) and segment.with_name(segment.name + '.gz').exists():
+            continue
+        rotated.append((match.group(1), match.group(2), int(match.group(3) or 0), segment))
+    rotated.sort()
+    paths = [item[3] for item in rotated]
+    if filepath.exists():
+        paths.append(filepath)
+    return paths
+
+
+def iter_ndjson(path) -> Iterator[Dict[str, Any]]:
+    """依次流式读取NDJSON记录的所有文件，跳过写入中断导致的不完整行"""
+    for segment in ndjson_segments(path):
+        opener = gzip.open if segment.suffix == '.gz' else open
+        try:
+            with opener(segment, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            # 读取期间被压缩改名
+            continue
+
+
+def _compress_file(source: Path):
+    """gzip压缩文件，先写临时文件再改名，避免读取到不完整的压缩文件"""
+    target = source.with_name(source.name + '.gz')
+    temp = target.with_name(target.name + '.tmp')
+    with open(source, 'rb') as f_in, gzip.open(temp, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.replace(temp, target)
+    source.unlink()
+
 
 class JSONExporter:
     """JSON文件导出器"""
 
-    def __init__(self, filename: str = "system_metrics.json"):
+    def __init__(self, filename: str = "system_metrics.json", mode: Optional[str] = None,
+                 max_records: int = 100, max_bytes: int = 0, rotate_interval: float = 0,
+                 compress: bool = False):
         """
         初始化JSON导出器
 
         Args:
             filename: JSON文件名
+            mode: json为单个JSON文档（每次重写整个文件），ndjson为逐行追加；
+                  默认根据扩展名判断，.ndjson/.jsonl为ndjson
+            max_records: json模式下保留的最大记录数，0表示不限制
+            max_bytes: ndjson模式下文件达到该大小（字节）时轮转，0表示不按大小轮转
+            rotate_interval: ndjson模式下按时间轮转的间隔（秒），0表示不按时间轮转
+            compress: 是否gzip压缩轮转出的文件
         """
         self.filename = filename
         self.filepath = Path(filename)
 
+        if mode is None:
+            mode = "ndjson" if self.filepath.suffix in NDJSON_SUFFIXES else "json"
+        if mode not in ("json", "ndjson"):
+            raise ValueError(f"不支持的模式: {mode}")
+
+        self.mode = mode
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+
+        self._file = None
+        self._opened_at = 0.0
+        # 轮转出的文件由一个常驻线程依次压缩，首次轮转时启动
+        self._compress_queue: "queue.Queue[Optional[Path]]" = queue.Queue()
+        self._compressor: Optional[threading.Thread] = None
+
         # 初始化文件
-        if not self.filepath.exists():
+        if self.mode == "json" and not self.filepath.exists():
             self._init_file()
 
     def _init_file(self):
@@ -34,6 +143,10 @@ class JSONExporter:
 
     def export_single(self, metrics: SystemMetrics):
         """导出单次监控数据"""
+        if self.mode == "ndjson":
+            self._append([metrics])
+            return
+
         # 读取现有数据
         try:
             with open(self.filename, 'r', encoding='utf-8') as f:
@@ -41,33 +154,12 @@ class JSONExporter:
         except (FileNotFoundError, json.JSONDecodeError):
             data = {"version": "1.0", "metrics": []}
 
-        # 转换为字典格式
-        metrics_dict = {
-            "timestamp": metrics.timestamp.isoformat(),
-            "cpu": {
-                "total_percent": metrics.cpu_percent,
-                "per_core": metrics.cpu_per_core,
-            },
-            "memory": {
-                "percent": metrics.memory_percent,
-                "used_gb": metrics.memory_used,
-                "total_gb": metrics.memory_total,
-            },
-            "disk": metrics.disk_usage,
-            "network": {
-                "sent_mb": metrics.network_sent,
-                "recv_mb": metrics.network_recv,
-                "connections": metrics.network_connections,
-            },
-            "processes": metrics.top_processes[:3]  # 只保存前3个进程
-        }
-
         # 添加新数据
-        data["metrics"].append(metrics_dict)
+        data["metrics"].append(metrics_to_dict(metrics))
 
-        # 保持最近的100条记录
-        if len(data["metrics"]) > 100:
-            data["metrics"] = data["metrics"][-100:]
+        # 保持最近的max_records条记录
+        if self.max_records and len(data["metrics"]) > self.max_records:
+            data["metrics"] = data["metrics"][-self.max_records:]
 
         # 写回文件
         with open(self.filename, 'w', encoding='utf-8') as f:
@@ -75,11 +167,115 @@ class JSONExporter:
 
     def export_batch(self, metrics_list: List[SystemMetrics]):
         """批量导出监控数据"""
+        if self.mode == "ndjson":
+            self._append(metrics_list)
+            return
+
         for metrics in metrics_list:
             self.export_single(metrics)
 
+    def _append(self, metrics_list: List[SystemMetrics]):
+        """以紧凑编码逐行追加记录"""
+        for metrics in metrics_list:
+            if self._file is None or self._should_rotate():
+                self._rotate()
+            line = json.dumps(metrics_to_dict(metrics), separators=(',', ':'),
+                              ensure_ascii=False, default=str)
+            self._file.write(line + '\n')
+        self._file.flush()
+
+    def _should_rotate(self) -> bool:
+        """判断当前文件是否需要轮转"""
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            return True
+        if self.rotate_interval and time.time() - self._opened_at >= self.rotate_interval:
+            return True
+        return False
+
+    def _segment_path(self) -> Path:
+        """生成轮转文件名，如 metrics.20240101-120000.ndjson"""
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        stem, suffix = self.filepath.stem, self.filepath.suffix
+        candidate = self.filepath.with_name(f"{stem}.{stamp}{suffix}")
+        index = 1
+        while candidate.exists() or candidate.with_name(candidate.name + '.gz').exists():
+            candidate = self.filepath.with_name(f"{stem}.{stamp}-{index}{suffix}")
+            index += 1
+        return candidate
+
+    def _rotate(self):
+        """关闭当前文件（如需要则改名并压缩）并打开新文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if self.filepath.exists() and self.filepath.stat().st_size > 0:
+                segment = self._segment_path()
+                os.replace(self.filepath, segment)
+                if self.compress:
+                    # 后台压缩，不阻塞采样
+                    if self._compressor is None:
+                        self._compressor = threading.Thread(target=self._compress_worker, daemon=True)
+                        self._compressor.start()
+                    self._compress_queue.put(segment)
+
+        self._file = open(self.filename, 'a', encoding='utf-8')
+        self._opened_at = self._started_at() if self._file.tell() else time.time()
+
+    def _compress_worker(self):
+        """压缩线程：依次压缩轮转出的文件，收到None时退出"""
+        while True:
+            segment = self._compress_queue.get()
+            if segment is None:
+                break
+            try:
+                _compress_file(segment)
+            except OSError as e:
+                print(f"Compression error: {e}")
+
+    def _started_at(self) -> float:
+        """重新打开已有文件时，按其第一条记录的时间计算轮转间隔，读取失败时用修改时间"""
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                return datetime.fromisoformat(json.loads(f.readline())["timestamp"]).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return self.filepath.stat().st_mtime
+
+    def close(self, timeout: float = 5.0):
+        """
+        关闭文件，并等待后台压缩完成
+
+        Args:
+            timeout: 最多等待压缩的时间（秒），超时后压缩线程在后台继续，
+                     未压缩完的文件保持原样，仍可正常读取
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._compressor is not None:
+            self._compress_queue.put(None)
+            self._compressor.join(timeout)
+            self._compressor = None
+            self._compress_queue = queue.Queue()
+
+    def segments(self) -> List[Path]:
+        """按时间顺序列出ndjson模式下的所有文件（轮转文件在前，当前文件在最后）"""
+        return ndjson_segments(self.filepath)
+
+    def iter_data(self) -> Iterator[Dict[str, Any]]:
+        """逐条读取已保存的数据，ndjson模式下依次流式读取所有轮转文件"""
+        if self.mode == "json":
+            yield from self.load_data()
+            return
+
+        if self._file is not None:
+            self._file.flush()
+        yield from iter_ndjson(self.filepath)
+
     def load_data(self) -> List[Dict[str, Any]]:
         """加载已保存的数据"""
+        if self.mode == "ndjson":
+            return list(self.iter_data())
+
         try:
             with open(self.filename, 'r', encoding='utf-8') as f:
                 data = json.load(f)
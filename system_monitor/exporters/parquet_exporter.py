@@ -0,0 +1,127 @@
+"""
+Parquet文件导出器（需要安装pyarrow）
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from system_monitor import SystemMetrics
+
+# 进程列表中每项的结构
+PROCESS_TYPE = pa.struct([
+    ("pid", pa.int64()),
+    ("name", pa.string()),
+    ("cpu_percent", pa.float64()),
+    ("memory_percent", pa.float64()),
+])
+
+SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("us")),
+    ("cpu_percent", pa.float64()),
+    ("cpu_per_core", pa.list_(pa.float64())),
+    ("memory_percent", pa.float64()),
+    ("memory_used_gb", pa.float64()),
+    ("memory_total_gb", pa.float64()),
+    ("disk_usage", pa.map_(pa.string(), pa.float64())),
+    ("network_sent_mb", pa.float64()),
+    ("network_recv_mb", pa.float64()),
+    ("network_connections", pa.int64()),
+    ("top_processes", pa.list_(PROCESS_TYPE)),
+])
+
+
+class ParquetExporter:
+    """Parquet文件导出器，缓冲一批数据后写入一个行组"""
+
+    def __init__(self, filename: str = "system_metrics.parquet", row_group_rows: int = 10000,
+                 row_group_interval: float = 300.0, compression: str = "zstd",
+                 top_processes: int = 3):
+        """
+        初始化Parquet导出器
+
+        Args:
+            filename: Parquet文件名，文件已存在时写入新的分片（如metrics.1.parquet）
+            row_group_rows: 每个行组的最大行数
+            row_group_interval: 距上次写入行组多少秒后写入
+            compression: 压缩算法，如zstd、snappy、gzip、none
+            top_processes: 每行记录的进程数
+        """
+        self.filename = filename
+        self.filepath = self._free_path(Path(filename))
+        self.row_group_rows = row_group_rows
+        self.row_group_interval = row_group_interval
+        self.compression = compression
+        self.top_processes = top_processes
+
+        self._writer = None
+        self._columns: Dict[str, List[Any]] = {name: [] for name in SCHEMA.names}
+        self._last_write = time.monotonic()
+
+    @staticmethod
+    def _free_path(path: Path) -> Path:
+        """Parquet文件不能追加，已存在时改用下一个空闲的分片名"""
+        candidate = path
+        index = 1
+        while candidate.exists():
+            candidate = path.with_name(f"{path.stem}.{index}{path.suffix}")
+            index += 1
+        return candidate
+
+    @property
+    def pending_rows(self) -> int:
+        """尚未写入的行数"""
+        return len(self._columns["timestamp"])
+
+    def export_single(self, metrics: SystemMetrics):
+        """导出单次监控数据"""
+        self.export_batch([metrics])
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """批量导出监控数据"""
+        columns = self._columns
+        for metrics in metrics_list:
+            columns["timestamp"].append(metrics.timestamp)
+            columns["cpu_percent"].append(metrics.cpu_percent)
+            columns["cpu_per_core"].append(list(metrics.cpu_per_core))
+            columns["memory_percent"].append(metrics.memory_percent)
+            columns["memory_used_gb"].append(metrics.memory_used)
+            columns["memory_total_gb"].append(metrics.memory_total)
+            columns["disk_usage"].append(list((metrics.disk_usage or {}).items()))
+            columns["network_sent_mb"].append(metrics.network_sent)
+            columns["network_recv_mb"].append(metrics.network_recv)
+            columns["network_connections"].append(metrics.network_connections)
+            columns["top_processes"].append([
+                {field: proc.get(field) for field in PROCESS_TYPE.names}
+                for proc in metrics.top_processes[:self.top_processes]
+            ])
+            if self.pending_rows >= self.row_group_rows:
+                self.flush()
+
+        if time.monotonic() - self._last_write >= self.row_group_interval:
+            self.flush()
+
+    def flush(self):
+        """将缓冲的数据作为一个行组写入文件"""
+        self._last_write = time.monotonic()
+        if not self.pending_rows:
+            return
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(self._columns[field.name], type=field.type) for field in SCHEMA],
+            schema=SCHEMA,
+        )
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(str(self.filepath), SCHEMA, compression=self.compression)
+        self._writer.write_batch(batch)
+        for values in self._columns.values():
+            values.clear()
+
+    def close(self):
+        """写入剩余数据并关闭文件"""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Prometheus导出器
+
+每次采样渲染一次文本格式的数据并缓存为字节串，抓取请求直接返回缓存内容，
+抓取开销与抓取方数量无关。
+"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from system_monitor import SystemMetrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 数据单位换算
+_GB = 1024 ** 3
+_MB = 1024 ** 2
+
+
+def _escape(value) -> str:
+    """转义标签值"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class _Family:
+    """一组同名的样本"""
+
+    def __init__(self, lines: List[str], name: str, kind: str, help_text: str):
+        self.lines = lines
+        self.name = name
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def add(self, value: float, **labels):
+        if labels:
+            rendered = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+            self.lines.append(f"{self.name}{{{rendered}}} {_format_value(value)}")
+        else:
+            self.lines.append(f"{self.name} {_format_value(value)}")
+
+
+def render_metrics(metrics: SystemMetrics, prefix: str = "sysmon") -> bytes:
+    """将监控数据渲染为Prometheus文本格式"""
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> _Family:
+        return _Family(lines, f"{prefix}_{name}", kind, help_text)
+
+    family("cpu_usage_percent", "gauge", "CPU usage in percent.").add(metrics.cpu_percent)
+    cores = family("cpu_core_usage_percent", "gauge", "Per-core CPU usage in percent.")
+    for index, percent in enumerate(metrics.cpu_per_core):
+        cores.add(percent, core=index)
+
+    family("memory_usage_percent", "gauge", "Memory usage in percent.").add(metrics.memory_percent)
+    family("memory_used_bytes", "gauge", "Used memory in bytes.").add(metrics.memory_used * _GB)
+    family("memory_total_bytes", "gauge", "Total memory in bytes.").add(metrics.memory_total * _GB)
+
+    disks = family("disk_usage_percent", "gauge", "Filesystem usage in percent.")
+    for mount, percent in (metrics.disk_usage or {}).items():
+        disks.add(percent, mountpoint=mount)
+
+    family("network_sent_bytes_total", "counter", "Bytes sent on all interfaces.").add(
+        metrics.network_sent * _MB)
+    family("network_received_bytes_total", "counter", "Bytes received on all interfaces.").add(
+        metrics.network_recv * _MB)
+    sent = family("network_interface_sent_bytes_total", "counter", "Bytes sent per interface.")
+    for name, (sent_mb, _) in metrics.network_interfaces.items():
+        sent.add(sent_mb * _MB, interface=name)
+    received = family("network_interface_received_bytes_total", "counter", "Bytes received per interface.")
+    for name, (_, recv_mb) in metrics.network_interfaces.items():
+        received.add(recv_mb * _MB, interface=name)
+    family("network_connections", "gauge", "Open network connections.").add(metrics.network_connections)
+
+    process_cpu = family("process_cpu_percent", "gauge", "CPU usage of the top processes in percent.")
+    process_memory = family("process_memory_percent", "gauge", "Memory usage of the top processes in percent.")
+    for rank, proc in enumerate(metrics.top_processes, 1):
+        labels = {"rank": rank, "pid": proc.get("pid", ""), "name": proc.get("name") or ""}
+        if proc.get("cpu_percent") is not None:
+            process_cpu.add(proc["cpu_percent"], **labels)
+        if proc.get("memory_percent") is not None:
+            process_memory.add(proc["memory_percent"], **labels)
+
+    ages = family("metric_age_seconds", "gauge", "Seconds since each metric group was collected.")
+    for name, age in metrics.ages.items():
+        ages.add(age, group=name)
+    family("last_sample_timestamp_seconds", "gauge", "Unix time of the latest sample.").add(
+        metrics.timestamp.timestamp())
+
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+class PrometheusExporter:
+    """在内置HTTP服务上以Prometheus文本格式发布最新的监控数据"""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 9110, path: str = "/metrics",
+                 prefix: str = "sysmon"):
+        """
+        初始化Prometheus导出器
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            path: 数据路径
+            prefix: 指标名前缀
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.prefix = prefix
+
+        self._payload = b""
+        self._gzipped: Optional[bytes] = None
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def export_single(self, metrics: SystemMetrics):
+        """渲染最新的监控数据，替换缓存"""
+        payload = render_metrics(metrics, self.prefix)
+        with self._lock:
+            self._payload = payload
+            self._gzipped = None
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """只发布最新一条数据"""
+        if metrics_list:
+            self.export_single(metrics_list[-1])
+
+    def payload(self, gzipped: bool = False) -> bytes:
+        """当前缓存的响应内容，压缩结果每次采样最多计算一次"""
+        with self._lock:
+            if not gzipped:
+                return self._payload
+            if self._gzipped is None:
+                self._gzipped = gzip.compress(self._payload, compresslevel=5)
+            return self._gzipped
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """实际监听的地址和端口"""
+        if self._server is None:
+            return self.host, self.port
+        return self._server.server_address[:2]
+
+    def start(self):
+        """在后台线程中启动HTTP服务"""
+        if self._server is not None:
+            return
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != exporter.path:
+                    self.send_error(404)
+                    return
+                gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+                body = exporter.payload(gzipped)
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """停止HTTP服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread.join()
+            self._thread = None
\ No newline at end of file
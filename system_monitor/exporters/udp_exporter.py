@@ -0,0 +1,194 @@
+"""
+UDP推送导出器（StatsD或InfluxDB行协议）
+
+每次采样把所有行尽量多地装进不超过MTU的数据报，从预分配的缓冲区连续发送。
+套接字为非阻塞模式，接收方不存在或缓冲区已满时丢弃数据报，不阻塞采样。
+"""
+
+import re
+import socket
+from typing import Dict, List, Optional
+
+from system_monitor import SystemMetrics
+
+PROTOCOLS = ("statsd", "influx")
+
+# 以太网MTU 1500减去IP和UDP头，留出余量
+DEFAULT_PACKET_SIZE = 1400
+
+_STATSD_UNSAFE = re.compile(r"[^A-Za-z0-9_.\-]")
+_MB = 1024 ** 2
+
+
+def _statsd_name(name: str) -> str:
+    """StatsD指标名只保留字母、数字、下划线、点和减号"""
+    return _STATSD_UNSAFE.sub("_", name.replace(":", ".").replace("/", "_")).strip("_.") or "root"
+
+
+def _statsd_value(value) -> str:
+    """定点格式输出数值并去掉末尾的0，不像%g那样只保留6位有效数字"""
+    return f"{value:.6f}".rstrip("0").rstrip(".")
+
+
+def format_statsd(metrics: SystemMetrics, prefix: str = "sysmon") -> List[bytes]:
+    """将监控数据转换为StatsD gauge行"""
+    lines = []
+    for name, value in metrics.flatten().items():
+        if name.startswith("disk:"):
+            name = "disk." + _statsd_name(name[5:])
+        lines.append(f"{prefix}.{_statsd_name(name)}:{_statsd_value(value)}|g".encode("utf-8"))
+    for interface, (sent, recv) in metrics.network_interfaces.items():
+        base = f"{prefix}.net.{_statsd_name(interface)}"
+        lines.append(f"{base}.sent_bytes:{sent * _MB:.0f}|g".encode("utf-8"))
+        lines.append(f"{base}.recv_bytes:{recv * _MB:.0f}|g".encode("utf-8"))
+    return lines
+
+
+def _escape_tag(value) -> str:
+    """转义行协议中的标签键和值"""
+    return str(value).replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _influx_line(measurement: str, tags: Dict[str, str], fields: Dict[str, object], timestamp: int) -> bytes:
+    tag_text = "".join(f",{_escape_tag(key)}={_escape_tag(value)}" for key, value in tags.items() if value != "")
+    parts = []
+    for key, value in fields.items():
+        if isinstance(value, bool):
+            text = "true" if value else "false"
+        elif isinstance(value, int):
+            text = f"{value}i"
+        elif isinstance(value, float):
+            text = repr(value)
+        else:
+            text = '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+        parts.append(f"{_escape_tag(key)}={text}")
+    return f"{_escape_tag(measurement)}{tag_text} {','.join(parts)} {timestamp}".encode("utf-8")
+
+
+def format_influx(metrics: SystemMetrics, prefix: str = "sysmon",
+                  tags: Optional[Dict[str, str]] = None) -> List[bytes]:
+    """将监控数据转换为InfluxDB行协议，时间戳为纳秒"""
+    tags = tags or {}
+    timestamp = int(metrics.timestamp.timestamp() * 1_000_000) * 1000
+    lines = [_influx_line(prefix, tags, {
+        "cpu_percent": float(metrics.cpu_percent),
+        "memory_percent": float(metrics.memory_percent),
+        "memory_used_gb": float(metrics.memory_used),
+        "memory_total_gb": float(metrics.memory_total),
+        "network_sent_mb": float(metrics.network_sent),
+        "network_recv_mb": float(metrics.network_recv),
+        "network_connections": int(metrics.network_connections),
+    }, timestamp)]
+    for index, percent in enumerate(metrics.cpu_per_core):
+        lines.append(_influx_line(f"{prefix}_cpu", dict(tags, core=index),
+                                  {"usage_percent": float(percent)}, timestamp))
+    for mount, percent in (metrics.disk_usage or {}).items():
+        lines.append(_influx_line(f"{prefix}_disk", dict(tags, mountpoint=mount),
+                                  {"usage_percent": float(percent)}, timestamp))
+    for interface, (sent, recv) in metrics.network_interfaces.items():
+        lines.append(_influx_line(f"{prefix}_net", dict(tags, interface=interface),
+                                  {"sent_bytes": int(sent * _MB), "recv_bytes": int(recv * _MB)}, timestamp))
+    for rank, proc in enumerate(metrics.top_processes, 1):
+        fields = {key: float(proc[key]) for key in ("cpu_percent", "memory_percent") if proc.get(key) is not None}
+        if fields:
+            lines.append(_influx_line(f"{prefix}_process",
+                                      dict(tags, rank=rank, pid=proc.get("pid", ""), name=proc.get("name") or ""),
+                                      fields, timestamp))
+    return lines
+
+
+class UDPExporter:
+    """UDP推送导出器"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8125, protocol: str = "statsd",
+                 prefix: str = "sysmon", packet_size: int = DEFAULT_PACKET_SIZE,
+                 tags: Optional[Dict[str, str]] = None):
+        """
+        初始化UDP导出器
+
+        Args:
+            host: 接收方地址
+            port: 接收方端口
+            protocol: statsd或influx
+            prefix: 指标名前缀（influx为measurement名）
+            packet_size: 每个数据报的最大字节数
+            tags: influx模式下附加到每行的标签，默认带上主机名
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"不支持的协议: {protocol}")
+
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.prefix = prefix
+        self.packet_size = packet_size
+        self.tags = tags if tags is not None else {"host": socket.gethostname()}
+
+        self.packets_sent = 0
+        self.packets_dropped = 0
+        self.bytes_sent = 0
+
+        # 每个数据报在同一块缓冲区中拼装，不为每次发送分配内存
+        self._buffer = bytearray(packet_size)
+        self._view = memoryview(self._buffer)
+
+        # 连接后发送时不再需要解析地址
+        family, _, _, _, address = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM)[0]
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._socket.connect(address)
+
+    def format(self, metrics: SystemMetrics) -> List[bytes]:
+        """将监控数据转换为协议行"""
+        if self.protocol == "statsd":
+            return format_statsd(metrics, self.prefix)
+        return format_influx(metrics, self.prefix, self.tags)
+
+    def _send(self, data) -> None:
+        """发送一个数据报，失败时计为丢弃"""
+        try:
+            self._socket.send(data)
+            self.packets_sent += 1
+            self.bytes_sent += len(data)
+        except OSError:
+            # 缓冲区已满（BlockingIOError）或接收方不可达（ConnectionRefusedError）
+            self.packets_dropped += 1
+
+    def send_lines(self, lines: List[bytes]):
+        """把多行装入尽量少的数据报后连续发送"""
+        view = self._view
+        used = 0
+        for line in lines:
+            size = len(line)
+            if size > self.packet_size:
+                # 单行超过数据报大小时单独发送
+                if used:
+                    self._send(view[:used])
+                    used = 0
+                self._send(line)
+                continue
+            if used and used + 1 + size > self.packet_size:
+                self._send(view[:used])
+                used = 0
+            if used:
+                view[used] = 10
+                used += 1
+            view[used:used + size] = line
+            used += size
+        if used:
+            self._send(view[:used])
+
+    def export_single(self, metrics: SystemMetrics):
+        """导出单次监控数据"""
+        self.send_lines(self.format(metrics))
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """批量导出监控数据，所有行一起装包"""
+        lines = []
+        for metrics in metrics_list:
+            lines.extend(self.format(metrics))
+        self.send_lines(lines)
+
+    def close(self):
+        """关闭套接字"""
+        self._socket.close()
\ No newline at end of file
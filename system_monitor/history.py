@@ -0,0 +1,216 @@
+"""
+监控数据历史环形缓冲区
+"""
+
+import bisect
+import math
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 默认记录的指标，另外会记录首次采样时的每个核心
+DEFAULT_COLUMNS = (
+    "cpu_percent",
+    "memory_percent",
+    "memory_used_gb",
+    "network_sent_mb",
+    "network_recv_mb",
+    "network_connections",
+)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """线性插值百分位数（与numpy.percentile默认方法一致）"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class MetricsHistory:
+    """
+    定长的监控数据环形缓冲区
+
+    每个指标一列，容量固定，内存占用与运行时间无关；
+    安装numpy时使用numpy数组并向量化计算，否则使用array模块
+    """
+
+    def __init__(self, capacity: int, columns: Optional[Iterable[str]] = None,
+                 include_cores: bool = True):
+        """
+        初始化历史缓冲区
+
+        Args:
+            capacity: 最多保存的采样数
+            columns: 记录的指标名（与SystemMetrics.flatten()的键一致）
+            include_cores: 是否记录每个核心的使用率
+        """
+        if capacity < 1:
+            raise ValueError("capacity必须大于0")
+
+        self.capacity = capacity
+        self.include_cores = include_cores
+        self._names = list(columns or DEFAULT_COLUMNS)
+        self._columns: Dict[str, Any] = {}
+        self._timestamps = self._new_column()
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _new_column(self, size: Optional[int] = None):
+        size = self.capacity if size is None else size
+        if np is not None:
+            return np.full(size, np.nan)
+        return array("d", [math.nan]) * size
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def columns(self) -> List[str]:
+        """记录的指标名"""
+        return list(self._columns)
+
+    def append(self, metrics):
+        """追加一次SystemMetrics"""
+        self.append_values(metrics.timestamp.timestamp(), metrics.flatten())
+
+    def append_values(self, timestamp: float, values: Dict[str, float]):
+        """追加一次采样"""
+        with self._lock:
+            if not self._initialized:
+                names = list(self._names)
+                if self.include_cores:
+                    names += [name for name in values if name.startswith("cpu_core_") and name not in names]
+                self._columns = {name: self._new_column() for name in names}
+                self._initialized = True
+
+            index = self._head
+            self._timestamps[index] = timestamp
+            for name, column in self._columns.items():
+                column[index] = values.get(name, math.nan)
+
+            self._head = (index + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def _ordered(self, column) -> Any:
+        """按时间顺序排列的有效数据（复制），之后的追加不影响返回值"""
+        if np is not None:
+            if self._size < self.capacity:
+                # numpy切片是视图，需要复制
+                return column[:self._size].copy()
+            return np.concatenate((column[self._head:], column[:self._head]))
+        if self._size < self.capacity:
+            return column[:self._size]
+        return column[self._head:] + column[:self._head]
+
+    def window(self, seconds: Optional[float] = None, last: Optional[int] = None,
+               columns: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        获取最近的数据
+
+        Args:
+            seconds: 最近多少秒（相对最后一次采样）
+            last: 最近多少次采样
+            columns: 要返回的指标，默认全部
+
+        Returns:
+            包含timestamp及各指标的列，按时间顺序排列
+        """
+        with self._lock:
+            timestamps = self._ordered(self._timestamps)
+            start = 0
+            if seconds is not None and len(timestamps):
+                start = bisect.bisect_left(timestamps, timestamps[-1] - seconds)
+            if last is not None:
+                start = max(start, len(timestamps) - last)
+
+            result = {"timestamp": timestamps[start:]}
+            for name in (columns or self._columns):
+                if name in self._columns:
+                    result[name] = self._ordered(self._columns[name])[start:]
+                elif not self._initialized:
+                    # 首次采样前尚未确定记录哪些指标，返回等长的空值列
+                    result[name] = self._new_column(len(timestamps) - start)
+                else:
+                    raise KeyError(f"未记录的指标: {name}")
+            return result
+
+    def _values(self, metric: str, seconds: Optional[float]) -> Tuple[Any, Any]:
+        """窗口内某指标的(时间戳, 有效值)"""
+        data = self.window(seconds, columns=[metric])
+        timestamps, values = data["timestamp"], data[metric]
+        if np is not None:
+            mask = ~np.isnan(values)
+            return timestamps[mask], values[mask]
+        pairs = [(t, v) for t, v in zip(timestamps, values) if v == v]
+        return [t for t, _ in pairs], [v for _, v in pairs]
+
+    def mean(self, metric: str, seconds: Optional[float] = None) -> Optional[float]:
+        """窗口内的平均值"""
+        _, values = self._values(metric, seconds)
+        if not len(values):
+            return None
+        if np is not None:
+            return float(values.mean())
+        return sum(values) / len(values)
+
+    def max(self, metric: str, seconds: Optional[float] = None) -> Optional[float]:
+        """窗口内的最大值"""
+        _, values = self._values(metric, seconds)
+        if not len(values):
+            return None
+        return float(values.max()) if np is not None else max(values)
+
+    def min(self, metric: str, seconds: Optional[float] = None) -> Optional[float]:
+        """窗口内的最小值"""
+        _, values = self._values(metric, seconds)
+        if not len(values):
+            return None
+        return float(values.min()) if np is not None else min(values)
+
+    def percentile(self, metric: str, q: float, seconds: Optional[float] = None) -> Optional[float]:
+        """窗口内的百分位数，q取0~100"""
+        _, values = self._values(metric, seconds)
+        if not len(values):
+            return None
+        if np is not None:
+            return float(np.percentile(values, q))
+        return _percentile(values, q)
+
+    def rate(self, metric: str, seconds: Optional[float] = None) -> Optional[float]:
+        """
+        计数器类指标（如network_sent_mb）在窗口内的每秒变化率
+
+        计数器回绕或重置（数值变小）时，该区间按从0开始计算
+        """
+        timestamps, values = self._values(metric, seconds)
+        if len(values) < 2:
+            return None
+        elapsed = timestamps[-1] - timestamps[0]
+        if elapsed <= 0:
+            return None
+
+        if np is not None:
+            deltas = np.diff(values)
+            resets = deltas < 0
+            deltas[resets] = values[1:][resets]
+            return float(deltas.sum() / elapsed)
+
+        total = 0.0
+        for previous, current in zip(values, values[1:]):
+            total += current - previous if current >= previous else current
+        return total / elapsed
+
+    def clear(self):
+        """清空缓冲区"""
+        with self._lock:
+            self._head = 0
+            self._size = 0
\ No newline at end of file
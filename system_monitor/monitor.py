@@ -2,14 +2,17 @@
 系统监控主模块
 """
 
-import time
 import threading
-from typing import Dict, List, Optional, Callable, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Callable, Any, Tuple
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from enum import Enum
 
 from system_monitor.collectors import CPUCollector, MemoryCollector, DiskCollector, NetworkCollector, ProcessCollector
+from system_monitor.collectors import CgroupCollector, KernelSnapshot, ProcessWatchlist, ShardedProcessSampler, SnapshotReader
+from system_monitor.scheduler import DeadlineScheduler, OverrunPolicy, SchedulerStats
+from system_monitor.dispatcher import CallbackDispatcher, DropPolicy, SubscriberStats
+from system_monitor.history import MetricsHistory
 
 
 # from collectors import CPUCollector, MemoryCollector, DiskCollector, NetworkCollector, ProcessCollector
@@ -22,6 +25,38 @@ class MonitorLevel(Enum):
     ADVANCED = "advanced"
 
 
+# 各监控级别下每类指标的采样周期（秒），0表示每次采样都收集
+CADENCE_PROFILES: Dict[MonitorLevel, Dict[str, float]] = {
+    MonitorLevel.BASIC: {
+        "cpu": 0,
+        "memory": 0,
+        "network": 0,
+        "connections": 60,
+        "disk": 60,
+        "processes": 30,
+    },
+    MonitorLevel.STANDARD: {
+        "cpu": 0,
+        "memory": 0,
+        "network": 0,
+        "connections": 10,
+        "disk": 30,
+        "processes": 5,
+    },
+    MonitorLevel.ADVANCED: {
+        "cpu": 0,
+        "memory": 0,
+        "network": 0,
+        "connections": 1,
+        "disk": 10,
+        "processes": 1,
+    },
+}
+
+# 采样时刻的允许误差（秒），避免调度抖动导致周期被推迟一整个间隔
+_CADENCE_TOLERANCE = 0.05
+
+
 @dataclass
 class SystemMetrics:
     """系统指标数据类"""
@@ -36,59 +71,245 @@ class SystemMetrics:
     network_recv: float
     network_connections: int
     top_processes: List[Dict[str, Any]]
+    # 各类指标的数据年龄（秒），0表示本次采样新收集
+    ages: Dict[str, float] = field(default_factory=dict)
+    # 每个网卡的(发送MB, 接收MB)
+    network_interfaces: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    # 关注进程的采样结果（见SystemMonitor.watch），每个存活进程一项
+    watched_processes: List[Dict[str, Any]] = field(default_factory=list)
+    # 各cgroup（容器、服务）的资源使用，需启用cgroup收集
+    cgroups: List[Dict[str, Any]] = field(default_factory=list)
+
+    def flatten(self) -> Dict[str, float]:
+        """
+        展开为"指标名: 数值"的字典
+
+        每个核心、每个挂载点各为一项，命名与CSV宽表的列名一致
+        """
+        values = {"cpu_percent": float(self.cpu_percent)}
+        for index, percent in enumerate(self.cpu_per_core):
+            values[f"cpu_core_{index}"] = float(percent)
+        values["memory_percent"] = float(self.memory_percent)
+        values["memory_used_gb"] = float(self.memory_used)
+        values["memory_total_gb"] = float(self.memory_total)
+        for mount, percent in (self.disk_usage or {}).items():
+            values[f"disk:{mount}"] = float(percent)
+        values["network_sent_mb"] = float(self.network_sent)
+        values["network_recv_mb"] = float(self.network_recv)
+        values["network_connections"] = float(self.network_connections)
+        for label, totals in self._watch_totals().items():
+            for name, value in totals.items():
+                values[f"watch:{label}:{name}"] = value
+        for cgroup in self.cgroups:
+            prefix = f"cgroup:{cgroup['path']}:"
+            values[prefix + "cpu_percent"] = float(cgroup["cpu_percent"])
+            if cgroup["memory_current"] is not None:
+                values[prefix + "memory_mb"] = cgroup["memory_current"] / (1024 ** 2)
+            for key in ("io_read_bytes_per_sec", "io_write_bytes_per_sec", "pids"):
+                if cgroup[key] is not None:
+                    values[prefix + key] = float(cgroup[key])
+        return values
+
+    def _watch_totals(self) -> Dict[str, Dict[str, float]]:
+        """按关注项汇总关注进程（同一名称可能匹配多个进程）"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for proc in self.watched_processes:
+            label = totals.setdefault(proc["label"], {
+                "processes": 0.0, "cpu_percent": 0.0, "rss_mb": 0.0, "threads": 0.0,
+                "ctx_switches_per_sec": 0.0,
+            })
+            if not proc["running"]:
+                continue
+            label["processes"] += 1
+            label["cpu_percent"] += proc["cpu_percent"]
+            label["rss_mb"] += proc["memory_rss"] / (1024 ** 2)
+            label["threads"] += proc["num_threads"]
+            label["ctx_switches_per_sec"] += proc["ctx_switches_per_sec"]
+            for key in ("num_fds", "read_bytes_per_sec", "write_bytes_per_sec"):
+                if proc[key] is not None:
+                    label[key] = label.get(key, 0.0) + proc[key]
+        return totals
 
 
 class SystemMonitor:
     """系统监控器"""
 
-    def __init__(self, level: MonitorLevel = MonitorLevel.STANDARD):
+    def __init__(self, level: MonitorLevel = MonitorLevel.STANDARD,
+                 cadences: Optional[Dict[str, float]] = None,
+                 callback_workers: int = 2,
+                 backend: str = "auto",
+                 history_size: int = 0,
+                 process_workers: int = 0,
+                 cgroup_pattern: Optional[str] = None,
+                 cgroup_depth: int = 2,
+                 exclude_fstypes: Iterable[str] = ()):
         """
         初始化系统监控器
 
         Args:
-            level: 监控级别
+            level: 监控级别，决定各类指标的默认采样周期
+            cadences: 覆盖指定类别的采样周期（秒），如 {"disk": 60}
+            callback_workers: 执行回调函数的工作线程数
+            backend: 内核数据后端，auto/procfs/psutil
+            history_size: 保存在内存中的历史采样数，0表示不保存
+            process_workers: 大于0时用该数量的工作进程按PID分片采样进程（需要/proc），
+                             适合进程数极多的主机；0表示用psutil在当前线程中采样
+            cgroup_pattern: 指定时按cgroup v2统计匹配的cgroup（容器、服务）的资源使用，
+                            为相对/sys/fs/cgroup的路径通配符，如"system.slice/*"
+            cgroup_depth: 遍历cgroup层级的最大深度
+            exclude_fstypes: 磁盘使用率中忽略的文件系统类型，默认不忽略
         """
         self.level = level
+        self.cadences = dict(CADENCE_PROFILES[level])
+        if cadences:
+            unknown = set(cadences) - set(self.cadences)
+            if unknown:
+                raise ValueError(f"未知的指标类别: {', '.join(sorted(unknown))}")
+            self.cadences.update(cadences)
         self.running = False
         self.monitor_thread = None
         self.callbacks = []
+        self.dispatcher = CallbackDispatcher(workers=callback_workers)
+        self.scheduler: Optional[DeadlineScheduler] = None
+        self._stop_event = threading.Event()
 
         # 初始化收集器
         self.cpu_collector = CPUCollector()
         self.memory_collector = MemoryCollector()
-        self.disk_collector = DiskCollector()
+        self.disk_collector = DiskCollector(exclude_fstypes)
         self.network_collector = NetworkCollector()
-        self.process_collector = ProcessCollector()
+        if process_workers > 0:
+            self.process_collector = ShardedProcessSampler(process_workers)
+        else:
+            self.process_collector = ProcessCollector()
+        self.watchlist = ProcessWatchlist()
+        self.cgroup_collector: Optional[CgroupCollector] = None
+        if cgroup_pattern is not None:
+            self.cgroup_collector = CgroupCollector(max_depth=cgroup_depth, pattern=cgroup_pattern)
+
+        # 每次采样共享的内核快照
+        self.snapshot_reader = SnapshotReader(backend)
+
+        # 各类指标的最近一次结果及收集时刻
+        self._cache: Dict[str, Any] = {}
+        self._collected_at: Dict[str, float] = {}
+
+        # 最近的历史数据，可按时间窗口查询
+        self.history: Optional[MetricsHistory] = MetricsHistory(history_size) if history_size else None
+
+    def watch(self, pid: Optional[int] = None, name: Optional[str] = None, pidfile: Optional[str] = None,
+              label: Optional[str] = None) -> str:
+        """
+        关注指定进程，之后每次采样都在SystemMetrics.watched_processes中报告其
+        CPU使用率、内存、I/O速率、上下文切换速率和文件描述符数
+
+        Args:
+            pid: 进程ID
+            name: 进程名，支持通配符，进程重启后自动重新关注
+            pidfile: pid文件路径，进程重启后跟随新的pid
+            label: 关注项名称
+
+        Returns:
+            关注项名称
+        """
+        return self.watchlist.add(pid=pid, name=name, pidfile=pidfile, label=label)
+
+    def unwatch(self, label: str):
+        """取消关注"""
+        self.watchlist.remove(label)
+
+    def get_snapshot(self) -> KernelSnapshot:
+        """读取一次内核数据快照"""
+        return self.snapshot_reader.read()
+
+    def _sample(self, name: str, now: float, collect: Callable[[], Any], force: bool) -> Any:
+        """按采样周期收集指标，未到周期时返回缓存值"""
+        last = self._collected_at.get(name)
+        cadence = self.cadences.get(name, 0)
+
+        if force or last is None or now - last >= cadence - _CADENCE_TOLERANCE:
+            self._cache[name] = collect()
+            self._collected_at[name] = now
+
+        return self._cache[name]
+
+    def get_metrics(self, force: bool = False) -> SystemMetrics:
+        """
+        获取当前系统指标
+
+        Args:
+            force: 忽略采样周期，强制收集所有指标
+        """
+        snapshot = self.get_snapshot()
+        now = snapshot.monotonic
+
+        cpu = self._sample("cpu", now, lambda: (
+            self.cpu_collector.get_cpu_percent(snapshot=snapshot),
+            self.cpu_collector.get_cpu_per_core(snapshot),
+        ), force)
+        memory = self._sample("memory", now, lambda: (
+            self.memory_collector.get_memory_percent(snapshot),
+            self.memory_collector.get_memory_used(snapshot),
+            self.memory_collector.get_memory_total(snapshot),
+        ), force)
+        network = self._sample("network", now, lambda: (
+            self.network_collector.get_bytes_sent(snapshot),
+            self.network_collector.get_bytes_recv(snapshot),
+            self.network_collector.get_interface_io(snapshot),
+        ), force)
+        disk_usage = self._sample("disk", now, self.disk_collector.get_all_disk_usage, force)
+        connections = self._sample("connections", now, self.network_collector.get_connections_count, force)
+        processes = self._sample("processes", now, lambda: self.process_collector.get_top_processes(5), force)
+        # 关注进程不受采样周期限制，每次都读取以得到逐次的速率
+        watched = [asdict(sample) for sample in self.watchlist.sample()] if len(self.watchlist) else []
+        cgroups = []
+        if self.cgroup_collector is not None:
+            # 开销只与cgroup数有关，每次都读取以得到逐次的速率
+            cgroups = [asdict(stats) for stats in self.cgroup_collector.collect()]
 
-    def get_metrics(self) -> SystemMetrics:
-        """获取当前系统指标"""
         metrics = SystemMetrics(
-            timestamp=datetime.now(),
-            cpu_percent=self.cpu_collector.get_cpu_percent(),
-            cpu_per_core=self.cpu_collector.get_cpu_per_core(),
-            memory_percent=self.memory_collector.get_memory_percent(),
-            memory_used=self.memory_collector.get_memory_used(),
-            memory_total=self.memory_collector.get_memory_total(),
-            disk_usage=self.disk_collector.get_all_disk_usage(),
-            network_sent=self.network_collector.get_bytes_sent(),
-            network_recv=self.network_collector.get_bytes_recv(),
-            network_connections=self.network_collector.get_connections_count(),
-            top_processes=self.process_collector.get_top_processes(5)
+            timestamp=snapshot.timestamp,
+            cpu_percent=cpu[0],
+            cpu_per_core=cpu[1],
+            memory_percent=memory[0],
+            memory_used=memory[1],
+            memory_total=memory[2],
+            disk_usage=disk_usage,
+            network_sent=network[0],
+            network_recv=network[1],
+            network_connections=connections,
+            top_processes=processes,
+            ages={name: now - collected_at for name, collected_at in self._collected_at.items()},
+            network_interfaces=network[2],
+            watched_processes=watched,
+            cgroups=cgroups,
         )
 
+        if self.history is not None:
+            self.history.append(metrics)
+
         return metrics
 
-    def start_monitoring(self, interval: float = 1.0):
+    def start_monitoring(self, interval: float = 1.0, align_to_wall_clock: bool = False,
+                         overrun_policy: OverrunPolicy = OverrunPolicy.SKIP):
         """
         开始持续监控
 
         Args:
             interval: 监控间隔（秒）
+            align_to_wall_clock: 是否将采样点对齐到墙上时钟的整数倍间隔
+            overrun_policy: 采样超时处理策略
         """
         if self.running:
             return
 
         self.running = True
+        self._stop_event.clear()
+        self.scheduler = DeadlineScheduler(
+            interval,
+            align_to_wall_clock=align_to_wall_clock,
+            overrun_policy=overrun_policy
+        )
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop,
             args=(interval,),
@@ -99,31 +320,57 @@ class SystemMonitor:
     def stop_monitoring(self):
         """停止监控"""
         self.running = False
+        self._stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
 
+    def close(self):
+        """停止监控并释放收集器占用的资源（如分片采样的工作进程）"""
+        self.stop_monitoring()
+        if hasattr(self.process_collector, 'close'):
+            self.process_collector.close()
+
     def _monitor_loop(self, interval: float):
         """监控循环"""
-        while self.running:
-            metrics = self.get_metrics()
+        if self.scheduler is None:
+            self.scheduler = DeadlineScheduler(interval)
 
-            # 调用所有回调函数
-            for callback in self.callbacks:
-                try:
-                    callback(metrics)
-                except Exception as e:
-                    print(f"Callback error: {e}")
+        self.dispatcher.start()
+        try:
+            while self.running and self.scheduler.wait(self._stop_event):
+                metrics = self.get_metrics()
 
-            time.sleep(interval)
+                # 回调函数由分发器的工作线程异步执行，不影响采样节奏
+                self.dispatcher.publish(metrics)
+        finally:
+            self.dispatcher.stop()
 
-    def register_callback(self, callback: Callable[[SystemMetrics], None]):
-        """注册回调函数"""
+    def get_scheduler_stats(self) -> Optional[SchedulerStats]:
+        """获取调度统计（采样次数、超时次数、抖动）"""
+        return self.scheduler.stats if self.scheduler else None
+
+    def register_callback(self, callback: Callable[[SystemMetrics], None],
+                          policy: DropPolicy = DropPolicy.DROP_OLDEST, maxsize: int = 1000):
+        """
+        注册回调函数
+
+        Args:
+            callback: 回调函数
+            policy: 回调处理不及时、队列满时的处理策略
+            maxsize: 该回调的队列容量
+        """
         self.callbacks.append(callback)
+        self.dispatcher.subscribe(callback, maxsize=maxsize, policy=policy)
 
     def unregister_callback(self, callback: Callable[[SystemMetrics], None]):
         """注销回调函数"""
         if callback in self.callbacks:
             self.callbacks.remove(callback)
+            self.dispatcher.unsubscribe(callback)
+
+    def get_callback_stats(self) -> Dict[str, SubscriberStats]:
+        """获取各回调的队列深度与丢弃统计"""
+        return self.dispatcher.get_stats()
 
     def get_system_info(self) -> Dict[str, Any]:
         """获取系统信息"""
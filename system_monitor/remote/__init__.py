@@ -0,0 +1,14 @@
+"""
+远程采集模块：代理推送与集中汇聚
+"""
+
+from .agent import AgentExporter, Spool
+from .aggregator import Aggregator, AggregatorStats, run_aggregator
+
+__all__ = [
+    'AgentExporter',
+    'Aggregator',
+    'AggregatorStats',
+    'run_aggregator',
+    'Spool',
+]
\ No newline at end of file
@@ -0,0 +1,336 @@
+"""
+监控代理：把本机的监控数据批量推送到汇聚服务
+"""
+
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from system_monitor import SystemMetrics
+from system_monitor.exporters.archive_exporter import encode_rows
+from .protocol import ACK, FRAME_HEADER, ProtocolError, encode_batch, encode_hello, parse_frame_header, SEQUENCE
+
+SPOOL_SUFFIX = ".blk"
+
+# 缓存目录中保存代理标识的文件
+AGENT_ID_FILE = "agent_id"
+
+# 缓存目录中保存已预留序号上限的文件，每次预留SEQUENCE_RESERVE个，不必每块都写入
+SEQUENCE_FILE = "sequence"
+SEQUENCE_RESERVE = 1024
+
+# 每轮最多发送的批次数和字节数，积压很多时分批发送，不一次读入整个缓存
+SEND_WINDOW_BATCHES = 64
+SEND_WINDOW_BYTES = 1024 * 1024
+
+# 等待确认时的接收超时（秒）
+_RECV_TIMEOUT = 0.2
+
+
+class Spool:
+    """
+    待确认数据块的本地缓存
+
+    指定目录时每个块写入一个文件，代理重启或断线期间的数据不会丢失；
+    否则只保存在内存中。超过max_batches时丢弃最旧的块。
+    agent_id标识序号所属的缓存，汇聚端按它去重：指定目录时标识和已用序号随缓存一起保存，
+    重启后序号继续递增；内存缓存每次新建标识，序号从1开始。序号不依赖系统时钟。
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_batches: int = 10000):
+        self.directory = Path(directory) if directory else None
+        self.max_batches = max_batches
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[int, bytes]" = OrderedDict()
+
+        last = 0
+        self._reserved = 0
+        self.agent_id = uuid.uuid4().hex
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.agent_id = self._load_agent_id()
+            for path in sorted(self.directory.glob(f"*{SPOOL_SUFFIX}")):
+                if path.stem.isdigit():
+                    self._items[int(path.stem)] = b""
+            if self._items:
+                last = next(reversed(self._items))
+            last = max(last, self._load_reserved())
+            self._reserved = last
+        self._next = last + 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _load_agent_id(self) -> str:
+        path = self.directory / AGENT_ID_FILE
+        try:
+            agent_id = path.read_text().strip()
+        except FileNotFoundError:
+            agent_id = ""
+        if not agent_id:
+            agent_id = self.agent_id
+            temp = path.with_suffix(".tmp")
+            temp.write_text(agent_id)
+            os.replace(temp, path)
+        return agent_id
+
+    def _load_reserved(self) -> int:
+        try:
+            return int((self.directory / SEQUENCE_FILE).read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _reserve(self, upto: int):
+        path = self.directory / SEQUENCE_FILE
+        temp = path.with_suffix(".tmp")
+        temp.write_text(str(upto))
+        os.replace(temp, path)
+        self._reserved = upto
+
+    def _path(self, sequence: int) -> Path:
+        return self.directory / f"{sequence:020d}{SPOOL_SUFFIX}"
+
+    def put(self, block: bytes) -> int:
+        """加入一个数据块，返回分配的序号"""
+        with self._lock:
+            sequence = self._next
+            self._next += 1
+            if self.directory is not None:
+                if sequence > self._reserved:
+                    self._reserve(sequence + SEQUENCE_RESERVE - 1)
+                temp = self._path(sequence).with_suffix(".tmp")
+                with open(temp, "wb") as f:
+                    f.write(block)
+                os.replace(temp, self._path(sequence))
+                self._items[sequence] = b""
+            else:
+                self._items[sequence] = block
+            while len(self._items) > self.max_batches:
+                self._remove(next(iter(self._items)))
+                self.dropped += 1
+            return sequence
+
+    def _remove(self, sequence: int):
+        self._items.pop(sequence, None)
+        if self.directory is not None:
+            try:
+                self._path(sequence).unlink()
+            except FileNotFoundError:
+                pass
+
+    def pending(self, after: int = 0, limit: Optional[int] = None,
+                max_bytes: Optional[int] = None) -> List[Tuple[int, bytes]]:
+        """
+        序号大于after的待确认数据块
+
+        Args:
+            after: 只返回序号大于after的块
+            limit: 最多返回的块数，None表示不限制
+            max_bytes: 累计超过该字节数后不再读取（至少返回一块），None表示不限制
+        """
+        with self._lock:
+            sequences = [sequence for sequence in self._items if sequence > after]
+        result = []
+        size = 0
+        for sequence in sequences:
+            if (limit is not None and len(result) >= limit) or (max_bytes is not None and result and size >= max_bytes):
+                break
+            if self.directory is None:
+                block = self._items.get(sequence)
+                if block is None:
+                    continue
+            else:
+                try:
+                    block = self._path(sequence).read_bytes()
+                except FileNotFoundError:
+                    continue
+            result.append((sequence, block))
+            size += len(block)
+        return result
+
+    def ack(self, sequence: int):
+        """确认序号不大于sequence的所有数据块"""
+        with self._lock:
+            for pending in [pending for pending in self._items if pending <= sequence]:
+                self._remove(pending)
+
+
+class AgentExporter:
+    """把监控数据编码为归档块后通过TCP推送，断线自动重连并重发未确认的块"""
+
+    def __init__(self, server_host: str, server_port: int = 9120, hostname: Optional[str] = None,
+                 batch_size: int = 60, flush_interval: float = 5.0, spool_dir: Optional[str] = None,
+                 max_spool_batches: int = 10000, connect_timeout: float = 5.0,
+                 reconnect_min: float = 0.5, reconnect_max: float = 30.0, send_timeout: float = 30.0):
+        """
+        初始化代理
+
+        Args:
+            server_host: 汇聚服务地址
+            server_port: 汇聚服务端口
+            hostname: 上报的主机名，默认为本机主机名
+            batch_size: 每批最多的采样数
+            flush_interval: 距批次第一条数据多少秒后发送
+            spool_dir: 未确认数据的本地缓存目录，None表示只缓存在内存中
+            max_spool_batches: 最多缓存的批次数
+            connect_timeout: 连接超时（秒）
+            reconnect_min: 重连的最小等待时间（秒），连续失败时翻倍
+            reconnect_max: 重连的最大等待时间（秒）
+            send_timeout: 发送一轮批次的超时（秒），超时后断开重连
+        """
+        self.server = (server_host, server_port)
+        self.hostname = hostname or socket.gethostname()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.connect_timeout = connect_timeout
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.send_timeout = send_timeout
+        self.spool = Spool(spool_dir, max_spool_batches)
+
+        self.connected = False
+        self.connect_failed = False
+        self.connections = 0
+        self.batches_sent = 0
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+
+        self._timestamps: List[float] = []
+        self._rows: List[Dict[str, float]] = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动后台发送线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def export_single(self, metrics: SystemMetrics):
+        """缓冲一次监控数据，满一批后交给发送线程"""
+        self.start()
+        timestamp = metrics.timestamp.timestamp()
+        self._timestamps.append(timestamp)
+        self._rows.append(metrics.flatten())
+        if len(self._rows) >= self.batch_size or timestamp - self._timestamps[0] >= self.flush_interval:
+            self.flush()
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """批量导出监控数据"""
+        for metrics in metrics_list:
+            self.export_single(metrics)
+
+    def flush(self):
+        """把缓冲的数据编码为一个块放入缓存"""
+        if not self._rows:
+            return
+        self.spool.put(encode_rows(self._timestamps, self._rows))
+        self._timestamps = []
+        self._rows = []
+        self._wakeup.set()
+
+    def close(self, timeout: float = 5.0):
+        """发送剩余数据，最多等待timeout秒后停止；未确认的数据保留在缓存目录中"""
+        self.flush()
+        if self._thread is not None:
+            deadline = time.monotonic() + timeout
+            # 尚未连上时也等待，直到连接失败或超时
+            while len(self.spool) and not self.connect_failed and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self._stop.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        """发送线程：连接、发送、等待确认，断线后按指数退避重连"""
+        delay = self.reconnect_min
+        while not self._stop.is_set():
+            try:
+                sock = socket.create_connection(self.server, timeout=self.connect_timeout)
+            except OSError:
+                self.connect_failed = True
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.reconnect_max)
+                continue
+
+            self.connect_failed = False
+            self.connections += 1
+            protocol_error = False
+            try:
+                self._session(sock)
+            except OSError:
+                pass
+            except (ProtocolError, ValueError, struct.error) as e:
+                # 对端数据错误：记录后退避重连，发送线程不退出
+                protocol_error = True
+                self.errors += 1
+                self.last_error = e
+                print(f"Agent protocol error: {e}", file=sys.stderr)
+            finally:
+                self.connected = False
+                sock.close()
+            # 连接断开按最小间隔重连，连续的协议错误按指数退避
+            if not protocol_error:
+                delay = self.reconnect_min
+            if not self._stop.is_set():
+                self._stop.wait(delay)
+            if protocol_error:
+                delay = min(delay * 2, self.reconnect_max)
+
+    def _session(self, sock: socket.socket):
+        """一次连接内的发送循环：每轮发送一个窗口的批次，再短暂等待确认"""
+        sock.settimeout(self.send_timeout)
+        sock.sendall(encode_hello(self.hostname, self.spool.agent_id))
+        self.connected = True
+        sent = 0
+        buffer = bytearray()
+
+        while not self._stop.is_set():
+            pending = self.spool.pending(sent, SEND_WINDOW_BATCHES, SEND_WINDOW_BYTES)
+            if pending:
+                # sendall的超时是整个调用的总时长，发送时使用较长的超时
+                sock.settimeout(self.send_timeout)
+                sock.sendall(b"".join(encode_batch(sequence, block) for sequence, block in pending))
+                sent = pending[-1][0]
+                self.batches_sent += len(pending)
+
+            # 还有积压时只读取已到达的确认，不等待；否则短暂等待确认或新数据
+            sock.settimeout(0 if pending else _RECV_TIMEOUT)
+            received = False
+            while True:
+                try:
+                    chunk = sock.recv(65536)
+                except (socket.timeout, BlockingIOError):
+                    break
+                if chunk == b"":
+                    raise ConnectionError("连接已关闭")
+                buffer += chunk
+                received = True
+                sock.settimeout(0)
+            if received:
+                self._handle_acks(buffer)
+
+            if not pending and not received:
+                self._wakeup.wait(0.2)
+                self._wakeup.clear()
+
+    def _handle_acks(self, buffer: bytearray):
+        """处理缓冲区中完整的ACK帧"""
+        while len(buffer) >= FRAME_HEADER.size:
+            frame_type, length = parse_frame_header(bytes(buffer[:FRAME_HEADER.size]))
+            if len(buffer) < FRAME_HEADER.size + length:
+                return
+            payload = bytes(buffer[FRAME_HEADER.size:FRAME_HEADER.size + length])
+            del buffer[:FRAME_HEADER.size + length]
+            if frame_type == ACK and len(payload) == SEQUENCE.size:
+                self.spool.ack(SEQUENCE.unpack(payload)[0])
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+汇聚服务：接收多个代理推送的数据，按主机写入归档文件
+
+数据块的校验和写入在单独的写入线程中进行，不阻塞事件循环；
+文件只由该线程访问，不需要加锁。
+"""
+
+import asyncio
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from system_monitor.exporters.archive_exporter import FILE_MAGIC, validate_block
+from .protocol import (
+    BATCH, FRAME_HEADER, HELLO, ProtocolError, decode_batch, decode_hello, encode_ack, parse_frame_header
+)
+
+_UNSAFE_HOSTNAME = re.compile(r"[^A-Za-z0-9._-]")
+
+# 写缓冲超过该大小时等待发送，避免慢速连接占用过多内存
+_DRAIN_THRESHOLD = 64 * 1024
+
+
+def safe_hostname(hostname: str) -> str:
+    """把主机名转换为安全的文件名"""
+    return _UNSAFE_HOSTNAME.sub("_", hostname).lstrip(".")[:128] or "unknown"
+
+
+@dataclass
+class AggregatorStats:
+    """汇聚服务统计"""
+    connections: int = 0
+    active_connections: int = 0
+    batches: int = 0
+    samples: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+
+
+class _HostFiles:
+    """按主机打开的归档文件，超过上限时关闭最久未写入的文件"""
+
+    def __init__(self, directory: Path, max_open: int):
+        self.directory = directory
+        self.max_open = max_open
+        self._files: "OrderedDict[str, object]" = OrderedDict()
+
+    def path(self, hostname: str) -> Path:
+        return self.directory / f"{hostname}.smz"
+
+    def write(self, hostname: str, block: bytes):
+        handle = self._files.pop(hostname, None)
+        if handle is None:
+            path = self.path(hostname)
+            handle = open(path, "ab")
+            if handle.tell() == 0:
+                handle.write(FILE_MAGIC)
+            while len(self._files) >= self.max_open:
+                self._files.popitem(last=False)[1].close()
+        self._files[hostname] = handle
+        handle.write(block)
+        handle.flush()
+
+    def close(self):
+        for handle in self._files.values():
+            handle.close()
+        self._files.clear()
+
+
+class Aggregator:
+    """基于asyncio的汇聚服务"""
+
+    def __init__(self, output_dir: str, host: str = "0.0.0.0", port: int = 9120,
+                 max_open_files: int = 256):
+        """
+        初始化汇聚服务
+
+        Args:
+            output_dir: 输出目录，每个主机写入<主机名>.smz
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            max_open_files: 同时保持打开的归档文件数
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.host = host
+        self.port = port
+        self.stats = AggregatorStats()
+
+        self._files = _HostFiles(self.output_dir, max_open_files)
+        # 序号由各代理的缓存分配，按(主机名, 代理标识)分别去重，同名主机的多个代理互不影响
+        self._last_sequence: Dict[Tuple[str, str], int] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aggregator-writer")
+        self._closing = False
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> Tuple[str, int]:
+        """开始监听，返回实际的地址和端口"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        """启动并一直运行"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """停止监听，等待已接收的块写完后关闭文件"""
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._files.close)
+        self._writer.shutdown()
+
+    @staticmethod
+    async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+        frame_type, length = parse_frame_header(await reader.readexactly(FRAME_HEADER.size))
+        return frame_type, await reader.readexactly(length)
+
+    def _store(self, hostname: str, agent_id: str, sequence: int, block: bytes):
+        """
+        校验并写入一个数据块（在写入线程中执行），重复的块（代理重连后重发）只确认不写入；
+        损坏的块计入rejected后同样确认，代理据此丢弃，不会反复重发
+        """
+        key = (hostname, agent_id)
+        if sequence <= self._last_sequence.get(key, 0):
+            self.stats.duplicates += 1
+            return
+        try:
+            _, _, rows = validate_block(block)
+        except ValueError:
+            self.stats.rejected += 1
+            self._last_sequence[key] = sequence
+            return
+        self._files.write(hostname, block)
+        self._last_sequence[key] = sequence
+        self.stats.batches += 1
+        self.stats.samples += rows
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个代理连接"""
+        self.stats.connections += 1
+        self.stats.active_connections += 1
+        try:
+            frame_type, payload = await self._read_frame(reader)
+            if frame_type != HELLO:
+                raise ProtocolError("连接后的第一帧必须是HELLO")
+            hello = decode_hello(payload)
+            hostname = safe_hostname(str(hello["hostname"]))
+            # 旧版代理不发送标识，同名主机共用一组序号
+            agent_id = str(hello.get("agent_id") or "")
+
+            loop = asyncio.get_running_loop()
+            while True:
+                frame_type, payload = await self._read_frame(reader)
+                if self._closing:
+                    break
+                if frame_type != BATCH:
+                    continue
+                sequence, block = decode_batch(payload)
+                await loop.run_in_executor(self._writer, self._store, hostname, agent_id, sequence, block)
+                writer.write(encode_ack(sequence))
+                if writer.transport.get_write_buffer_size() > _DRAIN_THRESHOLD:
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ProtocolError, ValueError):
+            self.stats.rejected += 1
+        finally:
+            self.stats.active_connections -= 1
+            writer.close()
+
+
+def run_aggregator(output_dir: str, host: str = "0.0.0.0", port: int = 9120):
+    """运行汇聚服务直到被中断"""
+    aggregator = Aggregator(output_dir, host, port)
+
+    async def main():
+        try:
+            await aggregator.serve_forever()
+        finally:
+            await aggregator.close()
+
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+代理与汇聚服务之间的二进制帧格式
+
+每帧为固定长度的帧头（标记、类型、长度）加数据：
+HELLO携带JSON格式的主机信息（主机名和可选的代理标识）；BATCH携带序号和一个归档数据块
+（与.smz文件中的块格式相同，汇聚端可直接追加到文件）；ACK携带已写入的序号。
+"""
+
+import json
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+FRAME_HEADER = struct.Struct("<2sBI")
+FRAME_MAGIC = b"SM"
+PROTOCOL_VERSION = 1
+
+# 帧类型
+HELLO = 1
+BATCH = 2
+ACK = 3
+
+SEQUENCE = struct.Struct("<Q")
+
+# 单帧最大长度，防止错误数据导致分配过多内存
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """帧格式错误"""
+
+
+def encode_frame(frame_type: int, payload: bytes) -> bytes:
+    """编码一帧"""
+    return FRAME_HEADER.pack(FRAME_MAGIC, frame_type, len(payload)) + payload
+
+
+def parse_frame_header(header: bytes) -> Tuple[int, int]:
+    """解析帧头，返回(类型, 数据长度)"""
+    magic, frame_type, length = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC:
+        raise ProtocolError("帧标记错误")
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"帧过大: {length}")
+    return frame_type, length
+
+
+def encode_hello(hostname: str, agent_id: Optional[str] = None) -> bytes:
+    hello = {"hostname": hostname, "version": PROTOCOL_VERSION}
+    if agent_id:
+        hello["agent_id"] = agent_id
+    return encode_frame(HELLO, json.dumps(hello).encode("utf-8"))
+
+
+def decode_hello(payload: bytes) -> Dict[str, Any]:
+    try:
+        hello = json.loads(payload.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ProtocolError(f"HELLO格式错误: {e}")
+    if not isinstance(hello, dict) or not hello.get("hostname"):
+        raise ProtocolError("HELLO缺少hostname")
+    return hello
+
+
+def encode_batch(sequence: int, block: bytes) -> bytes:
+    return encode_frame(BATCH, SEQUENCE.pack(sequence) + block)
+
+
+def decode_batch(payload: bytes) -> Tuple[int, bytes]:
+    if len(payload) < SEQUENCE.size:
+        raise ProtocolError("BATCH数据不完整")
+    return SEQUENCE.unpack_from(payload)[0], payload[SEQUENCE.size:]
+
+
+def encode_ack(sequence: int) -> bytes:
+    return encode_frame(ACK, SEQUENCE.pack(sequence))
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+采样调度器
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional
+
+
+class OverrunPolicy(Enum):
+    """采样超时处理策略"""
+    SKIP = "skip"          # 跳过错过的采样点，等待下一个对齐点
+    COALESCE = "coalesce"  # 错过的采样点合并为一次立即采样
+
+
+@dataclass
+class SchedulerStats:
+    """调度统计"""
+    ticks: int = 0
+    overruns: int = 0
+    skipped: int = 0
+    last_jitter: float = 0.0
+    max_jitter: float = 0.0
+    total_jitter: float = 0.0
+
+    @property
+    def mean_jitter(self) -> float:
+        """平均抖动（秒）"""
+        return self.total_jitter / self.ticks if self.ticks else 0.0
+
+
+class DeadlineScheduler:
+    """基于单调时钟截止时间的调度器，采样点不会随执行耗时漂移"""
+
+    def __init__(self, interval: float, align_to_wall_clock: bool = False,
+                 overrun_policy: OverrunPolicy = OverrunPolicy.SKIP,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化调度器
+
+        Args:
+            interval: 采样间隔（秒）
+            align_to_wall_clock: 是否将采样点对齐到墙上时钟的整数倍间隔
+            overrun_policy: 采样超时处理策略
+            clock: 单调时钟函数
+        """
+        if interval <= 0:
+            raise ValueError("interval必须大于0")
+
+        self.interval = interval
+        self.align_to_wall_clock = align_to_wall_clock
+        self.overrun_policy = overrun_policy
+        self.clock = clock
+        self.stats = SchedulerStats()
+        self._deadline: Optional[float] = None
+
+    def _first_deadline(self) -> float:
+        """计算第一个采样点"""
+        now = self.clock()
+        if not self.align_to_wall_clock:
+            return now
+        offset = -time.time() % self.interval
+        return now + offset
+
+    def next_deadline(self) -> float:
+        """计算下一个采样点，并处理超时"""
+        if self._deadline is None:
+            self._deadline = self._first_deadline()
+            return self._deadline
+
+        deadline = self._deadline + self.interval
+        now = self.clock()
+
+        if now > deadline:
+            # 已错过的采样点数
+            missed = int(math.floor((now - deadline) / self.interval)) + 1
+            self.stats.overruns += 1
+
+            if self.overrun_policy is OverrunPolicy.COALESCE:
+                # 合并为一次立即采样，之后仍落在原网格上
+                deadline += (missed - 1) * self.interval
+                self.stats.skipped += missed - 1
+            else:
+                deadline += missed * self.interval
+                self.stats.skipped += missed
+
+        self._deadline = deadline
+        return deadline
+
+    def wait(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        等待下一个采样点
+
+        Args:
+            stop_event: 停止事件，设置后立即返回
+
+        Returns:
+            到达采样点返回True，被停止返回False
+        """
+        deadline = self.next_deadline()
+        delay = deadline - self.clock()
+
+        if delay > 0:
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+        elif stop_event is not None and stop_event.is_set():
+            return False
+
+        jitter = max(self.clock() - deadline, 0.0)
+        self.stats.ticks += 1
+        self.stats.last_jitter = jitter
+        self.stats.total_jitter += jitter
+        self.stats.max_jitter = max(self.stats.max_jitter, jitter)
+        return True
+
+    def run(self, tick: Callable[[], None], stop_event: threading.Event):
+        """按调度循环执行tick，直到stop_event被设置"""
+        while self.wait(stop_event):
+            tick()
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""
+数据存储模块
+"""
+
+from .columnar import ColumnarStore, is_columnar_store
+from .fleet import FleetResult, HostSummary, MetricAggregate, find_recordings, fleet_query
+from .reader import MetricSummary, iter_records, summarize
+from .rollup import RollupPipeline, RollupPoint, RollupTier
+
+__all__ = [
+    'ColumnarStore',
+    'is_columnar_store',
+    'find_recordings',
+    'fleet_query',
+    'FleetResult',
+    'HostSummary',
+    'MetricAggregate',
+    'iter_records',
+    'MetricSummary',
+    'summarize',
+    'RollupPipeline',
+    'RollupPoint',
+    'RollupTier',
+]
\ No newline at end of file
@@ -0,0 +1,336 @@
+"""
+内存映射列式时序存储
+"""
+
+import bisect
+import json
+import math
+import mmap
+import os
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from system_monitor import SystemMetrics
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 整数列及其缺失值，其余列为float64，缺失值为NaN
+INTEGER_COLUMNS = {"network_connections"}
+INTEGER_MISSING = -1
+
+# 存储目录中的元数据文件与行数文件
+META_FILE = "meta.json"
+ROWS_FILE = "rows"
+
+
+def is_columnar_store(path: str) -> bool:
+    """路径是否为列式存储目录"""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+class _Column:
+    """单列数据文件，按块预分配并映射到内存"""
+
+    def __init__(self, path: Path, typecode: str, writable: bool):
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = struct.calcsize(typecode)
+        self.writable = writable
+        self._file = open(path, "r+b" if writable else "rb")
+        self._map: Optional[mmap.mmap] = None
+        self.capacity = 0
+        self._remap()
+
+    def _release(self):
+        """释放当前映射，仍有外部视图引用时交给垃圾回收关闭"""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass
+            self._map = None
+
+    def _remap(self):
+        """按当前文件大小重新映射"""
+        self._release()
+        size = os.fstat(self._file.fileno()).st_size
+        self.capacity = size // self.itemsize
+        if size:
+            access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+            self._map = mmap.mmap(self._file.fileno(), size, access=access)
+
+    def reserve(self, rows: int, chunk_rows: int, fill: float):
+        """确保容量至少为rows行，不足时按块扩展并填充缺失值"""
+        if rows <= self.capacity:
+            return
+        old_capacity = self.capacity
+        new_capacity = -(-rows // chunk_rows) * chunk_rows
+        self._release()
+        self._file.truncate(new_capacity * self.itemsize)
+        self._remap()
+        if fill != 0:
+            self.fill(old_capacity, new_capacity, fill)
+
+    def fill(self, start: int, end: int, value: float):
+        """将[start, end)行填充为value"""
+        pattern = struct.pack(self.typecode, int(value) if self.typecode == "q" else value)
+        block = pattern * min(end - start, 4096)
+        offset = start * self.itemsize
+        end_offset = end * self.itemsize
+        while offset < end_offset:
+            length = min(len(block), end_offset - offset)
+            self._map[offset:offset + length] = block[:length]
+            offset += length
+
+    def set(self, row: int, value: float):
+        """写入一个值"""
+        if self.typecode == "q":
+            value = int(value)
+        struct.pack_into(self.typecode, self._map, row * self.itemsize, value)
+
+    def view(self, rows: int) -> memoryview:
+        """
+        前rows行的只读视图
+
+        只读打开时直接映射，不复制；可写打开时Python 3.8及以上用toreadonly()，
+        更早的版本没有只读视图，返回一份复制
+        """
+        if rows > self.capacity:
+            self._remap()
+        if self._map is None:
+            return memoryview(b"").cast(self.typecode)
+        view = memoryview(self._map).cast(self.typecode)[:rows]
+        if not self.writable:
+            return view
+        if hasattr(view, "toreadonly"):
+            return view.toreadonly()
+        return memoryview(view.tobytes()).cast(self.typecode)
+
+    def flush(self):
+        if self._map is not None and self.writable:
+            self._map.flush()
+
+    def close(self):
+        self._release()
+        self._file.close()
+
+
+class ColumnarStore:
+    """
+    列式时序存储
+
+    每个指标一个定长类型的列文件，按块预分配并通过mmap写入；
+    读取时按时间范围直接映射出各列的数组，无需解析
+    """
+
+    def __init__(self, path: str, mode: str = "a", chunk_rows: int = 65536):
+        """
+        打开或创建存储
+
+        Args:
+            path: 存储目录
+            mode: a为追加写入（不存在则创建），r为只读
+            chunk_rows: 每次预分配的行数
+        """
+        if mode not in ("a", "r"):
+            raise ValueError(f"不支持的模式: {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.writable = mode == "a"
+        self._columns: Dict[str, _Column] = {}
+
+        meta_path = self.path / META_FILE
+        if meta_path.exists():
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+        elif self.writable:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.meta = {"version": 1, "chunk_rows": chunk_rows, "columns": {}}
+            self._add_column("timestamp", 0)
+            with open(self.path / ROWS_FILE, "wb") as f:
+                f.write(struct.pack("<Q", 0))
+        else:
+            raise FileNotFoundError(f"不是列式存储: {path}")
+
+        self.chunk_rows = self.meta["chunk_rows"]
+        self._rows_file = open(self.path / ROWS_FILE, "r+b" if self.writable else "rb")
+        self._rows_map = mmap.mmap(
+            self._rows_file.fileno(), 8,
+            access=mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        )
+
+    # ---- 元数据 ----
+
+    @property
+    def rows(self) -> int:
+        """已提交的行数"""
+        return struct.unpack_from("<Q", self._rows_map, 0)[0]
+
+    @property
+    def column_names(self) -> List[str]:
+        """所有列名"""
+        return list(self.meta["columns"])
+
+    def _save_meta(self):
+        temp = self.path / (META_FILE + ".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+        os.replace(temp, self.path / META_FILE)
+
+    def _missing(self, name: str) -> float:
+        return INTEGER_MISSING if self.meta["columns"][name]["type"] == "q" else math.nan
+
+    def _add_column(self, name: str, rows: int):
+        """新增一列，已有的行填充缺失值"""
+        typecode = "q" if name in INTEGER_COLUMNS else "d"
+        filename = f"col_{len(self.meta['columns']):04d}.bin"
+        (self.path / filename).touch()
+        self.meta["columns"][name] = {"file": filename, "type": typecode}
+        self._save_meta()
+
+        column = self._column(name)
+        column.reserve(max(rows, 1), self.meta["chunk_rows"], self._missing(name))
+
+    def _column(self, name: str) -> _Column:
+        column = self._columns.get(name)
+        if column is None:
+            info = self.meta["columns"][name]
+            column = _Column(self.path / info["file"], info["type"], self.writable)
+            self._columns[name] = column
+        return column
+
+    def _reload_meta(self):
+        """只读模式下重新加载元数据，以发现写入方新增的列"""
+        with open(self.path / META_FILE, encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+    # ---- 写入 ----
+
+    def append(self, timestamp: float, values: Dict[str, float]):
+        """
+        追加一行
+
+        Args:
+            timestamp: Unix时间戳（秒）
+            values: 指标名到数值的映射，缺少的列记为缺失值
+        """
+        if not self.writable:
+            raise IOError("存储以只读模式打开")
+
+        row = self.rows
+        for name in values:
+            if name not in self.meta["columns"]:
+                self._add_column(name, row)
+
+        for name in self.meta["columns"]:
+            column = self._column(name)
+            column.reserve(row + 1, self.chunk_rows, self._missing(name))
+            if name == "timestamp":
+                column.set(row, timestamp)
+            elif name in values:
+                column.set(row, values[name])
+            else:
+                column.set(row, self._missing(name))
+
+        # 所有列写入完成后再提交行数，读取方不会看到不完整的行
+        struct.pack_into("<Q", self._rows_map, 0, row + 1)
+
+    def export_single(self, metrics: SystemMetrics):
+        """导出单次监控数据"""
+        self.append(metrics.timestamp.timestamp(), metrics.flatten())
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """批量导出监控数据"""
+        for metrics in metrics_list:
+            self.export_single(metrics)
+
+    # ---- 读取 ----
+
+    def _row_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """按时间范围二分查找行号区间[first, last)"""
+        rows = self.rows
+        timestamps = self._column("timestamp").view(rows)
+        first = bisect.bisect_left(timestamps, start) if start is not None else 0
+        last = bisect.bisect_right(timestamps, end) if end is not None else rows
+        return first, last
+
+    def read_range(self, start: Optional[float] = None, end: Optional[float] = None,
+                   columns: Optional[List[str]] = None, as_numpy: bool = False) -> Dict[str, Any]:
+        """
+        读取时间范围内的数据
+
+        Args:
+            start: 起始Unix时间戳（含），None表示从头开始
+            end: 结束Unix时间戳（含），None表示到最后
+            columns: 要读取的列，默认全部
+            as_numpy: 返回numpy数组（需要安装numpy），否则返回memoryview
+
+        Returns:
+            列名到数组的映射，数组直接引用映射的文件内容，不复制
+        """
+        if not self.writable:
+            self._reload_meta()
+        first, last = self._row_range(start, end)
+        names = columns or self.column_names
+
+        result = {}
+        for name in names:
+            view = self._column(name).view(last)[first:last]
+            if as_numpy:
+                if np is None:
+                    raise ImportError("as_numpy需要安装numpy")
+                view = np.frombuffer(view, dtype=np.float64 if view.format == "d" else np.int64)
+            result[name] = view
+        return result
+
+    def iter_records(self, start: Optional[float] = None,
+                     end: Optional[float] = None) -> Iterator[Tuple[float, Dict[str, float]]]:
+        """逐行读取(时间戳, 指标字典)，跳过缺失值"""
+        data = self.read_range(start, end)
+        timestamps = data.pop("timestamp")
+        for index, timestamp in enumerate(timestamps):
+            values = {}
+            for name, column in data.items():
+                value = column[index]
+                if (column.format == "q" and value != INTEGER_MISSING) or (column.format != "q" and value == value):
+                    values[name] = value
+            yield timestamp, values
+
+    def time_bounds(self) -> Optional[Tuple[datetime, datetime]]:
+        """数据的起止时间"""
+        rows = self.rows
+        if not rows:
+            return None
+        timestamps = self._column("timestamp").view(rows)
+        return datetime.fromtimestamp(timestamps[0]), datetime.fromtimestamp(timestamps[rows - 1])
+
+    def flush(self):
+        """将映射的数据写回磁盘"""
+        for column in self._columns.values():
+            column.flush()
+        if self.writable:
+            self._rows_map.flush()
+
+    def close(self):
+        """关闭存储"""
+        self.flush()
+        for column in self._columns.values():
+            column.close()
+        self._columns = {}
+        try:
+            self._rows_map.close()
+        except BufferError:
+            pass
+        self._rows_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
\ No newline at end of file
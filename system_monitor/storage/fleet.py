@@ -0,0 +1,248 @@
+"""
+多主机记录的并行查询
+
+目录中每个主机一个记录文件（如汇聚服务写入的<主机名>.smz），
+每个文件由进程池中的一个进程扫描，得到可合并的部分统计，再在主进程中合并排序
+"""
+
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from system_monitor.exporters.csv_exporter import csv_segments
+from system_monitor.exporters.json_exporter import NDJSON_SUFFIXES, ndjson_segments
+from system_monitor.utils.sketches import QuantileSketch, RunningStats
+from .columnar import is_columnar_store
+from .reader import iter_records
+
+# 可作为主机记录的文件扩展名
+RECORDING_SUFFIXES = (".smz", ".csv", ".json") + NDJSON_SUFFIXES
+
+# 可用于排序的统计量
+FLEET_STATS = ("mean", "min", "max", "p50", "p95", "p99", "last")
+
+_QUANTILE_STAT = re.compile(r"p(\d+(?:\.\d+)?)$")
+
+
+class MetricAggregate:
+    """单个指标的可合并统计：计数、均值、极值、最新值和分位数草图"""
+
+    __slots__ = ("stats", "sketch", "last_time", "last")
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy=0.01, max_bins=512)
+        self.last_time = -math.inf
+        self.last: Optional[float] = None
+
+    def add(self, timestamp: float, value: float):
+        """加入一个值，NaN忽略"""
+        if value != value:
+            return
+        self.stats.add(value)
+        self.sketch.add(value)
+        if timestamp >= self.last_time:
+            self.last_time = timestamp
+            self.last = value
+
+    def merge(self, other: "MetricAggregate"):
+        """合并另一组统计"""
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        if other.last_time >= self.last_time:
+            self.last_time = other.last_time
+            self.last = other.last
+
+    def value(self, stat: str) -> Optional[float]:
+        """取统计量：mean、min、max、last或pNN分位数"""
+        if not self.stats.count:
+            return None
+        if stat in ("mean", "min", "max"):
+            return getattr(self.stats, stat)
+        if stat == "last":
+            return self.last
+        match = _QUANTILE_STAT.match(stat)
+        if not match or not 0 <= float(match.group(1)) <= 100:
+            raise ValueError(f"不支持的统计量: {stat}")
+        return self.sketch.quantile(float(match.group(1)) / 100)
+
+
+@dataclass
+class HostSummary:
+    """一个主机在查询时间范围内的统计"""
+    host: str
+    count: int = 0
+    first: float = math.inf
+    last: float = -math.inf
+    metrics: Dict[str, MetricAggregate] = field(default_factory=dict)
+
+    def merge(self, other: "HostSummary"):
+        """合并同一主机的另一个记录文件"""
+        self.count += other.count
+        self.first = min(self.first, other.first)
+        self.last = max(self.last, other.last)
+        for name, aggregate in other.metrics.items():
+            existing = self.metrics.get(name)
+            if existing is None:
+                self.metrics[name] = aggregate
+            else:
+                existing.merge(aggregate)
+
+
+@dataclass
+class FleetResult:
+    """多主机查询结果"""
+    hosts: Dict[str, HostSummary]
+    fleet: Dict[str, MetricAggregate]
+
+    def rank(self, metric: str, stat: str = "mean", top: Optional[int] = 10,
+             ascending: bool = False) -> List[Tuple[str, float]]:
+        """
+        按某个指标的统计量对主机排序
+
+        Args:
+            metric: 指标名，如cpu_percent
+            stat: 统计量，mean、min、max、last或pNN（如p95）
+            top: 返回的主机数，None表示全部
+            ascending: 是否从小到大排序
+
+        Returns:
+            (主机名, 统计值)列表，没有该指标的主机不参与排序
+        """
+        ranked = []
+        for host, summary in self.hosts.items():
+            aggregate = summary.metrics.get(metric)
+            value = aggregate.value(stat) if aggregate is not None else None
+            if value is not None:
+                ranked.append((host, value))
+        ranked.sort(key=lambda item: (item[1], item[0]) if ascending else (-item[1], item[0]))
+        return ranked if top is None else ranked[:top]
+
+
+def _segments(path: Path) -> List[Path]:
+    """轮转或分段写入时属于同一记录的其他文件"""
+    if path.suffix == ".csv":
+        return [segment for segment in csv_segments(path) if segment != path]
+    if path.suffix in NDJSON_SUFFIXES:
+        return [segment for segment in ndjson_segments(path) if segment != path]
+    return []
+
+
+def find_recordings(directory: str) -> List[Tuple[str, str]]:
+    """
+    查找目录中的主机记录
+
+    文件名（去掉扩展名）作为主机名；CSV的.vN分段和NDJSON的轮转文件
+    由读取器随主文件一起读取，不单独作为主机
+
+    Returns:
+        (主机名, 路径)列表，同一主机可能有多种格式的记录
+    """
+    root = Path(directory)
+    if not root.is_dir():
+        raise ValueError(f"目录不存在: {directory}")
+
+    candidates = []
+    for path in sorted(root.iterdir()):
+        if path.is_dir():
+            if path.suffix == ".smc" and is_columnar_store(str(path)):
+                candidates.append(path)
+        elif path.suffix in RECORDING_SUFFIXES:
+            candidates.append(path)
+
+    covered = set()
+    for path in candidates:
+        covered.update(_segments(path))
+    return [(path.stem, str(path)) for path in candidates if path not in covered]
+
+
+def scan_recording(host: str, path: str, start: Optional[float] = None, end: Optional[float] = None,
+                   metrics: Optional[Sequence[str]] = None) -> HostSummary:
+    """
+    扫描一个记录文件，得到可合并的部分统计（在工作进程中执行）
+
+    Args:
+        host: 主机名
+        path: 记录文件路径
+        start: 起始Unix时间戳（含）
+        end: 结束Unix时间戳（含）
+        metrics: 只统计这些指标，None表示全部
+    """
+    summary = HostSummary(host)
+    wanted = set(metrics) if metrics else None
+    aggregates = summary.metrics
+    for timestamp, values in iter_records(path, start, end):
+        summary.count += 1
+        if timestamp < summary.first:
+            summary.first = timestamp
+        if timestamp > summary.last:
+            summary.last = timestamp
+        for name, value in values.items():
+            if wanted is not None and name not in wanted:
+                continue
+            aggregate = aggregates.get(name)
+            if aggregate is None:
+                aggregate = aggregates[name] = MetricAggregate()
+            aggregate.add(timestamp, float(value))
+    return summary
+
+
+def _scan_task(task: Tuple[str, str, Optional[float], Optional[float], Optional[Sequence[str]]]) -> HostSummary:
+    return scan_recording(*task)
+
+
+def _file_size(path: str) -> int:
+    """记录的大小，用于先提交大文件以平衡各进程的负载"""
+    target = Path(path)
+    if target.is_dir():
+        return sum(item.stat().st_size for item in target.iterdir() if item.is_file())
+    return target.stat().st_size
+
+
+def fleet_query(directory: str, start: Optional[float] = None, end: Optional[float] = None,
+                metrics: Optional[Sequence[str]] = None, workers: Optional[int] = None) -> FleetResult:
+    """
+    并行扫描目录中所有主机的记录并合并统计
+
+    Args:
+        directory: 记录目录
+        start: 起始Unix时间戳（含），None表示不限制
+        end: 结束Unix时间戳（含），None表示不限制
+        metrics: 只统计这些指标，None表示全部；指定后扫描更快
+        workers: 工作进程数，默认为CPU核心数；1表示在当前进程中扫描
+
+    Returns:
+        FleetResult，包含每个主机的统计和全部主机合并后的统计
+    """
+    recordings = find_recordings(directory)
+    recordings.sort(key=lambda item: _file_size(item[1]), reverse=True)
+    tasks = [(host, path, start, end, tuple(metrics) if metrics else None) for host, path in recordings]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        partials: Iterable[HostSummary] = map(_scan_task, tasks)
+        return _merge(partials)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _merge(executor.map(_scan_task, tasks))
+
+
+def _merge(partials: Iterable[HostSummary]) -> FleetResult:
+    """合并各记录文件的部分统计"""
+    hosts: Dict[str, HostSummary] = {}
+    fleet: Dict[str, MetricAggregate] = {}
+    for partial in partials:
+        if partial.host in hosts:
+            hosts[partial.host].merge(partial)
+        else:
+            hosts[partial.host] = HostSummary(partial.host, partial.count, partial.first, partial.last,
+                                              dict(partial.metrics))
+        for name, aggregate in partial.metrics.items():
+            total = fleet.get(name)
+            if total is None:
+                total = fleet[name] = MetricAggregate()
+            total.merge(aggregate)
+    return FleetResult(hosts, fleet)
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""
+多格式记录的流式读取与统计
+"""
+
+import csv
+import json
+import math
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from system_monitor.exporters.archive_exporter import ArchiveReader
+from system_monitor.exporters.csv_exporter import csv_segments
+from system_monitor.exporters.json_exporter import NDJSON_SUFFIXES, iter_ndjson
+from system_monitor.utils.sketches import P2Quantile, RunningStats
+from .columnar import ColumnarStore, is_columnar_store
+
+# 简表列名到统一指标名的映射
+_NARROW_ALIASES = {"disk_usage_root": "disk:/"}
+
+# 统计的分位数
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+# 流式解析JSON时每次读取的字符数
+_JSON_CHUNK = 64 * 1024
+
+# 数组元素之间的分隔符
+_JSON_SEPARATORS = re.compile(r"[ \t\r\n,]*")
+
+Record = Tuple[float, Dict[str, float]]
+
+
+def parse_time(value: str) -> float:
+    """解析Unix时间戳或ISO格式时间（如2024-01-01T12:00:00）"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def flatten_record(item: Dict[str, Any]) -> Record:
+    """将JSON导出器的一条记录展开为(时间戳, 指标字典)，命名与SystemMetrics.flatten()一致"""
+    timestamp = datetime.fromisoformat(item["timestamp"]).timestamp()
+    values = {}
+    cpu = item.get("cpu") or {}
+    if cpu.get("total_percent") is not None:
+        values["cpu_percent"] = float(cpu["total_percent"])
+    for index, percent in enumerate(cpu.get("per_core") or []):
+        values[f"cpu_core_{index}"] = float(percent)
+    memory = item.get("memory") or {}
+    for key, name in (("percent", "memory_percent"), ("used_gb", "memory_used_gb"),
+                      ("total_gb", "memory_total_gb")):
+        if memory.get(key) is not None:
+            values[name] = float(memory[key])
+    for mount, percent in (item.get("disk") or {}).items():
+        values[f"disk:{mount}"] = float(percent)
+    network = item.get("network") or {}
+    for key, name in (("sent_mb", "network_sent_mb"), ("recv_mb", "network_recv_mb"),
+                      ("connections", "network_connections")):
+        if network.get(key) is not None:
+            values[name] = float(network[key])
+    return timestamp, values
+
+
+def _iter_json_document(path: Path) -> Iterator[Dict[str, Any]]:
+    """逐条解析{"version": ..., "metrics": [...]}文档中的记录，不把整个文件读入内存"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = -1
+        # 定位metrics数组的起点
+        while position < 0:
+            chunk = f.read(_JSON_CHUNK)
+            if not chunk:
+                return
+            buffer += chunk
+            key = buffer.find('"metrics"')
+            if key >= 0:
+                position = buffer.find("[", key)
+        position += 1
+
+        # 按偏移量在缓冲区中依次解析，只在补充数据时丢弃已解析的部分，避免每条记录都复制缓冲区
+        eof = False
+        while True:
+            position = _JSON_SEPARATORS.match(buffer, position).end()
+            if buffer.startswith("]", position):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    return
+                chunk = f.read(_JSON_CHUNK)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield item
+            position = end
+
+
+def _iter_csv(path: Path) -> Iterator[Record]:
+    """读取CSV所有文件段，跳过进程等非数值列"""
+    for segment in csv_segments(path):
+        with open(segment, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                continue
+            names = [_NARROW_ALIASES.get(name, name) for name in header]
+            columns = [(index, name) for index, name in enumerate(names)
+                       if name != "timestamp" and not name.startswith("proc_")]
+            for row in reader:
+                if not row:
+                    continue
+                try:
+                    timestamp = datetime.fromisoformat(row[0]).timestamp()
+                except ValueError:
+                    continue
+                values = {}
+                for index, name in columns:
+                    if index < len(row) and row[index]:
+                        try:
+                            values[name] = float(row[index])
+                        except ValueError:
+                            pass
+                yield timestamp, values
+
+
+def _iter_json_items(path: Path) -> Iterator[Dict[str, Any]]:
+    """读取JSON文档或NDJSON文件（含轮转文件）中的原始记录"""
+    if path.suffix in NDJSON_SUFFIXES:
+        return iter_ndjson(path)
+    return _iter_json_document(path)
+
+
+def _iter_json(path: Path) -> Iterator[Record]:
+    """读取JSON文档或NDJSON文件（含轮转文件）"""
+    for item in _iter_json_items(path):
+        try:
+            yield flatten_record(item)
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+def iter_json_items(path: str, start: Optional[float] = None,
+                    end: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取JSON导出器写入的原始记录（不展开），用于按原格式输出
+
+    Args:
+        path: .json、.ndjson或.jsonl文件
+        start: 起始Unix时间戳（含），None表示不限制
+        end: 结束Unix时间戳（含），None表示不限制
+    """
+    for item in _iter_json_items(Path(path)):
+        if start is not None or end is not None:
+            try:
+                timestamp = datetime.fromisoformat(item["timestamp"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+                continue
+        yield item
+
+
+def iter_records(path: str, start: Optional[float] = None,
+                 end: Optional[float] = None) -> Iterator[Record]:
+    """
+    流式读取记录文件，按格式自动选择读取方式
+
+    Args:
+        path: .csv、.json、.ndjson/.jsonl、.smz归档文件或.smc列式存储目录
+        start: 起始Unix时间戳（含），None表示不限制
+        end: 结束Unix时间戳（含），None表示不限制
+
+    Returns:
+        (Unix时间戳, 指标字典)的迭代器
+    """
+    filepath = Path(path)
+    if is_columnar_store(path):
+        # 列式存储按时间二分定位，不需要逐行过滤
+        with ColumnarStore(path, mode="r") as store:
+            yield from store.iter_records(start, end)
+        return
+    if filepath.suffix == ".smz":
+        # 归档按块头的时间范围跳过无关的块
+        yield from ArchiveReader(path).iter_records(start, end)
+        return
+
+    if filepath.suffix == ".csv":
+        records = _iter_csv(filepath)
+    elif filepath.suffix == ".json" or filepath.suffix in NDJSON_SUFFIXES:
+        records = _iter_json(filepath)
+    else:
+        raise ValueError(f"不支持的文件格式: {path}")
+
+    for timestamp, values in records:
+        if start is not None and timestamp < start:
+            continue
+        if end is not None and timestamp > end:
+            continue
+        yield timestamp, values
+
+
+class MetricSummary:
+    """单个指标的流式统计：均值、极值、标准差和P²分位数估计"""
+
+    __slots__ = ("stats", "quantiles")
+
+    def __init__(self, quantiles=SUMMARY_QUANTILES):
+        self.stats = RunningStats()
+        self.quantiles = [P2Quantile(q) for q in quantiles]
+
+    def add(self, value: float):
+        """加入一个值，NaN忽略"""
+        if value != value:
+            return
+        self.stats.add(value)
+        for estimator in self.quantiles:
+            estimator.add(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """输出统计结果"""
+        result = {
+            "count": self.stats.count,
+            "mean": self.stats.mean if self.stats.count else None,
+            "min": self.stats.min if self.stats.count else None,
+            "max": self.stats.max if self.stats.count else None,
+            "stddev": self.stats.stddev if self.stats.count else None,
+        }
+        for estimator in self.quantiles:
+            result[f"p{estimator.q * 100:g}"] = estimator.value()
+        return result
+
+
+def summarize(records: Iterator[Record]) -> Tuple[int, Optional[Tuple[float, float]], Dict[str, MetricSummary]]:
+    """
+    单遍统计所有数值指标，内存占用只与指标数有关
+
+    Returns:
+        (记录数, (最早时间戳, 最晚时间戳)或None, 指标名到统计的映射)
+    """
+    count = 0
+    first = math.inf
+    last = -math.inf
+    summaries: Dict[str, MetricSummary] = {}
+    for timestamp, values in records:
+        count += 1
+        first = min(first, timestamp)
+        last = max(last, timestamp)
+        for name, value in values.items():
+            summary = summaries.get(name)
+            if summary is None:
+                summary = summaries[name] = MetricSummary()
+            summary.add(float(value))
+    return count, (first, last) if count else None, summaries
\ No newline at end of file
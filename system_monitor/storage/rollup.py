@@ -0,0 +1,297 @@
+"""
+多分辨率降采样汇总
+"""
+
+import json
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from system_monitor import SystemMetrics
+from system_monitor.utils.sketches import QuantileSketch, RunningStats
+
+# 每个汇总点保存的字段
+POINT_FIELDS = ("count", "min", "max", "mean", "p95")
+
+
+@dataclass
+class RollupPoint:
+    """一个时间桶的汇总值"""
+    start: float
+    resolution: float
+    count: int
+    min: float
+    max: float
+    mean: float
+    p95: float
+
+
+def _merge_points(first: Sequence[float], second: Sequence[float]) -> Tuple[float, ...]:
+    """合并同一时间桶的两组汇总值，p95按数量加权近似"""
+    count1, count2 = first[0], second[0]
+    if not count2:
+        return tuple(first)
+    count = count1 + count2
+    return (
+        count,
+        min(first[1], second[1]),
+        max(first[2], second[2]),
+        (first[3] * count1 + second[3] * count2) / count,
+        (first[4] * count1 + second[4] * count2) / count,
+    )
+
+
+class _OpenBucket:
+    """正在累计的时间桶"""
+
+    __slots__ = ("stats", "sketch")
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy=0.01, max_bins=256)
+
+    def add(self, value: float):
+        self.stats.add(value)
+        self.sketch.add(value)
+
+    def values(self) -> Tuple[float, ...]:
+        stats = self.stats
+        return stats.count, stats.min, stats.max, stats.mean, self.sketch.quantile(0.95)
+
+
+class RollupTier:
+    """
+    一个汇总层级
+
+    已完成的时间桶保存在容量为retention/resolution的环形数组中，
+    超过保留时长的桶被自然覆盖。槽位从第一个时间桶开始编号，各指标的数组
+    只增长到该指标最后写入的槽位，刚启动时占用很少，写满一轮后达到容量
+    """
+
+    def __init__(self, resolution: float, retention: float):
+        """
+        初始化汇总层级
+
+        Args:
+            resolution: 时间桶长度（秒）
+            retention: 保留时长（秒）
+        """
+        if resolution <= 0 or retention < resolution:
+            raise ValueError("resolution必须大于0且不大于retention")
+
+        self.resolution = float(resolution)
+        self.retention = float(retention)
+        self.capacity = int(math.ceil(retention / resolution))
+        self._starts = array("d")
+        self._fields: Dict[str, Dict[str, array]] = {}
+        # 槽位0对应的时间桶
+        self._origin: Optional[int] = None
+        self._bucket: Optional[int] = None
+        self._open: Dict[str, _OpenBucket] = {}
+        self.latest: Optional[float] = None
+
+    @property
+    def nbytes(self) -> int:
+        """已分配的数组占用的字节数"""
+        columns = [self._starts] + [column for fields in self._fields.values() for column in fields.values()]
+        return sum(len(column) * column.itemsize for column in columns)
+
+    def _slot(self, bucket: int) -> int:
+        return (bucket - self._origin) % self.capacity
+
+    @staticmethod
+    def _grow(column: array, slot: int):
+        """数组增长到包含slot，新增的槽位为空值"""
+        if len(column) <= slot:
+            column.extend(array("d", [math.nan]) * (slot + 1 - len(column)))
+
+    def _fields_of(self, metric: str, slot: int) -> Dict[str, array]:
+        fields = self._fields.get(metric)
+        if fields is None:
+            fields = self._fields[metric] = {name: array("d") for name in POINT_FIELDS}
+        for column in fields.values():
+            self._grow(column, slot)
+        return fields
+
+    def _close_bucket(self):
+        """将正在累计的时间桶写入环形数组"""
+        if self._bucket is None:
+            return
+        slot = self._slot(self._bucket)
+        start = self._bucket * self.resolution
+        self._grow(self._starts, slot)
+        # 同一时间桶已有数据（如保存后继续写入）时与之合并
+        merge = self._starts[slot] == start
+        self._starts[slot] = start
+
+        for metric in set(self._fields) | set(self._open):
+            bucket = self._open.get(metric)
+            if bucket is None and len(self._fields[metric]["count"]) <= slot:
+                # 该指标的数组尚未增长到这个槽位，没有需要清除的旧值
+                continue
+            fields = self._fields_of(metric, slot)
+            values = bucket.values() if bucket else (0, math.nan, math.nan, math.nan, math.nan)
+            if merge and fields["count"][slot] > 0:
+                values = _merge_points([fields[name][slot] for name in POINT_FIELDS], values)
+            for name, value in zip(POINT_FIELDS, values):
+                fields[name][slot] = value
+        self._open = {}
+
+    def add(self, timestamp: float, values: Dict[str, float]):
+        """加入一次采样"""
+        bucket = int(timestamp // self.resolution)
+        if self._bucket is not None and bucket < self._bucket:
+            # 乱序的旧数据直接丢弃
+            return
+        if bucket != self._bucket:
+            self._close_bucket()
+            self._bucket = bucket
+            if self._origin is None:
+                self._origin = bucket
+
+        for metric, value in values.items():
+            if value != value:
+                continue
+            open_bucket = self._open.get(metric)
+            if open_bucket is None:
+                open_bucket = self._open[metric] = _OpenBucket()
+            open_bucket.add(value)
+        self.latest = timestamp
+
+    @property
+    def metrics(self) -> List[str]:
+        """包含的指标名"""
+        return sorted(set(self._fields) | set(self._open))
+
+    def covers(self, start: float) -> bool:
+        """保留时长是否覆盖从start开始的数据"""
+        if self.latest is None:
+            return False
+        return start >= (int(self.latest // self.resolution) - self.capacity + 1) * self.resolution
+
+    def query(self, metric: str, start: float, end: float) -> List[RollupPoint]:
+        """获取[start, end]时间范围内的汇总点"""
+        points = []
+        if self._bucket is None:
+            return points
+
+        first = max(int(start // self.resolution), self._bucket - self.capacity + 1)
+        last = min(int(end // self.resolution), self._bucket)
+        fields = self._fields.get(metric)
+
+        for bucket in range(first, last + 1):
+            slot = self._slot(bucket)
+            values = None
+            if (fields is not None and slot < len(fields["count"]) and self._starts[slot] == bucket * self.resolution
+                    and fields["count"][slot] > 0):
+                values = [fields[name][slot] for name in POINT_FIELDS]
+            if bucket == self._bucket and metric in self._open:
+                current = self._open[metric].values()
+                values = _merge_points(values, current) if values else current
+            if values:
+                points.append(RollupPoint(bucket * self.resolution, self.resolution, int(values[0]), *values[1:]))
+        return points
+
+    def to_dict(self) -> Dict:
+        """导出为可JSON序列化的字典（正在累计的桶一并写入）"""
+        self._close_bucket()
+        valid = [slot for slot in range(len(self._starts)) if self._starts[slot] == self._starts[slot]]
+        return {
+            "resolution": self.resolution,
+            "retention": self.retention,
+            "origin": self._origin,
+            "bucket": self._bucket,
+            "latest": self.latest,
+            "slots": valid,
+            "starts": [self._starts[slot] for slot in valid],
+            "metrics": {
+                metric: {name: [column[slot] if slot < len(column) else math.nan for slot in valid]
+                         for name, column in fields.items()}
+                for metric, fields in self._fields.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RollupTier":
+        tier = cls(data["resolution"], data["retention"])
+        tier.latest = data["latest"]
+        tier._bucket = data["bucket"]
+        # 旧版文件的槽位为bucket % capacity，相当于从0开始编号
+        tier._origin = data.get("origin", 0 if tier._bucket is not None else None)
+        slots = data["slots"]
+        if not slots:
+            return tier
+        tier._grow(tier._starts, max(slots))
+        for slot, start in zip(slots, data["starts"]):
+            tier._starts[slot] = start
+        for metric, columns in data["metrics"].items():
+            fields = tier._fields_of(metric, max(slots))
+            for name, values in columns.items():
+                for slot, value in zip(slots, values):
+                    fields[name][slot] = value
+        return tier
+
+
+# 默认层级：原始1秒保留15分钟，1分钟保留1天，1小时保留31天；
+# 写满后每个指标约120KB（3084个槽位，每个5个double），32个指标一个月约4MB
+DEFAULT_TIERS = ((1, 900), (60, 86400), (3600, 31 * 86400))
+
+
+class RollupPipeline:
+    """多分辨率汇总流水线，可作为导出器注册为监控回调"""
+
+    def __init__(self, tiers: Sequence[Tuple[float, float]] = DEFAULT_TIERS):
+        """
+        初始化汇总流水线
+
+        Args:
+            tiers: (时间桶长度, 保留时长)列表，单位秒
+        """
+        self.tiers = sorted((RollupTier(resolution, retention) for resolution, retention in tiers),
+                            key=lambda tier: tier.resolution)
+
+    @property
+    def nbytes(self) -> int:
+        """各层级已分配的数组占用的字节数"""
+        return sum(tier.nbytes for tier in self.tiers)
+
+    def add(self, timestamp: float, values: Dict[str, float]):
+        """加入一次采样"""
+        for tier in self.tiers:
+            tier.add(timestamp, values)
+
+    def export_single(self, metrics: SystemMetrics):
+        """导出单次监控数据"""
+        self.add(metrics.timestamp.timestamp(), metrics.flatten())
+
+    def export_batch(self, metrics_list: List[SystemMetrics]):
+        """批量导出监控数据"""
+        for metrics in metrics_list:
+            self.export_single(metrics)
+
+    def select_tier(self, start: float) -> RollupTier:
+        """选择覆盖起始时间的最细层级，都不覆盖时使用最粗的层级"""
+        for tier in self.tiers:
+            if tier.covers(start):
+                return tier
+        return self.tiers[-1]
+
+    def query(self, metric: str, start: float, end: float) -> List[RollupPoint]:
+        """按时间范围查询汇总点，自动选择层级"""
+        return self.select_tier(start).query(metric, start, end)
+
+    def save(self, path: str):
+        """保存到JSON文件"""
+        data = {"version": 1, "tiers": [tier.to_dict() for tier in self.tiers]}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "RollupPipeline":
+        """从JSON文件加载"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        pipeline = cls(tiers=())
+        pipeline.tiers = [RollupTier.from_dict(tier) for tier in data["tiers"]]
+        return pipeline
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+全屏终端界面（sysmon top）
+
+采样与绘制分别限速：采样按采样间隔进行，界面按刷新间隔绘制；
+每次绘制只重写内容发生变化的行，curses再只把变化的字符输出到终端。
+两次采样之间在getch()中等待按键，退出和终端尺寸变化立即处理。
+"""
+
+import time
+import unicodedata
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .history import MetricsHistory
+from .monitor import SystemMetrics, SystemMonitor
+from .scheduler import DeadlineScheduler
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# 等待按键的最长时间（毫秒），采样间隔较长时也定期检查截止时间
+_INPUT_POLL_MS = 100
+
+
+def display_width(text: str) -> int:
+    """文本在终端中占用的列数，中文等宽字符占两列"""
+    return sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+
+
+def fit(text: str, width: int) -> str:
+    """按显示宽度截断文本"""
+    if display_width(text) <= width:
+        return text
+    used = 0
+    for index, char in enumerate(text):
+        used += 2 if unicodedata.east_asian_width(char) in "WF" else 1
+        if used > width:
+            return text[:index]
+    return text
+
+
+def sparkline(values: Sequence[float], width: int, low: Optional[float] = 0.0,
+              high: Optional[float] = 100.0) -> str:
+    """
+    用方块字符绘制最近的数值走势
+
+    Args:
+        values: 按时间顺序的数值，NaN显示为空格
+        width: 最多显示的点数（取最后width个）
+        low: 下限，None表示取数据最小值
+        high: 上限，None表示取数据最大值
+    """
+    values = list(values)[-width:] if width > 0 else []
+    valid = [value for value in values if value == value]
+    if not valid:
+        return " " * len(values)
+    low = min(valid) if low is None else low
+    high = max(valid) if high is None else high
+    span = high - low
+    chars = []
+    for value in values:
+        if value != value:
+            chars.append(" ")
+            continue
+        ratio = (value - low) / span if span > 0 else 0.0
+        index = int(round(min(max(ratio, 0.0), 1.0) * (len(SPARK_CHARS) - 1)))
+        chars.append(SPARK_CHARS[index])
+    return "".join(chars)
+
+
+def bar(percent: float, width: int) -> str:
+    """百分比进度条"""
+    filled = int(round(min(max(percent, 0.0), 100.0) / 100 * width))
+    return "[" + "|" * filled + " " * (width - filled) + "]"
+
+
+def rates(timestamps: Sequence[float], values: Sequence[float]) -> List[float]:
+    """计数器相邻采样间的每秒变化率，计数器重置时按从0开始计算"""
+    result = []
+    for index in range(1, len(values)):
+        elapsed = timestamps[index] - timestamps[index - 1]
+        previous, current = values[index - 1], values[index]
+        if elapsed <= 0 or previous != previous or current != current:
+            result.append(float("nan"))
+            continue
+        delta = current - previous if current >= previous else current
+        result.append(delta / elapsed)
+    return result
+
+
+def render_frame(metrics: SystemMetrics, history: MetricsHistory, width: int, height: int,
+                 sample_hz: float = 0.0, refresh_hz: float = 0.0) -> List[str]:
+    """
+    生成一帧画面的各行文本
+
+    Args:
+        metrics: 最新的监控数据
+        history: 历史数据，用于绘制走势
+        width: 终端宽度
+        height: 终端高度
+        sample_hz: 显示的采样频率
+        refresh_hz: 显示的刷新频率
+    """
+    spark_width = max(width - 40, 0)
+    columns = ["cpu_percent", "memory_percent", "network_sent_mb", "network_recv_mb"]
+    columns += [f"cpu_core_{index}" for index in range(len(metrics.cpu_per_core))]
+    columns = [name for name in columns if name in history.columns]
+    data = history.window(last=spark_width + 1, columns=columns) if len(history) else {}
+
+    def trend(name: str) -> str:
+        return sparkline(data.get(name, ())[-spark_width:], spark_width)
+
+    lines = [
+        f"系统监控 {metrics.timestamp.strftime('%Y-%m-%d %H:%M:%S')}  "
+        f"采样 {sample_hz:.1f}Hz  刷新 {refresh_hz:.1f}Hz  按q退出",
+        "",
+        f"CPU    {bar(metrics.cpu_percent, 20)} {metrics.cpu_percent:5.1f}%  {trend('cpu_percent')}",
+    ]
+    for index, percent in enumerate(metrics.cpu_per_core):
+        lines.append(f" 核{index:<4d} {bar(percent, 20)} {percent:5.1f}%  {trend(f'cpu_core_{index}')}")
+
+    lines.append(f"内存   {bar(metrics.memory_percent, 20)} {metrics.memory_percent:5.1f}%  "
+                 f"{trend('memory_percent')}")
+    lines.append(f"       已用 {metrics.memory_used:.2f}GB / {metrics.memory_total:.2f}GB")
+
+    timestamps = data.get("timestamp", ())
+    sent_rates = rates(timestamps, data.get("network_sent_mb", ()))
+    recv_rates = rates(timestamps, data.get("network_recv_mb", ()))
+    sent_now = sent_rates[-1] if sent_rates and sent_rates[-1] == sent_rates[-1] else 0.0
+    recv_now = recv_rates[-1] if recv_rates and recv_rates[-1] == recv_rates[-1] else 0.0
+    lines.append(f"网络   发送 {sent_now:8.2f}MB/s  {sparkline(sent_rates, spark_width, None, None)}")
+    lines.append(f"       接收 {recv_now:8.2f}MB/s  {sparkline(recv_rates, spark_width, None, None)}")
+    lines.append(f"       连接数 {metrics.network_connections}")
+
+    lines.append("")
+    lines.append("磁盘   " + "  ".join(f"{mount} {percent:.1f}%" for mount, percent in
+                                      (metrics.disk_usage or {}).items()))
+
+    if metrics.top_processes:
+        lines.append("")
+        lines.append(f"{'PID':>8}  {'CPU%':>6}  {'内存%':>6}  名称")
+        for proc in metrics.top_processes:
+            lines.append(f"{proc.get('pid', ''):>8}  {proc.get('cpu_percent') or 0:6.1f}  "
+                         f"{proc.get('memory_percent') or 0:6.1f}  {proc.get('name') or ''}")
+
+    # 终端最后一个字符写入后光标越界，留出最后一列
+    lines = [fit(line, width - 1) for line in lines[:height]]
+    return lines + [""] * (height - len(lines))
+
+
+class FrameDiff:
+    """记录上一帧，找出需要重绘的行"""
+
+    def __init__(self):
+        self._previous: List[str] = []
+
+    def changes(self, lines: List[str]) -> List[Tuple[int, str]]:
+        """返回内容变化的(行号, 新文本)"""
+        previous = self._previous
+        changed = [(row, line) for row, line in enumerate(lines)
+                   if row >= len(previous) or previous[row] != line]
+        self._previous = list(lines)
+        return changed
+
+    def reset(self):
+        """终端尺寸变化等情况下强制全部重绘"""
+        self._previous = []
+
+
+class TopView:
+    """全屏监控界面"""
+
+    def __init__(self, monitor: Optional[SystemMonitor] = None, interval: float = 0.5,
+                 refresh_interval: float = 1.0, history_size: int = 600):
+        """
+        初始化监控界面
+
+        Args:
+            monitor: 系统监控器，默认新建，需启用history
+            interval: 采样间隔（秒）
+            refresh_interval: 界面刷新间隔（秒），不小于采样间隔
+            history_size: 走势图使用的历史采样数
+        """
+        self.monitor = monitor or SystemMonitor(history_size=history_size)
+        if self.monitor.history is None:
+            self.monitor.history = MetricsHistory(history_size)
+        self.interval = interval
+        self.refresh_interval = max(refresh_interval, interval)
+        self.diff = FrameDiff()
+        self.frames = 0
+        self.rows_drawn = 0
+
+    def draw(self, screen: Any, metrics: SystemMetrics):
+        """绘制一帧，只重写变化的行"""
+        height, width = screen.getmaxyx()
+        lines = render_frame(metrics, self.monitor.history, width, height,
+                             1 / self.interval, 1 / self.refresh_interval)
+        for row, line in self.diff.changes(lines):
+            try:
+                screen.move(row, 0)
+                screen.clrtoeol()
+                screen.addstr(row, 0, line)
+            except Exception:
+                # 终端过小时忽略写不下的内容
+                pass
+            self.rows_drawn += 1
+        screen.noutrefresh()
+        self.frames += 1
+
+    def run(self, screen: Any):
+        """主循环，作为curses.wrapper的参数调用"""
+        import curses
+
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        screen.keypad(True)
+
+        scheduler = DeadlineScheduler(self.interval)
+        deadline = scheduler.next_deadline()
+        last_render = -float("inf")
+        metrics: Optional[SystemMetrics] = None
+        while True:
+            remaining = deadline - scheduler.clock()
+            if remaining > 0:
+                # 等待下一个采样点时处理按键，有按键时getch()立即返回
+                screen.timeout(max(1, min(int(remaining * 1000), _INPUT_POLL_MS)))
+                key = screen.getch()
+                if key in (ord("q"), ord("Q")):
+                    break
+                if key == curses.KEY_RESIZE:
+                    self.diff.reset()
+                    screen.erase()
+                    if metrics is not None:
+                        # 按新的尺寸立即重绘上一帧
+                        self.draw(screen, metrics)
+                        curses.doupdate()
+                continue
+
+            metrics = self.monitor.get_metrics()
+            now = time.monotonic()
+            if now - last_render >= self.refresh_interval - 0.001:
+                self.draw(screen, metrics)
+                curses.doupdate()
+                last_render = now
+            deadline = scheduler.next_deadline()
+
+
+def run_top(interval: float = 0.5, refresh_interval: float = 1.0,
+            monitor: Optional[SystemMonitor] = None, history_size: int = 600):
+    """启动全屏监控界面"""
+    import curses
+    import locale
+
+    locale.setlocale(locale.LC_ALL, "")
+    view = TopView(monitor, interval, refresh_interval, history_size)
+    curses.wrapper(view.run)
\ No newline at end of file
@@ -3,9 +3,13 @@
 """
 
 from .helpers import format_bytes, format_timestamp, get_gpu_info
+from .sketches import P2Quantile, QuantileSketch, RunningStats
 
 __all__ = [
     'format_bytes',
     'format_timestamp',
     'get_gpu_info',
+    'P2Quantile',
+    'QuantileSketch',
+    'RunningStats',
 ]
\ No newline at end of file
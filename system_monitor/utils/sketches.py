@@ -0,0 +1,250 @@
+"""
+流式统计与分位数草图
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+
+class RunningStats:
+    """流式计算计数、均值、方差、最小值、最大值，可合并"""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """加入一个值（Welford算法）"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "RunningStats"):
+        """合并另一组统计（Chan并行算法）"""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """总体方差"""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """总体标准差"""
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningStats":
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = data["count"], data["mean"], data["m2"]
+        stats.min, stats.max = data["min"], data["max"]
+        return stats
+
+
+class QuantileSketch:
+    """
+    相对误差有界的可合并分位数草图（DDSketch思路）
+
+    值按对数间隔分桶，分位数的相对误差不超过relative_accuracy；
+    桶数超过max_bins时合并最小的桶，只影响低分位数的精度
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy必须在0和1之间")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """加入一个值"""
+        if value > 0:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0) + count
+            if len(self.positive) > self.max_bins:
+                self._collapse(self.positive)
+        elif value < 0:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0) + count
+            if len(self.negative) > self.max_bins:
+                self._collapse(self.negative)
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def _collapse(self, bins: Dict[int, int]):
+        """合并最小的两个桶"""
+        lowest, second = sorted(bins)[:2]
+        bins[second] += bins.pop(lowest)
+
+    def merge(self, other: "QuantileSketch"):
+        """合并另一个草图（需相同的relative_accuracy）"""
+        if other.gamma != self.gamma:
+            raise ValueError("只能合并精度相同的草图")
+        for index, count in other.positive.items():
+            self.positive[index] = self.positive.get(index, 0) + count
+        for index, count in other.negative.items():
+            self.negative[index] = self.negative.get(index, 0) + count
+        while len(self.positive) > self.max_bins:
+            self._collapse(self.positive)
+        while len(self.negative) > self.max_bins:
+            self._collapse(self.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """估计分位数，q取0~1"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+            "zero_count": self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_bins"])
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = sketch.zero_count + sum(sketch.positive.values()) + sum(sketch.negative.values())
+        return sketch
+
+
+class P2Quantile:
+    """P²算法流式估计单个分位数，只保存5个标记点，内存恒定"""
+
+    __slots__ = ("q", "count", "_initial", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, q: float):
+        """
+        Args:
+            q: 分位数，取0~1
+        """
+        if not 0 < q < 1:
+            raise ValueError("q必须在0和1之间")
+        self.q = q
+        self.count = 0
+        self._initial = []
+        self._heights = []
+        self._positions = []
+        self._desired = []
+        self._increments = []
+
+    def add(self, value: float):
+        """加入一个值"""
+        self.count += 1
+        if self._initial is not None:
+            self._initial.append(value)
+            if len(self._initial) == 5:
+                q = self.q
+                self._heights = sorted(self._initial)
+                self._positions = [0, 1, 2, 3, 4]
+                self._desired = [0, 2 * q, 4 * q, 2 + 2 * q, 4]
+                self._increments = [0, q / 2, q, (1 + q) / 2, 1]
+                self._initial = None
+            return
+
+        heights, positions = self._heights, self._positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        for index in range(cell + 1, 5):
+            positions[index] += 1
+        for index in range(5):
+            self._desired[index] += self._increments[index]
+
+        for index in range(1, 4):
+            delta = self._desired[index] - positions[index]
+            if ((delta >= 1 and positions[index + 1] - positions[index] > 1)
+                    or (delta <= -1 and positions[index - 1] - positions[index] < -1)):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = heights[index] + step * (heights[index + step] - heights[index]) / (
+                        positions[index + step] - positions[index])
+                heights[index] = height
+                positions[index] += step
+
+    def _parabolic(self, index: int, step: int) -> float:
+        heights, positions = self._heights, self._positions
+        return heights[index] + step / (positions[index + 1] - positions[index - 1]) * (
+            (positions[index] - positions[index - 1] + step) * (heights[index + 1] - heights[index])
+            / (positions[index + 1] - positions[index])
+            + (positions[index + 1] - positions[index] - step) * (heights[index] - heights[index - 1])
+            / (positions[index] - positions[index - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        """当前的分位数估计"""
+        if self._initial is None:
+            return self._heights[2]
+        if not self._initial:
+            return None
+        ordered = sorted(self._initial)
+        return ordered[min(int(self.q * len(ordered)), len(ordered) - 1)]
\ No newline at end of file
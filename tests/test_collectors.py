@@ -0,0 +1,727 @@
+"""
+收集器测试
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+
+import psutil
+
+from system_monitor import SystemMonitor
+from system_monitor.collectors import (CgroupCollector, CPUCollector, DiskCollector, MemoryCollector,
+                                      NetworkCollector, ProcessCollector, ProcessWatchlist, ShardedProcessSampler,
+                                      SnapshotReader)
+from system_monitor.collectors import cgroup_collector, cpu_collector, process_collector, procfs, sharded_process
+from system_monitor.collectors.cpu_collector import CPUEngine
+
+
+class TestSnapshot(unittest.TestCase):
+    """内核快照测试"""
+
+    def test_read_snapshot(self):
+        """测试读取快照"""
+        snapshot = SnapshotReader().read()
+
+        self.assertGreater(snapshot.memory_total, 0)
+        self.assertGreaterEqual(snapshot.memory_percent, 0)
+        self.assertGreaterEqual(snapshot.net_bytes_sent, 0)
+
+    def test_collectors_use_snapshot(self):
+        """测试收集器从快照取值"""
+        snapshot = SnapshotReader().read()
+
+        with patch('psutil.virtual_memory') as mock_vm, patch('psutil.net_io_counters') as mock_net:
+            self.assertEqual(MemoryCollector().get_memory_percent(snapshot), snapshot.memory_percent)
+            self.assertEqual(NetworkCollector().get_bytes_sent(snapshot), snapshot.net_bytes_sent / (1024 ** 2))
+            mock_vm.assert_not_called()
+            mock_net.assert_not_called()
+
+    def test_get_metrics_reads_sources_once(self):
+        """测试每次采样每个数据源只读取一次"""
+        monitor = SystemMonitor(backend="psutil")
+
+        with patch('psutil.virtual_memory', wraps=psutil.virtual_memory) as mock_vm, \
+                patch('psutil.net_io_counters', wraps=psutil.net_io_counters) as mock_net:
+            monitor.get_metrics()
+
+        self.assertEqual(mock_vm.call_count, 1)
+        self.assertEqual(mock_net.call_count, 1)
+
+
+FAKE_STAT = """cpu  300 0 100 1500 100 0 0 0 0 0
+cpu0 200 0 50 700 50 0 0 0 0 0
+cpu1 100 0 50 800 50 0 0 0 0 0
+intr 12345
+ctxt 6789
+"""
+
+FAKE_MEMINFO = """MemTotal:        1000000 kB
+MemFree:          200000 kB
+MemAvailable:     600000 kB
+Buffers:           10000 kB
+Cached:           300000 kB
+"""
+
+FAKE_NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:    1000      10    0    0    0     0          0         0     1000      10    0    0    0     0       0          0
+  eth0:    5000      50    0    0    0     0          0         0     7000      70    0    0    0     0       0          0
+"""
+
+
+class TestProcfsBackend(unittest.TestCase):
+    """/proc后端测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = self.tmpdir.name
+        os.mkdir(os.path.join(root, "net"))
+        for name, content in (("stat", FAKE_STAT), ("meminfo", FAKE_MEMINFO),
+                              ("net/dev", FAKE_NET_DEV), ("loadavg", "0.50 0.25 0.10 1/100 999\n")):
+            with open(os.path.join(root, name), "w") as f:
+                f.write(content)
+        self.reader = procfs.ProcfsReader(root)
+
+    def tearDown(self):
+        self.reader.close()
+        self.tmpdir.cleanup()
+
+    def test_parse_fake_tree(self):
+        """测试解析/proc文件"""
+        ticks = procfs.CLOCK_TICKS
+        percpu = [(round(busy * ticks), round(total * ticks)) for busy, total in self.reader.read_cpu_times()]
+        self.assertEqual(percpu, [(250, 1000), (150, 1000)])
+        self.assertEqual(self.reader.read_memory(), (1024000000, 409600000, 614400000, 40.0))
+        self.assertEqual(self.reader.read_net_io(), (8000, 6000))
+        self.assertEqual(self.reader.read_net_io_per_interface(), {"lo": (1000, 1000), "eth0": (7000, 5000)})
+        self.assertEqual(self.reader.read_loadavg(), (0.5, 0.25, 0.1))
+
+    def test_rereads_reuse_buffer(self):
+        """测试重复读取复用缓冲区"""
+        proc_file = procfs.ProcFile(os.path.join(self.tmpdir.name, "stat"), 16)
+        first = bytes(proc_file.read()[:proc_file.size])
+        buf = proc_file.buf
+        second = bytes(proc_file.read()[:proc_file.size])
+        proc_file.close()
+
+        self.assertEqual(first, FAKE_STAT.encode())
+        self.assertEqual(first, second)
+        self.assertIs(proc_file.buf, buf)
+
+    @unittest.skipUnless(procfs.is_available(), "需要Linux /proc")
+    def test_matches_psutil(self):
+        """测试与psutil后端结果一致"""
+        fast = SnapshotReader("procfs").read()
+        slow = SnapshotReader("psutil").read()
+
+        self.assertEqual(fast.memory_total, slow.memory_total)
+        self.assertEqual(len(fast.cpu_times_percpu), len(slow.cpu_times_percpu))
+        self.assertAlmostEqual(fast.memory_percent, slow.memory_percent, delta=1.0)
+        self.assertAlmostEqual(fast.cpu_times[1], slow.cpu_times[1], delta=len(fast.cpu_times_percpu))
+
+
+class TestSocketCounting(unittest.TestCase):
+    """套接字计数测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        net = os.path.join(self.tmpdir.name, "net")
+        os.mkdir(net)
+        files = {
+            "sockstat": "sockets: used 50\nTCP: inuse 5 orphan 0 tw 2 alloc 7 mem 1\nUDP: inuse 3 mem 0\n"
+                        "UDPLITE: inuse 0\nRAW: inuse 1\nFRAG: inuse 0 memory 0\n",
+            "sockstat6": "TCP6: inuse 4\nUDP6: inuse 1\nUDPLITE6: inuse 0\nRAW6: inuse 0\nFRAG6: inuse 0 memory 0\n",
+            "tcp": "  sl  local_address rem_address   st\n"
+                   "   0: 0100007F:BC8F 00000000:0000 0A 00000000:00000000\n"
+                   "   1: 0100007F:BC8F 0100007F:1F90 01 00000000:00000000\n"
+                   "   2: 0100007F:BC8F 0100007F:1F91 06 00000000:00000000\n",
+            "tcp6": "  sl  local_address rem_address   st\n"
+                    "   0: 00000000000000000000000000000000:0050 00000000000000000000000000000000:0000 0A 0\n",
+            "unix": "Num       RefCount Protocol Flags    Type St Inode Path\n0000: 1\n0001: 2\n",
+        }
+        for name, content in files.items():
+            with open(os.path.join(net, name), "w") as f:
+                f.write(content)
+        self.collector = NetworkCollector(procfs_path=self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_socket_summary(self):
+        """测试读取sockstat汇总"""
+        summary = self.collector.get_socket_summary()
+        self.assertEqual(summary["TCP.inuse"], 5)
+        self.assertEqual(summary["TCP.tw"], 2)
+        self.assertEqual(summary["TCP6.inuse"], 4)
+
+    def test_connections_count_from_sockstat(self):
+        """测试根据sockstat统计连接数"""
+        with patch('psutil.net_connections') as mock_connections:
+            self.assertEqual(self.collector.get_connections_count('tcp'), 11)
+            self.assertEqual(self.collector.get_connections_count('udp'), 4)
+            self.assertEqual(self.collector.get_connections_count('inet'), 16)
+            self.assertEqual(self.collector.get_connections_count(), 18)
+            mock_connections.assert_not_called()
+
+    def test_tcp_states(self):
+        """测试统计TCP连接状态"""
+        self.assertEqual(self.collector.get_tcp_states(),
+                         {"LISTEN": 2, "ESTABLISHED": 1, "TIME_WAIT": 1})
+
+    def test_enumerate_method(self):
+        """测试仍可逐个枚举连接"""
+        with patch('psutil.net_connections', return_value=[1, 2, 3]):
+            self.assertEqual(self.collector.get_connections_count(method='enumerate'), 3)
+        with self.assertRaises(ValueError):
+            self.collector.get_connections_count('inet4_and_more', method='sockstat')
+
+
+Partition = namedtuple("Partition", ["device", "mountpoint", "fstype", "opts"])
+Usage = namedtuple("Usage", ["total", "used", "free", "percent"])
+
+
+class TestDiskCollector(unittest.TestCase):
+    """磁盘收集器测试"""
+
+    PARTITIONS = [
+        Partition("/dev/sda1", "/", "ext4", "rw"),
+        Partition("nfs:/export", "/mnt/nfs", "nfs4", "rw"),
+        Partition("/dev/loop0", "/snap/core", "squashfs", "ro"),
+    ]
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.mountinfo = os.path.join(self.tmpdir.name, "mountinfo")
+        open(self.mountinfo, "w").close()
+
+    def tearDown(self):
+        self.release.set()
+        self.tmpdir.cleanup()
+
+    def _disk_usage(self, path):
+        if path == "/mnt/nfs":
+            self.release.wait()
+        return Usage(100, 40, 60, 40.0)
+
+    def test_hung_mount_marked_stale(self):
+        """测试挂起的挂载点被标记为失效而不阻塞采样"""
+        collector = DiskCollector({"squashfs"}, timeout=0.2, mountinfo_path=self.mountinfo)
+
+        with patch('psutil.disk_partitions', return_value=self.PARTITIONS), \
+                patch('psutil.disk_usage', side_effect=self._disk_usage):
+            start = time.monotonic()
+            self.assertEqual(collector.get_all_disk_usage(), {"/": 40.0})
+            self.assertEqual(collector.stale, {"/mnt/nfs"})
+
+            # 挂起的调用未返回前不重复提交，也不再等待
+            self.assertEqual(collector.get_all_disk_usage(), {"/": 40.0})
+            self.assertLess(time.monotonic() - start, 1.0)
+
+            self.release.set()
+            time.sleep(0.1)
+            collector.get_all_disk_usage()
+            self.assertEqual(collector.get_all_disk_usage(), {"/": 40.0, "/mnt/nfs": 40.0})
+            self.assertEqual(collector.stale, set())
+
+    def test_hung_task_does_not_block_pool(self):
+        """测试挂起的调用不占用线程池，卸载后不再标记为失效"""
+        collector = DiskCollector({"squashfs"}, timeout=0.2, workers=1, mountinfo_path=self.mountinfo)
+
+        with patch('psutil.disk_partitions', return_value=self.PARTITIONS), \
+                patch('psutil.disk_usage', side_effect=self._disk_usage):
+            self.assertEqual(collector.get_all_disk_usage(), {"/": 40.0})
+            self.assertEqual(collector.stale, {"/mnt/nfs"})
+
+            # 唯一的线程挂起后补充了新线程，其他挂载点照常采样
+            start = time.monotonic()
+            self.assertEqual(collector.get_all_disk_usage(), {"/": 40.0})
+            self.assertLess(time.monotonic() - start, 0.15)
+
+            self.assertEqual(collector._usage_of(["/"]), {"/": Usage(100, 40, 60, 40.0)})
+            self.assertEqual(collector.stale, set())
+
+    def test_concurrent_sampling(self):
+        """测试多个线程同时采样时共享的状态不被破坏"""
+        collector = DiskCollector(timeout=0.2, workers=2, mountinfo_path=self.mountinfo)
+        errors = []
+
+        def sample(mountpoints):
+            try:
+                for _ in range(100):
+                    self.assertEqual(set(collector._usage_of(mountpoints)), set(mountpoints))
+            except Exception as e:
+                errors.append(e)
+
+        with patch('psutil.disk_usage', side_effect=self._disk_usage):
+            threads = [threading.Thread(target=sample, args=(mountpoints,))
+                       for mountpoints in (["/", "/data"], ["/", "/snap/core"], ["/snap/core"])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(30)
+        self.assertEqual(errors, [])
+
+    def test_partitions_cached_and_filtered(self):
+        """测试分区列表缓存与文件系统过滤"""
+        collector = DiskCollector(exclude_fstypes={"squashfs", "nfs4"}, mountinfo_path=self.mountinfo)
+
+        with patch('psutil.disk_partitions', return_value=self.PARTITIONS) as mock_partitions:
+            collector.get_partitions()
+            partitions = collector.get_partitions()
+
+        self.assertEqual(mock_partitions.call_count, 1)
+        self.assertEqual([partition.mountpoint for partition in partitions], ["/"])
+
+        # 默认不忽略任何文件系统
+        with patch('psutil.disk_partitions', return_value=self.PARTITIONS):
+            partitions = DiskCollector(mountinfo_path=self.mountinfo).get_partitions()
+        self.assertEqual(len(partitions), 3)
+
+
+class TestCPUEngine(unittest.TestCase):
+    """CPU使用率引擎测试"""
+
+    def test_usage_from_deltas(self):
+        """测试根据差值计算使用率"""
+        engine = CPUEngine()
+        engine.update((10.0, 100.0), [(5.0, 50.0), (5.0, 50.0)])
+        engine.update((40.0, 200.0), [(30.0, 100.0), (10.0, 100.0)])
+
+        self.assertEqual(engine.cpu_percent, 30.0)
+        self.assertEqual(engine.cpu_per_core, [50.0, 10.0])
+
+    def test_small_delta_keeps_previous_value(self):
+        """测试差值不足一个时钟滴答时保留上次的值，基线不前移"""
+        tick = cpu_collector.MIN_CORE_DELTA
+        engine = CPUEngine()
+        engine.update((0.0, 0.0), [(0.0, 0.0)])
+        engine.update((tick / 2, tick / 2), [(tick / 2, tick / 2)])
+        self.assertEqual(engine.cpu_percent, 0.0)
+        self.assertEqual(engine.cpu_per_core, [0.0])
+
+        engine.update((tick, 100 * tick), [(tick, 100 * tick)])
+        self.assertEqual(engine.cpu_percent, 1.0)
+        self.assertEqual(engine.cpu_per_core, [1.0])
+        engine.update((tick * 1.5, 100.5 * tick), [(tick * 1.5, 100.5 * tick)])
+        self.assertEqual(engine.cpu_percent, 1.0)
+        self.assertEqual(engine.cpu_per_core, [1.0])
+
+    def test_same_sample_is_idempotent(self):
+        """测试同一快照重复更新不改变结果"""
+        engine = CPUEngine()
+        engine.update((0.0, 100.0), [(0.0, 100.0)], sample_id=1.0)
+        engine.update((50.0, 200.0), [(50.0, 200.0)], sample_id=2.0)
+        engine.update((50.0, 200.0), [(50.0, 200.0)], sample_id=2.0)
+
+        self.assertEqual(engine.cpu_percent, 50.0)
+
+    def test_collector_does_not_block(self):
+        """测试获取CPU使用率不阻塞"""
+        collector = CPUCollector()
+        snapshot = SnapshotReader().read()
+
+        start = time.perf_counter()
+        percent = collector.get_cpu_percent(snapshot=snapshot)
+        per_core = collector.get_cpu_per_core(snapshot)
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+        self.assertGreaterEqual(percent, 0)
+        self.assertLessEqual(percent, 100)
+        self.assertEqual(len(per_core), len(snapshot.cpu_times_percpu))
+
+
+    def test_percent_and_per_core_share_sample(self):
+        """测试不指定快照时总体与各核心使用率来自同一次读取"""
+        collector = CPUCollector()
+        with patch('psutil.cpu_times', wraps=psutil.cpu_times) as cpu_times:
+            percent = collector.get_cpu_percent()
+            per_core = collector.get_cpu_per_core()
+            self.assertEqual(cpu_times.call_count, 1)
+            self.assertEqual(percent, collector.engine.cpu_percent)
+            self.assertEqual(len(per_core), psutil.cpu_count())
+
+            # 再次读取时重新采样
+            collector.get_cpu_per_core()
+            self.assertEqual(cpu_times.call_count, 2)
+            collector.get_cpu_percent()
+            self.assertEqual(cpu_times.call_count, 2)
+
+
+class TestProcessCollector(unittest.TestCase):
+    """进程收集器测试"""
+
+    def test_cpu_percent_from_persistent_table(self):
+        """测试创建后首次获取即得到真实的CPU使用率"""
+        collector = ProcessCollector()
+
+        deadline = time.process_time() + 0.2
+        while time.process_time() < deadline:
+            pass
+
+        top = collector.get_top_processes(count=len(collector._table) + 10)
+        own = [proc for proc in top if proc['pid'] == os.getpid()]
+        self.assertEqual(len(own), 1)
+        self.assertGreater(own[0]['cpu_percent'], 20)
+
+    def test_short_interval_keeps_previous_value(self):
+        """测试间隔不足时保留上次的使用率，基线不前移"""
+        collector = ProcessCollector()
+        entry = collector._table[os.getpid()]
+        baseline = entry.sample_time
+        with patch.object(process_collector.time, "monotonic",
+                          return_value=baseline + process_collector.MIN_SAMPLE_INTERVAL / 2):
+            collector.refresh()
+        self.assertEqual(entry.cpu_percent, 0.0)
+        self.assertEqual(entry.sample_time, baseline)
+
+    def test_top_by_memory(self):
+        """测试按内存排序"""
+        top = ProcessCollector().get_top_processes(count=3, sort_by='memory_percent')
+        values = [proc['memory_percent'] for proc in top]
+        self.assertEqual(values, sorted(values, reverse=True))
+
+        with self.assertRaises(ValueError):
+            ProcessCollector().get_top_processes(sort_by='name')
+
+    def test_dead_processes_removed(self):
+        """测试移除已退出的进程"""
+        collector = ProcessCollector()
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            collector.refresh()
+            self.assertIn(child.pid, collector._table)
+        finally:
+            child.kill()
+            child.wait()
+
+        collector.refresh()
+        self.assertNotIn(child.pid, collector._table)
+
+
+def fake_pid_stat(pid: int, comm: str, ticks: int, threads: int, start: int, rss_pages: int) -> str:
+    """构造/proc/[pid]/stat的内容"""
+    return (f"{pid} ({comm}) S 1 1 1 0 -1 4194560 0 0 0 0 {ticks} 0 0 0 20 0 {threads} 0 "
+            f"{start} 100000 {rss_pages} 18446744073709551615 0 0 0\n")
+
+
+class TestShardedProcessSampler(unittest.TestCase):
+    """分片进程采样测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        with open(os.path.join(self.root, "meminfo"), "w") as f:
+            f.write("MemTotal:        1000000 kB\n")
+        os.mkdir(os.path.join(self.root, "self"))
+        for pid in range(1, 31):
+            self._write(pid, f"proc{pid}", ticks=pid * 10, start=pid, rss_pages=(pid % 7) * 100)
+        self._write(31, "(odd) name", ticks=0, start=31, rss_pages=700)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, pid: int, comm: str, ticks: int, start: int, rss_pages: int):
+        directory = os.path.join(self.root, str(pid))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "stat"), "w") as f:
+            f.write(fake_pid_stat(pid, comm, ticks, 2, start, rss_pages))
+
+    def test_sharded_matches_single(self):
+        """测试多进程分片与单进程采样结果一致"""
+        with ShardedProcessSampler(1, self.root) as single, ShardedProcessSampler(3, self.root) as sharded:
+            for sort_by in ("memory_percent", "cpu_percent"):
+                self.assertEqual(single.sample(5, sort_by), sharded.sample(5, sort_by))
+
+            result = sharded.sample(3, "memory_percent")
+        self.assertEqual(result.process_count, 31)
+        self.assertEqual(result.thread_count, 62)
+        self.assertEqual([proc["pid"] for proc in result.top_processes], [31, 6, 13])
+        self.assertEqual(result.top_processes[0]["name"], "(odd) name")
+        self.assertAlmostEqual(result.top_processes[0]["memory_percent"],
+                               700 * sharded_process.PAGE_SIZE / 1024000000 * 100)
+
+    def test_cpu_percent_from_ticks(self):
+        """测试按两次采样的CPU时间差计算使用率，pid复用时重新计算"""
+        clock = [100.0]
+        fake_time = type("FakeTime", (), {"monotonic": staticmethod(lambda: clock[0])})
+        with patch.object(sharded_process, "time", fake_time):
+            sampler = ShardedProcessSampler(1, self.root)
+            sampler.sample()
+            clock[0] = 102.0
+            self._write(5, "proc5", ticks=50 + procfs.CLOCK_TICKS, start=5, rss_pages=0)
+            self._write(6, "reused", ticks=60 + 4 * procfs.CLOCK_TICKS, start=999, rss_pages=0)
+            top = sampler.get_top_processes(2)
+
+        self.assertEqual(top[0]["pid"], 5)
+        self.assertEqual(top[0]["cpu_percent"], 50.0)
+        self.assertNotIn(6, [proc["pid"] for proc in top])
+
+    def test_short_interval_keeps_previous_value(self):
+        """测试间隔不足时保留上次的使用率，基线不前移"""
+        clock = [100.0]
+        fake_time = type("FakeTime", (), {"monotonic": staticmethod(lambda: clock[0])})
+        with patch.object(sharded_process, "time", fake_time):
+            sampler = ShardedProcessSampler(1, self.root)
+            clock[0] = 102.0
+            self._write(5, "proc5", ticks=50 + procfs.CLOCK_TICKS, start=5, rss_pages=0)
+            self.assertEqual(sampler.get_top_processes(1)[0]["cpu_percent"], 50.0)
+            clock[0] += sharded_process.MIN_SAMPLE_INTERVAL / 2
+            self._write(5, "proc5", ticks=51 + procfs.CLOCK_TICKS, start=5, rss_pages=0)
+            self.assertEqual(sampler.get_top_processes(1)[0]["cpu_percent"], 50.0)
+
+    def test_worker_errors_and_restart(self):
+        """测试工作进程的异常在主进程中抛出，退出的工作进程自动重启"""
+        with ShardedProcessSampler(2, self.root) as sampler:
+            moved = self.root + ".moved"
+            os.rename(self.root, moved)
+            try:
+                with self.assertRaises(FileNotFoundError):
+                    sampler.sample()
+            finally:
+                os.rename(moved, self.root)
+            self.assertEqual(sampler.sample().process_count, 31)
+
+            sampler._processes[1].kill()
+            sampler._processes[1].join(5)
+            self.assertEqual(sampler.sample().process_count, 31)
+            self.assertEqual(sampler.restarts, 1)
+            self.assertTrue(sampler._processes[1].is_alive())
+            self.assertEqual(sampler.sample().process_count, 31)
+
+    @unittest.skipUnless((os.cpu_count() or 1) >= 2, "需要多个CPU核心")
+    def test_sharding_faster_than_single(self):
+        """测试进程很多时多进程分片采样比单进程快"""
+        for pid in range(100, 8100):
+            self._write(pid, f"proc{pid}", ticks=pid, start=pid, rss_pages=pid % 100)
+
+        def best_time(sampler: ShardedProcessSampler) -> float:
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                sampler.sample(10)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        workers = min(os.cpu_count(), 4)
+        with ShardedProcessSampler(1, self.root) as single, ShardedProcessSampler(workers, self.root) as sharded:
+            self.assertEqual(single.sample(10).process_count, sharded.sample(10).process_count)
+            self.assertLess(best_time(sharded), best_time(single))
+
+    @unittest.skipUnless(procfs.is_available(), "需要Linux /proc")
+    def test_real_proc(self):
+        """测试读取真实的/proc，与psutil的进程数一致"""
+        with ShardedProcessSampler(2) as sampler:
+            deadline = time.process_time() + 0.2
+            while time.process_time() < deadline:
+                pass
+            result = sampler.sample(count=100000)
+
+        own = [proc for proc in result.top_processes if proc["pid"] == os.getpid()]
+        self.assertEqual(len(own), 1)
+        self.assertGreater(own[0]["cpu_percent"], 20)
+        self.assertAlmostEqual(result.process_count, len(psutil.pids()), delta=5)
+
+
+class TestProcessWatchlist(unittest.TestCase):
+    """进程关注列表测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.children = []
+        # 通过符号链接启动，进程名为smwatch-test，便于按名称匹配
+        self.program = os.path.join(self.tmpdir.name, "smwatch-test")
+        os.symlink(shutil.which("sleep"), self.program)
+
+    def tearDown(self):
+        for child in self.children:
+            child.kill()
+            child.wait()
+        self.tmpdir.cleanup()
+
+    def _spawn(self) -> subprocess.Popen:
+        child = subprocess.Popen([self.program, "30"])
+        self.children.append(child)
+        return child
+
+    def _stop(self, child: subprocess.Popen):
+        child.kill()
+        child.wait()
+
+    def test_rates_for_own_process(self):
+        """测试第二次采样得到CPU与上下文切换速率"""
+        watchlist = ProcessWatchlist()
+        label = watchlist.add(pid=os.getpid(), label="self")
+        watchlist.sample()
+
+        deadline = time.process_time() + 0.2
+        while time.process_time() < deadline:
+            pass
+        sample, = watchlist.sample()
+
+        self.assertEqual((label, sample.pid, sample.running), ("self", os.getpid(), True))
+        self.assertGreater(sample.cpu_percent, 20)
+        self.assertEqual(sample.memory_rss, psutil.Process().memory_info().rss)
+        self.assertGreaterEqual(sample.ctx_switches_per_sec, 0)
+        if sys.platform.startswith("linux"):
+            self.assertGreater(sample.num_fds, 0)
+            self.assertIsNotNone(sample.read_bytes_per_sec)
+
+    def test_name_reattach_after_restart(self):
+        """测试按名称关注的进程重启后自动重新关注"""
+        watchlist = ProcessWatchlist(rescan_interval=3600)
+        watchlist.add(name="smwatch-*")
+        first = self._spawn()
+        self.assertEqual([(s.pid, s.running) for s in watchlist.sample()], [(first.pid, True)])
+
+        self._stop(first)
+        sample, = watchlist.sample()
+        self.assertFalse(sample.running)
+
+        second = self._spawn()
+        sample, = watchlist.sample()
+        self.assertEqual((sample.pid, sample.name, sample.restarts), (second.pid, "smwatch-test", 1))
+
+    def test_pidfile_follows_new_pid(self):
+        """测试pid文件中的pid变化时跟随新进程"""
+        pidfile = os.path.join(self.tmpdir.name, "service.pid")
+        watchlist = ProcessWatchlist()
+        self.assertEqual(watchlist.add(pidfile=pidfile), "service")
+        self.assertFalse(watchlist.sample()[0].running)
+
+        for restarts in range(2):
+            child = self._spawn()
+            with open(pidfile, "w") as f:
+                f.write(f"{child.pid}\n")
+            sample, = watchlist.sample()
+            self.assertEqual((sample.pid, sample.running, sample.restarts), (child.pid, True, restarts))
+            self._stop(child)
+
+    def test_invalid_targets(self):
+        """测试参数检查"""
+        watchlist = ProcessWatchlist()
+        with self.assertRaises(ValueError):
+            watchlist.add(pid=1, name="x")
+        child = self._spawn()
+        self._stop(child)
+        with self.assertRaises(ValueError):
+            watchlist.add(pid=child.pid)
+        watchlist.add(name="a*", label="a")
+        with self.assertRaises(ValueError):
+            watchlist.add(name="b*", label="a")
+
+    def test_monitor_watch(self):
+        """测试SystemMonitor报告关注进程并展开为指标"""
+        monitor = SystemMonitor()
+        monitor.watch(pid=os.getpid(), label="self")
+        monitor.get_metrics()
+        metrics = monitor.get_metrics()
+
+        self.assertEqual([proc["pid"] for proc in metrics.watched_processes], [os.getpid()])
+        values = metrics.flatten()
+        self.assertEqual(values["watch:self:processes"], 1.0)
+        self.assertGreater(values["watch:self:rss_mb"], 0)
+
+        monitor.unwatch("self")
+        self.assertEqual(monitor.get_metrics().watched_processes, [])
+
+
+class TestCgroupCollector(unittest.TestCase):
+    """cgroup v2收集器测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self._write("", "cgroup.controllers", "cpu io memory pids\n")
+        for path in ("system.slice/nginx.service", "system.slice/db.service", "user.slice"):
+            self._write_cgroup(path, usage=1000000, rbytes=4096, wbytes=0, memory=1048576, pids=3)
+        os.makedirs(os.path.join(self.root, "system.slice/nginx.service/worker"))
+        # 未启用io控制器的cgroup
+        os.makedirs(os.path.join(self.root, "init.scope"))
+        self._write("init.scope", "cpu.stat", "usage_usec 10\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, path: str, name: str, content: str):
+        directory = os.path.join(self.root, path)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(content)
+
+    def _write_cgroup(self, path: str, usage: int, rbytes: int, wbytes: int, memory: int, pids: int):
+        self._write(path, "cpu.stat", f"usage_usec {usage}\nuser_usec {usage}\nsystem_usec 0\n"
+                                      f"nr_periods 0\nnr_throttled 0\nthrottled_usec 0\n")
+        self._write(path, "memory.current", f"{memory}\n")
+        self._write(path, "memory.stat", f"anon {memory // 2}\nfile {memory // 4}\nkernel 0\n")
+        self._write(path, "io.stat", f"8:0 rbytes={rbytes} wbytes={wbytes} rios=1 wios=0 dbytes=0 dios=0\n"
+                                     f"8:16 rbytes={rbytes} wbytes=0 rios=1 wios=0 dbytes=0 dios=0\n")
+        self._write(path, "pids.current", f"{pids}\n")
+
+    def test_depth_and_pattern(self):
+        """测试限制遍历深度并按通配符筛选"""
+        self.assertEqual(CgroupCollector(self.root, max_depth=1).list_cgroups(),
+                         ["init.scope", "system.slice", "user.slice"])
+        self.assertEqual(CgroupCollector(self.root, max_depth=2, pattern="system.slice/*").list_cgroups(),
+                         ["system.slice/db.service", "system.slice/nginx.service"])
+        self.assertIn("system.slice/nginx.service/worker",
+                      CgroupCollector(self.root, max_depth=3, pattern="*.service/*").list_cgroups())
+        with self.assertRaises(ValueError):
+            CgroupCollector(os.path.join(self.root, "user.slice"))
+
+    def test_rates_from_deltas(self):
+        """测试按两次采样的差值计算CPU和I/O速率"""
+        clock = [100.0]
+        fake_time = type("FakeTime", (), {"monotonic": staticmethod(lambda: clock[0])})
+        with patch.object(cgroup_collector, "time", fake_time):
+            collector = CgroupCollector(self.root, pattern="system.slice/*")
+            first = collector.collect()
+            self.assertEqual([(s.cpu_percent, s.io_read_bytes_per_sec) for s in first], [(0.0, 0.0)] * 2)
+
+            clock[0] = 102.0
+            self._write_cgroup("system.slice/nginx.service", usage=2000000, rbytes=8192, wbytes=1000,
+                               memory=2097152, pids=5)
+            top = collector.get_top_cgroups(1)
+
+        nginx, = top
+        self.assertEqual(nginx.path, "system.slice/nginx.service")
+        self.assertEqual(nginx.cpu_percent, 50.0)
+        self.assertEqual((nginx.io_read_bytes_per_sec, nginx.io_write_bytes_per_sec), (4096.0, 500.0))
+        self.assertEqual((nginx.memory_current, nginx.memory_anon, nginx.memory_file), (2097152, 1048576, 524288))
+        self.assertEqual(nginx.pids, 5)
+
+    def test_missing_controllers_and_removed_cgroups(self):
+        """测试未启用的控制器返回None，删除的cgroup不再保留状态"""
+        collector = CgroupCollector(self.root, max_depth=1)
+        stats = {s.path: s for s in collector.collect()}
+        self.assertIsNone(stats["init.scope"].memory_current)
+        self.assertIsNone(stats["init.scope"].io_read_bytes_per_sec)
+        self.assertEqual(stats["user.slice"].pids, 3)
+
+        shutil.rmtree(os.path.join(self.root, "user.slice"))
+        collector.collect()
+        self.assertNotIn("user.slice", collector._previous)
+
+    def test_monitor_reports_cgroups(self):
+        """测试SystemMonitor报告cgroup并展开为指标"""
+        monitor = SystemMonitor()
+        monitor.cgroup_collector = CgroupCollector(self.root, pattern="system.slice/*")
+        metrics = monitor.get_metrics()
+
+        self.assertEqual([cgroup["path"] for cgroup in metrics.cgroups],
+                         ["system.slice/db.service", "system.slice/nginx.service"])
+        values = metrics.flatten()
+        self.assertEqual(values["cgroup:system.slice/db.service:memory_mb"], 1.0)
+        self.assertEqual(values["cgroup:system.slice/db.service:pids"], 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+回调分发器测试
+"""
+
+import threading
+import time
+import unittest
+
+from system_monitor import SystemMonitor
+from system_monitor.dispatcher import CallbackDispatcher, DropPolicy, Subscriber
+
+
+class TestSubscriber(unittest.TestCase):
+    """订阅者队列策略测试"""
+
+    def _fill(self, policy, count=5, maxsize=3):
+        subscriber = Subscriber(lambda item: None, maxsize=maxsize, policy=policy)
+        for item in range(count):
+            subscriber.offer(item)
+        return subscriber, list(subscriber._queue)
+
+    def test_drop_oldest(self):
+        """测试丢弃最旧数据"""
+        subscriber, items = self._fill(DropPolicy.DROP_OLDEST)
+        self.assertEqual(items, [2, 3, 4])
+        self.assertEqual(subscriber.stats.dropped, 2)
+        self.assertEqual(subscriber.stats.depth, 3)
+
+    def test_drop_newest(self):
+        """测试丢弃最新数据"""
+        subscriber, items = self._fill(DropPolicy.DROP_NEWEST)
+        self.assertEqual(items, [0, 1, 2])
+        self.assertEqual(subscriber.stats.dropped, 2)
+
+    def test_coalesce(self):
+        """测试只保留最新数据"""
+        subscriber, items = self._fill(DropPolicy.COALESCE)
+        self.assertEqual(items, [4])
+        self.assertEqual(subscriber.stats.dropped, 4)
+
+
+class TestCallbackDispatcher(unittest.TestCase):
+    """回调分发器测试"""
+
+    def test_delivers_in_order(self):
+        """测试同一订阅者按顺序收到所有数据"""
+        received = []
+        dispatcher = CallbackDispatcher(workers=4)
+        dispatcher.subscribe(received.append, policy=DropPolicy.BLOCK, maxsize=2)
+        dispatcher.start()
+
+        for item in range(100):
+            dispatcher.publish(item)
+        dispatcher.stop()
+
+        self.assertEqual(received, list(range(100)))
+
+    def test_slow_subscriber_does_not_block_publisher(self):
+        """测试慢速订阅者不阻塞发布方"""
+        release = threading.Event()
+        fast = []
+        dispatcher = CallbackDispatcher(workers=2)
+        slow = dispatcher.subscribe(lambda item: release.wait(), maxsize=1, policy=DropPolicy.DROP_NEWEST)
+        dispatcher.subscribe(fast.append)
+        dispatcher.start()
+
+        start = time.monotonic()
+        for item in range(50):
+            dispatcher.publish(item)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        release.set()
+        dispatcher.stop()
+        self.assertEqual(fast, list(range(50)))
+        self.assertGreater(slow.stats.dropped, 0)
+
+    def test_callback_errors_are_counted(self):
+        """测试回调异常被统计"""
+        def failing(item):
+            raise RuntimeError("boom")
+
+        dispatcher = CallbackDispatcher()
+        subscriber = dispatcher.subscribe(failing)
+        dispatcher.start()
+        dispatcher.publish(1)
+        dispatcher.stop()
+
+        self.assertEqual(subscriber.stats.errors, 1)
+
+    def test_stats_keyed_per_subscriber(self):
+        """测试同名回调的统计互不覆盖"""
+        dispatcher = CallbackDispatcher()
+        first = dispatcher.subscribe(lambda item: None)
+        second = dispatcher.subscribe(lambda item: None)
+
+        stats = dispatcher.get_stats()
+        self.assertEqual(len(stats), 2)
+        self.assertIs(stats[first.name], first.stats)
+        self.assertIs(stats[second.name], second.stats)
+
+    def test_unsubscribe_discards_queued_items(self):
+        """测试取消订阅后不再调用回调处理已排队的数据"""
+        started = threading.Event()
+        release = threading.Event()
+        received = []
+
+        def slow(item):
+            started.set()
+            release.wait(5)
+            received.append(item)
+
+        dispatcher = CallbackDispatcher(workers=1)
+        subscriber = dispatcher.subscribe(slow)
+        dispatcher.start()
+        for item in range(3):
+            dispatcher.publish(item)
+        self.assertTrue(started.wait(5))
+
+        dispatcher.unsubscribe(slow)
+        release.set()
+        dispatcher.stop()
+
+        self.assertEqual(received, [0])
+        self.assertEqual(subscriber.stats.dropped, 2)
+
+    def test_restart_after_stop_timeout(self):
+        """测试停止超时未退出的线程在重新启动后不加入新的线程池"""
+        release = threading.Event()
+        received = []
+
+        def slow(item):
+            release.wait(5)
+            received.append(item)
+
+        dispatcher = CallbackDispatcher(workers=1)
+        dispatcher.subscribe(slow)
+        dispatcher.start()
+        dispatcher.publish(0)
+        dispatcher.publish(1)
+        time.sleep(0.05)
+        leaked = dispatcher._threads[0]
+        dispatcher.stop(timeout=0.1)
+        self.assertTrue(leaked.is_alive())
+
+        dispatcher.start()
+        dispatcher.publish(2)
+        release.set()
+        leaked.join(5)
+        self.assertFalse(leaked.is_alive())
+
+        workers = list(dispatcher._threads)
+        dispatcher.stop()
+        self.assertEqual(received, [0, 1, 2])
+        self.assertFalse(any(thread.is_alive() for thread in workers))
+
+    def test_monitor_callbacks_run_async(self):
+        """测试监控器通过分发器调用回调"""
+        received = []
+        monitor = SystemMonitor()
+        monitor.register_callback(received.append)
+
+        monitor.start_monitoring(interval=0.05)
+        time.sleep(0.3)
+        monitor.stop_monitoring()
+
+        self.assertGreater(len(received), 0)
+        stats = monitor.get_callback_stats()
+        self.assertEqual(list(stats.values())[0].delivered, len(received))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
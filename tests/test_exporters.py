@@ -0,0 +1,466 @@
+"""
+导出器测试
+"""
+
+import csv
+import gzip
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from system_monitor import SystemMetrics
+from system_monitor.exporters import (
+    ArchiveExporter, ArchiveReader, CSVExporter, JSONExporter, PrometheusExporter, UDPExporter
+)
+from system_monitor.exporters import json_exporter
+from system_monitor.exporters.prometheus_exporter import render_metrics
+from system_monitor.exporters.udp_exporter import format_influx, format_statsd
+
+try:
+    import pyarrow.parquet as pq
+    from system_monitor.exporters import ParquetExporter
+except ImportError:
+    pq = None
+
+
+def make_metrics(index: int = 0) -> SystemMetrics:
+    """构造测试用的监控数据"""
+    return SystemMetrics(
+        timestamp=datetime(2024, 1, 1, 12, 0, 0) + timedelta(seconds=index),
+        cpu_percent=10.0 + index,
+        cpu_per_core=[5.0, 15.0 + index],
+        memory_percent=50.0,
+        memory_used=4.0,
+        memory_total=8.0,
+        disk_usage={"/": 40.0, "/data": 70.0},
+        network_sent=1.5 + index,
+        network_recv=2.5 + index,
+        network_connections=12,
+        top_processes=[{"pid": 1, "name": "init", "cpu_percent": 0.5, "memory_percent": 0.1}],
+    )
+
+
+class TestJSONExporter(unittest.TestCase):
+    """JSON导出器测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_json_mode_max_records(self):
+        """测试JSON模式保留的记录数"""
+        exporter = JSONExporter(self._path("data.json"), max_records=3)
+        exporter.export_batch([make_metrics(i) for i in range(5)])
+
+        data = exporter.load_data()
+        self.assertEqual([item["cpu"]["total_percent"] for item in data], [12.0, 13.0, 14.0])
+
+    def test_ndjson_appends_compact_lines(self):
+        """测试NDJSON模式逐行追加"""
+        path = self._path("data.ndjson")
+        exporter = JSONExporter(path)
+        self.assertEqual(exporter.mode, "ndjson")
+
+        for i in range(3):
+            exporter.export_single(make_metrics(i))
+        exporter.close()
+
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertNotIn(": ", lines[0])
+        self.assertEqual(json.loads(lines[2])["cpu"]["total_percent"], 12.0)
+
+        # 重新打开后继续追加
+        exporter = JSONExporter(path)
+        exporter.export_single(make_metrics(3))
+        exporter.close()
+        self.assertEqual(len(exporter.load_data()), 4)
+
+    def test_ndjson_rotation_and_streaming(self):
+        """测试按大小轮转、压缩以及跨文件读取"""
+        path = self._path("data.jsonl")
+        exporter = JSONExporter(path, max_bytes=600, compress=True)
+        for i in range(20):
+            exporter.export_single(make_metrics(i))
+        exporter.close()
+
+        segments = exporter.segments()
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(segment.suffix == ".gz" for segment in segments[:-1]))
+
+        values = [item["cpu"]["total_percent"] for item in exporter.iter_data()]
+        self.assertEqual(values, [10.0 + i for i in range(20)])
+
+    def test_close_does_not_wait_for_slow_compression(self):
+        """测试压缩很慢时close最多等待timeout秒，未压缩的文件仍可读取"""
+        release = threading.Event()
+        path = self._path("data.jsonl")
+        exporter = JSONExporter(path, max_bytes=600, compress=True)
+        with patch.object(json_exporter, "_compress_file", side_effect=lambda segment: release.wait()):
+            for i in range(20):
+                exporter.export_single(make_metrics(i))
+            start = time.monotonic()
+            exporter.close(timeout=0.1)
+            self.assertLess(time.monotonic() - start, 1.0)
+            release.set()
+
+        values = [item["cpu"]["total_percent"] for item in exporter.iter_data()]
+        self.assertEqual(values, [10.0 + i for i in range(20)])
+
+    def test_segments_ignore_unrelated_files(self):
+        """测试只列出轮转生成的文件"""
+        path = self._path("data.ndjson")
+        for name in ("data.20240101-120000.ndjson.gz", "data.20240101-120000-1.ndjson",
+                     "data.old.ndjson", "data.backup.ndjson.gz", "data.20240101-120000.json"):
+            open(self._path(name), "w").close()
+        exporter = JSONExporter(path)
+        exporter.export_single(make_metrics(0))
+        exporter.close()
+
+        self.assertEqual([segment.name for segment in exporter.segments()],
+                         ["data.20240101-120000.ndjson.gz", "data.20240101-120000-1.ndjson", "data.ndjson"])
+
+    def test_rotate_interval_survives_reopen(self):
+        """测试重新打开已有文件时按其开始时间计算轮转间隔"""
+        path = self._path("data.ndjson")
+        exporter = JSONExporter(path, rotate_interval=3600)
+        exporter.export_single(make_metrics(0))
+        exporter.close()
+        self.assertEqual(len(exporter.segments()), 1)
+
+        # 文件中第一条记录早于一个轮转间隔，重新打开后立即轮转
+        exporter = JSONExporter(path, rotate_interval=3600)
+        exporter.export_single(make_metrics(1))
+        exporter.export_single(make_metrics(2))
+        exporter.close()
+        self.assertEqual(len(exporter.segments()), 2)
+        self.assertEqual(len(exporter.load_data()), 3)
+
+
+class TestCSVExporter(unittest.TestCase):
+    """CSV导出器测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.csv")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _read(self, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_narrow_schema(self):
+        """测试默认的简表结构"""
+        exporter = CSVExporter(self.path)
+        exporter.export_batch([make_metrics(i) for i in range(3)])
+
+        rows = self._read(self.path)
+        self.assertEqual(rows[0][:2], ["timestamp", "cpu_percent"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][5], "40.00")
+
+    def test_wide_schema(self):
+        """测试宽表包含每个核心、挂载点和进程"""
+        exporter = CSVExporter(self.path, schema="wide")
+        exporter.export_single(make_metrics())
+
+        header, row = self._read(self.path)
+        values = dict(zip(header, row))
+        self.assertEqual(values["cpu_core_1"], "15.00")
+        self.assertEqual(values["disk:/data"], "70.00")
+        self.assertEqual(values["proc_1_name"], "init")
+        self.assertEqual(values["proc_3_pid"], "")
+        self.assertEqual(values["network_connections"], "12")
+        flattened = [name for name in header if name != "timestamp" and not name.startswith("proc_")]
+        self.assertEqual(flattened, list(make_metrics().flatten()))
+
+    def test_new_mount_starts_new_segment(self):
+        """测试出现新挂载点时写入新版本的文件段"""
+        exporter = CSVExporter(self.path, schema="wide")
+        exporter.export_single(make_metrics(0))
+        metrics = make_metrics(1)
+        metrics.disk_usage = {"/": 41.0, "/mnt/usb": 5.0}
+        exporter.export_batch([metrics, make_metrics(2)])
+
+        segments = exporter.segments()
+        self.assertEqual([path.name for path in segments], ["data.csv", "data.v2.csv"])
+        header, *rows = self._read(segments[1])
+        self.assertIn("disk:/mnt/usb", header)
+        self.assertIn("disk:/data", header)
+        self.assertEqual(len(rows), 2)
+
+        # 重新打开后继续写入最新的文件段
+        resumed = CSVExporter(self.path, schema="wide")
+        resumed.export_single(make_metrics(3))
+        self.assertEqual(resumed.version, 2)
+        self.assertEqual(len(self._read(segments[1])), 4)
+
+    def test_buffered_flush_policy(self):
+        """测试缓冲模式按行数刷新"""
+        exporter = CSVExporter(self.path, buffered=True, flush_rows=3, flush_interval=3600)
+        exporter.export_single(make_metrics(0))
+        self.assertEqual(len(self._read(self.path)), 1)
+
+        exporter.export_batch([make_metrics(1), make_metrics(2)])
+        self.assertEqual(len(self._read(self.path)), 4)
+
+        exporter.export_single(make_metrics(3))
+        exporter.close()
+        self.assertEqual(len(self._read(self.path)), 5)
+
+
+class TestArchiveExporter(unittest.TestCase):
+    """压缩归档导出器测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.smz")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """测试写入后逐位还原，包括抖动的时间戳与缺失值"""
+        exporter = ArchiveExporter(self.path, block_rows=16)
+        expected = []
+        timestamp = 1700000000.0
+        for i in range(50):
+            timestamp += 1.0 + (i % 3) * 0.0015 + (100 if i == 30 else 0)
+            values = {"cpu_percent": 10.0 + (i % 7) * 0.25, "memory_percent": 50.0, "cpu_core_0": -i / 3}
+            if i >= 20:
+                values["disk:/data"] = 70.0
+            exporter.append(timestamp, values)
+            expected.append((timestamp, values))
+        exporter.close()
+
+        records = list(ArchiveReader(self.path).iter_records())
+        self.assertEqual(len(records), 50)
+        for (timestamp, values), (read_timestamp, read_values) in zip(expected, records):
+            self.assertAlmostEqual(read_timestamp, timestamp, delta=1e-6)
+            self.assertEqual(read_values, values)
+
+    def test_time_range_skips_blocks(self):
+        """测试按块头时间范围读取"""
+        exporter = ArchiveExporter(self.path, block_rows=10)
+        exporter.export_batch([make_metrics(i) for i in range(35)])
+        exporter.close()
+
+        reader = ArchiveReader(self.path)
+        self.assertEqual([rows for _, _, _, rows in reader.blocks()], [10, 10, 10, 5])
+        start = make_metrics(0).timestamp.timestamp()
+        self.assertEqual(reader.time_bounds(), (start, start + 34))
+
+        records = list(reader.iter_records(start + 12, start + 14))
+        self.assertEqual([timestamp - start for timestamp, _ in records], [12, 13, 14])
+        self.assertEqual(records[0][1], make_metrics(12).flatten())
+
+    def test_blocks_written_within_interval(self):
+        """测试默认每60秒写出一个块，缓冲中的数据不超过该时长"""
+        exporter = ArchiveExporter(self.path)
+        exporter.export_batch([make_metrics(i * 10) for i in range(13)])
+        self.assertEqual([rows for _, _, _, rows in ArchiveReader(self.path).blocks()], [6, 6])
+        exporter.close()
+        self.assertEqual(len(list(ArchiveReader(self.path).iter_records())), 13)
+
+    def test_smaller_than_csv_and_truncated_block(self):
+        """测试压缩率，并忽略写入中断的块"""
+        metrics = [make_metrics(i) for i in range(200)]
+        for item in metrics:
+            item.network_sent = item.network_recv = 100.0
+        exporter = ArchiveExporter(self.path, block_rows=100, block_interval=3600)
+        exporter.export_batch(metrics)
+        exporter.close()
+        csv_path = os.path.join(self.tmpdir.name, "data.csv")
+        CSVExporter(csv_path).export_batch(metrics)
+        self.assertLess(os.path.getsize(self.path) * 5, os.path.getsize(csv_path))
+
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual(len(list(ArchiveReader(self.path).iter_records())), 100)
+
+        # 继续追加到已有文件
+        exporter = ArchiveExporter(self.path)
+        self.assertEqual(exporter.filepath.name, "data.smz")
+        with self.assertRaises(ValueError):
+            ArchiveExporter(csv_path)
+
+
+class TestPrometheusExporter(unittest.TestCase):
+    """Prometheus导出器测试"""
+
+    def test_render(self):
+        """测试渲染各核心、挂载点、网卡和进程的序列"""
+        metrics = make_metrics(0)
+        metrics.network_interfaces = {"eth0": (1.0, 2.0)}
+        metrics.top_processes = [{"pid": 7, "name": 'a"b', "cpu_percent": 3.5, "memory_percent": 1.0}]
+        metrics.ages = {"disk": 12.0}
+        text = render_metrics(metrics).decode("utf-8")
+
+        self.assertIn("# TYPE sysmon_cpu_usage_percent gauge\nsysmon_cpu_usage_percent 10.0\n", text)
+        self.assertIn('sysmon_cpu_core_usage_percent{core="1"} 15.0', text)
+        self.assertIn('sysmon_disk_usage_percent{mountpoint="/data"} 70.0', text)
+        self.assertIn('sysmon_network_interface_received_bytes_total{interface="eth0"} 2097152.0', text)
+        self.assertIn('sysmon_process_cpu_percent{rank="1",pid="7",name="a\\"b"} 3.5', text)
+        self.assertIn('sysmon_metric_age_seconds{group="disk"} 12.0', text)
+        self.assertIn("sysmon_memory_total_bytes 8589934592.0", text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_serve_cached_payload(self):
+        """测试抓取返回缓存的内容，只有新的采样才重新渲染"""
+        exporter = PrometheusExporter(host="127.0.0.1", port=0)
+        exporter.export_single(make_metrics(0))
+        exporter.start()
+        try:
+            host, port = exporter.address
+            url = f"http://{host}:{port}/metrics"
+            with urllib.request.urlopen(url) as response:
+                body = response.read()
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+            self.assertIs(exporter.payload(), exporter.payload())
+            self.assertEqual(body, exporter.payload())
+
+            request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+            with urllib.request.urlopen(request) as response:
+                self.assertEqual(response.headers["Content-Encoding"], "gzip")
+                self.assertEqual(gzip.decompress(response.read()), body)
+
+            exporter.export_single(make_metrics(5))
+            with urllib.request.urlopen(url) as response:
+                self.assertIn(b"sysmon_cpu_usage_percent 15.0", response.read())
+
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://{host}:{port}/other")
+        finally:
+            exporter.close()
+
+
+class TestUDPExporter(unittest.TestCase):
+    """UDP推送导出器测试"""
+
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(("127.0.0.1", 0))
+        self.receiver.settimeout(1.0)
+        self.port = self.receiver.getsockname()[1]
+
+    def tearDown(self):
+        self.receiver.close()
+
+    def _receive(self, count: int):
+        return [self.receiver.recv(65536) for _ in range(count)]
+
+    def test_formats(self):
+        """测试StatsD与行协议格式"""
+        metrics = make_metrics(0)
+        metrics.network_interfaces = {"eth0": (1.0, 2.0)}
+        statsd = format_statsd(metrics)
+        self.assertIn(b"sysmon.cpu_percent:10|g", statsd)
+        self.assertIn(b"sysmon.cpu_core_1:15|g", statsd)
+        self.assertIn(b"sysmon.disk.root:40|g", statsd)
+        self.assertIn(b"sysmon.disk.data:70|g", statsd)
+        self.assertIn(b"sysmon.net.eth0.recv_bytes:2097152|g", statsd)
+
+        metrics.top_processes = [{"pid": 1, "name": "my proc,x", "cpu_percent": 0.5, "memory_percent": 0.1}]
+        influx = format_influx(metrics, tags={"host": "h1"})
+        timestamp = int(metrics.timestamp.timestamp()) * 10 ** 9
+        self.assertTrue(influx[0].startswith(b"sysmon,host=h1 cpu_percent=10.0,"))
+        self.assertTrue(influx[0].endswith(b"network_connections=12i %d" % timestamp))
+        self.assertIn(b"sysmon_disk,host=h1,mountpoint=/data usage_percent=70.0 %d" % timestamp, influx)
+        self.assertIn(b"sysmon_process,host=h1,rank=1,pid=1,name=my\\ proc\\,x "
+                      b"cpu_percent=0.5,memory_percent=0.1 %d" % timestamp, influx)
+
+        # 超过6位有效数字的值不丢失精度
+        metrics.cpu_percent = 1234567.8
+        metrics.memory_used = 0.125
+        self.assertIn(b"sysmon.cpu_percent:1234567.8|g", format_statsd(metrics))
+        self.assertIn(b"sysmon.memory_used_gb:0.125|g", format_statsd(metrics))
+        self.assertTrue(format_influx(metrics)[0].startswith(b"sysmon cpu_percent=1234567.8,"))
+
+    def test_lines_packed_into_datagrams(self):
+        """测试多行装入不超过限制的数据报"""
+        exporter = UDPExporter("127.0.0.1", self.port, packet_size=120)
+        metrics = [make_metrics(i) for i in range(3)]
+        lines = []
+        for item in metrics:
+            lines.extend(exporter.format(item))
+        exporter.export_batch(metrics)
+        exporter.close()
+
+        datagrams = self._receive(exporter.packets_sent)
+        self.assertGreater(exporter.packets_sent, 1)
+        self.assertLess(exporter.packets_sent, len(lines))
+        self.assertTrue(all(len(datagram) <= 120 for datagram in datagrams))
+        self.assertEqual(b"\n".join(datagrams).split(b"\n"), lines)
+        self.assertEqual(exporter.bytes_sent, sum(len(datagram) for datagram in datagrams))
+
+    def test_oversized_line_and_missing_receiver(self):
+        """测试超长行单独发送，接收方不存在时不抛出异常"""
+        exporter = UDPExporter("127.0.0.1", self.port, packet_size=10)
+        exporter.send_lines([b"a" * 20, b"b", b"c"])
+        self.assertEqual(self._receive(2), [b"a" * 20, b"b\nc"])
+
+        self.receiver.close()
+        for _ in range(5):
+            exporter.export_single(make_metrics(0))
+        self.assertGreater(exporter.packets_sent + exporter.packets_dropped, 2)
+        exporter.close()
+
+
+@unittest.skipUnless(pq is not None, "需要安装pyarrow")
+class TestParquetExporter(unittest.TestCase):
+    """Parquet导出器测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.parquet")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_row_groups_and_nested_columns(self):
+        """测试按行数写入行组，核心为列表列、磁盘为映射列"""
+        exporter = ParquetExporter(self.path, row_group_rows=4, row_group_interval=3600)
+        exporter.export_batch([make_metrics(i) for i in range(10)])
+        self.assertEqual(exporter.pending_rows, 2)
+        exporter.close()
+
+        parquet = pq.ParquetFile(self.path)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        self.assertEqual(parquet.metadata.num_rows, 10)
+        rows = parquet.read().to_pylist()
+        self.assertEqual(rows[3]["cpu_per_core"], [5.0, 18.0])
+        self.assertEqual(dict(rows[3]["disk_usage"]), {"/": 40.0, "/data": 70.0})
+        self.assertEqual(rows[3]["top_processes"][0]["name"], "init")
+        self.assertEqual(rows[3]["timestamp"], make_metrics(3).timestamp)
+
+    def test_existing_file_not_overwritten(self):
+        """测试文件已存在时写入新的分片"""
+        first = ParquetExporter(self.path)
+        first.export_single(make_metrics(0))
+        first.close()
+        second = ParquetExporter(self.path)
+        second.export_single(make_metrics(1))
+        second.close()
+
+        self.assertEqual(second.filepath.name, "data.1.parquet")
+        self.assertEqual(pq.ParquetFile(self.path).metadata.num_rows, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
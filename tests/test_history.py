@@ -0,0 +1,81 @@
+"""
+历史缓冲区测试
+"""
+
+import unittest
+
+from system_monitor import SystemMonitor
+from system_monitor.history import MetricsHistory
+
+
+class TestMetricsHistory(unittest.TestCase):
+    """历史环形缓冲区测试"""
+
+    def setUp(self):
+        self.history = MetricsHistory(capacity=5)
+        for i in range(8):
+            self.history.append_values(100.0 + i, {
+                "cpu_percent": float(i * 10),
+                "network_sent_mb": float(i * 2),
+                "cpu_core_0": 1.0,
+            })
+
+    def test_capacity_is_fixed(self):
+        """测试容量固定，只保留最近的数据"""
+        self.assertEqual(len(self.history), 5)
+        data = self.history.window()
+        self.assertEqual(list(data["timestamp"]), [103.0, 104.0, 105.0, 106.0, 107.0])
+        self.assertEqual(list(data["cpu_percent"]), [30.0, 40.0, 50.0, 60.0, 70.0])
+        self.assertIn("cpu_core_0", self.history.columns)
+
+    def test_window_is_a_copy(self):
+        """测试返回的窗口数据不随之后的追加改变"""
+        history = MetricsHistory(capacity=5)
+        history.append_values(100.0, {"cpu_percent": 1.0})
+        data = history.window()
+        for i in range(1, 6):
+            history.append_values(100.0 + i, {"cpu_percent": 2.0})
+        self.assertEqual(list(data["timestamp"]), [100.0])
+        self.assertEqual(list(data["cpu_percent"]), [1.0])
+
+    def test_window_queries(self):
+        """测试时间窗口统计"""
+        self.assertEqual(list(self.history.window(seconds=2)["timestamp"]), [105.0, 106.0, 107.0])
+        self.assertEqual(list(self.history.window(last=2)["cpu_percent"]), [60.0, 70.0])
+        self.assertEqual(self.history.mean("cpu_percent", seconds=2), 60.0)
+        self.assertEqual(self.history.max("cpu_percent"), 70.0)
+        self.assertEqual(self.history.min("cpu_percent"), 30.0)
+        self.assertEqual(self.history.percentile("cpu_percent", 50), 50.0)
+        self.assertEqual(self.history.percentile("cpu_percent", 95, seconds=1), 69.5)
+
+    def test_rate_handles_counter_reset(self):
+        """测试计数器变化率及重置处理"""
+        self.assertEqual(self.history.rate("network_sent_mb"), 2.0)
+
+        self.history.append_values(108.0, {"network_sent_mb": 1.0})
+        # 14 -> 1 视为重置后增长了1
+        self.assertEqual(self.history.rate("network_sent_mb", seconds=1), 1.0)
+
+    def test_empty_history(self):
+        """测试空缓冲区"""
+        history = MetricsHistory(capacity=3)
+        self.assertIsNone(history.mean("cpu_percent"))
+        self.assertIsNone(history.rate("network_sent_mb"))
+
+        data = history.window(columns=["cpu_percent"])
+        self.assertEqual(len(data["cpu_percent"]), len(data["timestamp"]))
+        self.assertIsNot(data["cpu_percent"], data["timestamp"])
+
+    def test_monitor_keeps_history(self):
+        """测试监控器记录历史数据"""
+        monitor = SystemMonitor(history_size=10)
+        for _ in range(3):
+            monitor.get_metrics()
+
+        self.assertEqual(len(monitor.history), 3)
+        self.assertIsNotNone(monitor.history.mean("memory_percent"))
+        self.assertIsNone(SystemMonitor().history)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
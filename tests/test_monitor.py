@@ -6,6 +6,7 @@ import unittest
 import time
 from unittest.mock import patch, MagicMock
 from system_monitor import SystemMonitor, MonitorLevel
+from system_monitor.monitor import CADENCE_PROFILES
 
 
 class TestSystemMonitor(unittest.TestCase):
@@ -80,6 +81,34 @@ class TestSystemMonitor(unittest.TestCase):
         self.assertNotIn(dummy_callback, self.monitor.callbacks)
         self.assertEqual(len(self.monitor.callbacks), 0)
 
+    def test_cadence_reuses_cached_values(self):
+        """测试未到采样周期时复用缓存值"""
+        self.monitor.disk_collector.get_all_disk_usage = MagicMock(return_value={"/": 50.0})
+
+        first = self.monitor.get_metrics()
+        second = self.monitor.get_metrics()
+
+        self.assertEqual(self.monitor.disk_collector.get_all_disk_usage.call_count, 1)
+        self.assertEqual(second.disk_usage, {"/": 50.0})
+        self.assertEqual(first.ages["disk"], 0)
+        self.assertGreater(second.ages["disk"], 0)
+        self.assertEqual(second.ages["cpu"], 0)
+
+        self.monitor.get_metrics(force=True)
+        self.assertEqual(self.monitor.disk_collector.get_all_disk_usage.call_count, 2)
+
+    def test_cadence_override(self):
+        """测试覆盖采样周期"""
+        monitor = SystemMonitor(cadences={"disk": 0})
+        monitor.disk_collector.get_all_disk_usage = MagicMock(return_value={})
+
+        monitor.get_metrics()
+        monitor.get_metrics()
+        self.assertEqual(monitor.disk_collector.get_all_disk_usage.call_count, 2)
+
+        with self.assertRaises(ValueError):
+            SystemMonitor(cadences={"gpu": 1})
+
 
 class TestMonitorLevel(unittest.TestCase):
     """监控级别测试"""
@@ -90,6 +119,13 @@ class TestMonitorLevel(unittest.TestCase):
         self.assertEqual(MonitorLevel.STANDARD.value, "standard")
         self.assertEqual(MonitorLevel.ADVANCED.value, "advanced")
 
+    def test_level_cadence_profiles(self):
+        """测试监控级别对应的采样周期"""
+        for level in MonitorLevel:
+            self.assertEqual(SystemMonitor(level=level).cadences, CADENCE_PROFILES[level])
+        self.assertGreater(CADENCE_PROFILES[MonitorLevel.BASIC]["processes"],
+                           CADENCE_PROFILES[MonitorLevel.ADVANCED]["processes"])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+远程采集测试（只使用本机回环地址）
+"""
+
+import asyncio
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stderr
+from unittest.mock import patch
+
+from system_monitor.exporters.archive_exporter import BLOCK_HEADER, ArchiveReader, encode_rows
+from system_monitor.remote import AgentExporter, Aggregator, Spool, agent as agent_module
+from system_monitor.remote.protocol import (
+    ACK, FRAME_HEADER, SEQUENCE, encode_ack, encode_batch, encode_frame, encode_hello, parse_frame_header
+)
+from tests.test_exporters import make_metrics
+
+
+class AggregatorThread:
+    """在后台线程的事件循环中运行汇聚服务"""
+
+    def __init__(self, output_dir: str, port: int = 0):
+        self.aggregator = Aggregator(output_dir, "127.0.0.1", port)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.address = asyncio.run_coroutine_threadsafe(self.aggregator.start(), self.loop).result(5)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.aggregator.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+
+
+def block_files(directory: str):
+    return [name for name in os.listdir(directory) if name.endswith(agent_module.SPOOL_SUFFIX)]
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class TestSpool(unittest.TestCase):
+    """本地缓存测试"""
+
+    def test_disk_spool_survives_restart(self):
+        """测试缓存目录中的块在重启后仍可发送，确认后删除"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            spool = Spool(tmpdir)
+            first = spool.put(b"one")
+            second = spool.put(b"two")
+            self.assertGreater(second, first)
+
+            reopened = Spool(tmpdir)
+            self.assertEqual(reopened.pending(), [(first, b"one"), (second, b"two")])
+            self.assertGreater(reopened.put(b"three"), second)
+
+            reopened.ack(second)
+            self.assertEqual([block for _, block in reopened.pending()], [b"three"])
+            self.assertEqual(len(block_files(tmpdir)), 1)
+
+    def test_memory_spool_drops_oldest(self):
+        """测试超过上限时丢弃最旧的块"""
+        spool = Spool(max_batches=2)
+        for block in (b"a", b"b", b"c"):
+            spool.put(block)
+        self.assertEqual([block for _, block in spool.pending()], [b"b", b"c"])
+        self.assertEqual(spool.dropped, 1)
+
+    def test_agent_id_persisted(self):
+        """测试缓存目录中的代理标识在重启后不变，且不影响块的读取"""
+        with tempfile.TemporaryDirectory() as directory:
+            spool = Spool(directory)
+            spool.put(b"x")
+            restarted = Spool(directory)
+            self.assertEqual(restarted.agent_id, spool.agent_id)
+            self.assertEqual(len(restarted), 1)
+            self.assertNotEqual(Spool().agent_id, Spool().agent_id)
+
+    def test_sequence_independent_of_clock(self):
+        """测试序号不依赖系统时钟：时钟回拨后重启，序号仍然递增"""
+        with tempfile.TemporaryDirectory() as directory:
+            spool = Spool(directory)
+            first = spool.put(b"x")
+            spool.ack(first)
+            with patch.object(agent_module.time, "time", return_value=0.0):
+                restarted = Spool(directory)
+                self.assertGreater(restarted.put(b"y"), first)
+            self.assertEqual(Spool().put(b"z"), 1)
+
+    def test_pending_window(self):
+        """测试按块数和字节数限制一次读取的块"""
+        spool = Spool()
+        sequences = [spool.put(bytes(10)) for _ in range(5)]
+        self.assertEqual([seq for seq, _ in spool.pending(limit=2)], sequences[:2])
+        self.assertEqual([seq for seq, _ in spool.pending(sequences[1], max_bytes=15)], sequences[2:4])
+        self.assertEqual(len(spool.pending(max_bytes=1)), 1)
+
+
+class TestAgentAggregator(unittest.TestCase):
+    """代理与汇聚服务测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmpdir.name, "out")
+        self.server = AggregatorThread(self.output_dir)
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.stop()
+        self.tmpdir.cleanup()
+
+    def _records(self, hostname: str):
+        return list(ArchiveReader(os.path.join(self.output_dir, f"{hostname}.smz")).iter_records())
+
+    def test_stream_batches(self):
+        """测试批量推送并按主机写入归档"""
+        metrics = [make_metrics(i) for i in range(25)]
+        agent = AgentExporter(*self.server.address, hostname="node/1", batch_size=10, flush_interval=3600)
+        agent.export_batch(metrics)
+        agent.close()
+
+        self.assertEqual(len(agent.spool), 0)
+        records = self._records("node_1")
+        self.assertEqual([values for _, values in records], [item.flatten() for item in metrics])
+        stats = self.server.aggregator.stats
+        self.assertEqual((stats.batches, stats.samples), (3, 25))
+
+    def test_reconnect_with_spool(self):
+        """测试汇聚服务不可用时缓存到本地，恢复后重发"""
+        address = self.server.address
+        self.server.stop()
+        self.server = None
+
+        spool_dir = os.path.join(self.tmpdir.name, "spool")
+        agent = AgentExporter(*address, hostname="node", batch_size=5, spool_dir=spool_dir,
+                              reconnect_min=0.05, reconnect_max=0.1)
+        agent.export_batch([make_metrics(i) for i in range(10)])
+        self.assertEqual(len(block_files(spool_dir)), 2)
+
+        self.server = AggregatorThread(self.output_dir, address[1])
+        self.assertTrue(wait_until(lambda: len(agent.spool) == 0))
+        agent.close()
+        self.assertEqual(len(self._records("node")), 10)
+        self.assertEqual(block_files(spool_dir), [])
+
+    def test_large_backlog_sent_in_windows(self):
+        """测试积压的大量批次分多轮发送并全部确认"""
+        address = self.server.address
+        self.server.stop()
+        self.server = None
+
+        agent = AgentExporter(*address, hostname="backlog", batch_size=1, reconnect_min=0.05, reconnect_max=0.1)
+        agent.export_batch([make_metrics(i) for i in range(300)])
+        self.assertEqual(len(agent.spool), 300)
+
+        original = agent_module.SEND_WINDOW_BATCHES
+        agent_module.SEND_WINDOW_BATCHES = 16
+        try:
+            self.server = AggregatorThread(self.output_dir, address[1])
+            self.assertTrue(wait_until(lambda: len(agent.spool) == 0, timeout=10))
+        finally:
+            agent_module.SEND_WINDOW_BATCHES = original
+        agent.close()
+        self.assertEqual(len(self._records("backlog")), 300)
+        self.assertEqual(self.server.aggregator.stats.duplicates, 0)
+
+    def test_malformed_ack_reconnects(self):
+        """测试收到格式错误的确认帧时发送线程不退出，断开后重连"""
+        listener = socket.create_server(("127.0.0.1", 0))
+        connections = []
+
+        def serve():
+            while len(connections) < 3:
+                try:
+                    conn, _ = listener.accept()
+                except OSError:
+                    return
+                connections.append(conn)
+                conn.recv(65536)
+                conn.sendall(b"XX" + bytes(FRAME_HEADER.size))
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        agent = AgentExporter(*listener.getsockname(), hostname="bad-ack", batch_size=1,
+                              reconnect_min=0.02, reconnect_max=0.05)
+        try:
+            with redirect_stderr(io.StringIO()):
+                agent.export_single(make_metrics(0))
+                self.assertTrue(wait_until(lambda: agent.connections >= 3))
+            self.assertTrue(agent._thread.is_alive())
+            self.assertGreaterEqual(agent.errors, 2)
+            self.assertEqual(len(agent.spool), 1)
+        finally:
+            agent.close(timeout=0)
+            listener.close()
+            for conn in connections:
+                conn.close()
+
+    def test_duplicates_and_bad_frames(self):
+        """测试重发的块只确认不写入，错误的帧断开连接"""
+        block = encode_rows([1000.0, 1001.0], [{"cpu_percent": 1.0}, {"cpu_percent": 2.0}])
+        with socket.create_connection(self.server.address, timeout=5) as sock:
+            sock.sendall(encode_hello("dup") + encode_batch(7, block) + encode_batch(7, block))
+            acks = []
+            buffer = b""
+            while len(acks) < 2:
+                buffer += sock.recv(1024)
+                while len(buffer) >= FRAME_HEADER.size + SEQUENCE.size:
+                    frame_type, length = parse_frame_header(buffer[:FRAME_HEADER.size])
+                    self.assertEqual(frame_type, ACK)
+                    acks.append(SEQUENCE.unpack(buffer[FRAME_HEADER.size:FRAME_HEADER.size + length])[0])
+                    buffer = buffer[FRAME_HEADER.size + length:]
+        self.assertEqual(acks, [7, 7])
+        self.assertEqual(len(self._records("dup")), 2)
+        self.assertEqual(self.server.aggregator.stats.duplicates, 1)
+
+        with socket.create_connection(self.server.address, timeout=5) as sock:
+            sock.sendall(encode_hello("bad") + encode_frame(2, b"\x01" * 4))
+            self.assertEqual(sock.recv(1024), b"")
+        self.assertTrue(wait_until(lambda: self.server.aggregator.stats.rejected == 1))
+
+    def test_corrupt_block_rejected(self):
+        """测试块头正确但数据被截断的块不写入文件，但仍被确认且连接保持"""
+        block = encode_rows([1000.0 + i for i in range(50)], [{"cpu_percent": float(i)} for i in range(50)])
+        magic, start, end, rows, length = BLOCK_HEADER.unpack_from(block)
+        payload = block[BLOCK_HEADER.size:BLOCK_HEADER.size + length // 2]
+        truncated = BLOCK_HEADER.pack(magic, start, end, rows, len(payload)) + payload
+        with socket.create_connection(self.server.address, timeout=5) as sock:
+            sock.sendall(encode_hello("corrupt") + encode_batch(1, truncated))
+            self.assertEqual(recv_exactly(sock, FRAME_HEADER.size + SEQUENCE.size), encode_ack(1))
+            # 确认后连接仍可继续发送
+            sock.sendall(encode_batch(2, block))
+            self.assertEqual(recv_exactly(sock, FRAME_HEADER.size + SEQUENCE.size), encode_ack(2))
+        self.assertEqual(self.server.aggregator.stats.rejected, 1)
+        self.assertEqual(len(self._records("corrupt")), 50)
+
+    def test_same_hostname_different_agents(self):
+        """测试同名主机的两个代理按各自的序号去重，数据都被写入"""
+        first = encode_rows([1000.0], [{"cpu_percent": 1.0}])
+        second = encode_rows([2000.0], [{"cpu_percent": 2.0}])
+        for agent_id, block in (("a" * 32, first), ("b" * 32, second)):
+            with socket.create_connection(self.server.address, timeout=5) as sock:
+                sock.sendall(encode_hello("shared", agent_id) + encode_batch(5, block))
+                self.assertEqual(len(sock.recv(1024)), FRAME_HEADER.size + SEQUENCE.size)
+        self.assertEqual([values["cpu_percent"] for _, values in self._records("shared")], [1.0, 2.0])
+        self.assertEqual(self.server.aggregator.stats.duplicates, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+调度器测试
+"""
+
+import threading
+import time
+import unittest
+
+from system_monitor.scheduler import DeadlineScheduler, OverrunPolicy
+
+
+class FakeClock:
+    """可控制的时钟"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    """截止时间调度器测试"""
+
+    def test_deadlines_do_not_drift(self):
+        """测试采样点不随执行耗时漂移"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(1.0, clock=clock)
+
+        self.assertEqual(scheduler.next_deadline(), 100.0)
+        clock.now = 100.3  # 模拟采集耗时
+        self.assertEqual(scheduler.next_deadline(), 101.0)
+        clock.now = 101.9
+        self.assertEqual(scheduler.next_deadline(), 102.0)
+        self.assertEqual(scheduler.stats.overruns, 0)
+
+    def test_skip_overrun(self):
+        """测试跳过超时的采样点"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(1.0, clock=clock)
+        scheduler.next_deadline()
+
+        clock.now = 103.5
+        self.assertEqual(scheduler.next_deadline(), 104.0)
+        self.assertEqual(scheduler.stats.overruns, 1)
+        self.assertEqual(scheduler.stats.skipped, 3)
+
+    def test_coalesce_overrun(self):
+        """测试合并超时的采样点"""
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(1.0, overrun_policy=OverrunPolicy.COALESCE, clock=clock)
+        scheduler.next_deadline()
+
+        clock.now = 103.5
+        self.assertEqual(scheduler.next_deadline(), 103.0)
+        self.assertEqual(scheduler.next_deadline(), 104.0)
+        self.assertEqual(scheduler.stats.overruns, 1)
+        self.assertEqual(scheduler.stats.skipped, 2)
+
+    def test_wait_stops_on_event(self):
+        """测试停止事件立即中断等待"""
+        scheduler = DeadlineScheduler(10.0)
+        stop_event = threading.Event()
+
+        self.assertTrue(scheduler.wait(stop_event))
+        stop_event.set()
+        start = time.monotonic()
+        self.assertFalse(scheduler.wait(stop_event))
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(scheduler.stats.ticks, 1)
+
+    def test_align_to_wall_clock(self):
+        """测试对齐到墙上时钟"""
+        scheduler = DeadlineScheduler(0.05, align_to_wall_clock=True)
+        scheduler.wait()
+
+        offset = time.time() % 0.05
+        self.assertLess(min(offset, 0.05 - offset), 0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+流式统计测试
+"""
+
+import random
+import statistics
+import unittest
+
+from system_monitor.utils import P2Quantile, QuantileSketch, RunningStats
+
+
+class TestRunningStats(unittest.TestCase):
+    """流式统计测试"""
+
+    def test_matches_statistics_and_merges(self):
+        """测试结果与statistics一致且可合并"""
+        values = [random.uniform(0, 100) for _ in range(1000)]
+        first, second = RunningStats(), RunningStats()
+        for value in values[:300]:
+            first.add(value)
+        for value in values[300:]:
+            second.add(value)
+        first.merge(second)
+
+        self.assertEqual(first.count, 1000)
+        self.assertAlmostEqual(first.mean, statistics.mean(values))
+        self.assertAlmostEqual(first.stddev, statistics.pstdev(values))
+        self.assertEqual((first.min, first.max), (min(values), max(values)))
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """分位数草图测试"""
+
+    def test_relative_accuracy(self):
+        """测试分位数相对误差"""
+        values = [random.uniform(1, 100) for _ in range(5000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            expected = ordered[int(q * (len(ordered) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q), expected, delta=expected * 0.02)
+
+    def test_merge_and_serialize(self):
+        """测试合并与序列化"""
+        first, second = QuantileSketch(), QuantileSketch()
+        for value in range(0, 50):
+            first.add(float(value))
+        for value in range(50, 100):
+            second.add(float(value))
+        first.merge(QuantileSketch.from_dict(second.to_dict()))
+
+        self.assertEqual(first.count, 100)
+        self.assertAlmostEqual(first.quantile(0.5), 49.5, delta=1.0)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+
+
+class TestP2Quantile(unittest.TestCase):
+    """P²分位数估计测试"""
+
+    def test_estimate(self):
+        """测试大样本下的估计误差"""
+        values = [random.gauss(50, 10) for _ in range(20000)]
+        estimators = {q: P2Quantile(q) for q in (0.5, 0.95, 0.99)}
+        for value in values:
+            for estimator in estimators.values():
+                estimator.add(value)
+
+        ordered = sorted(values)
+        for q, estimator in estimators.items():
+            self.assertAlmostEqual(estimator.value(), ordered[int(q * len(ordered))], delta=1.0)
+
+    def test_few_values(self):
+        """测试少于5个值时直接取排序结果"""
+        estimator = P2Quantile(0.5)
+        self.assertIsNone(estimator.value())
+        for value in (3.0, 1.0, 2.0):
+            estimator.add(value)
+        self.assertEqual(estimator.value(), 2.0)
+        with self.assertRaises(ValueError):
+            P2Quantile(1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+存储测试
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from system_monitor.exporters import ArchiveExporter, CSVExporter, JSONExporter
+from system_monitor.storage import (
+    ColumnarStore, RollupPipeline, RollupTier, find_recordings, fleet_query, is_columnar_store,
+    iter_records, summarize
+)
+from system_monitor.cli import stats_command
+from system_monitor.storage import reader
+from tests.test_exporters import make_metrics
+
+
+class TestColumnarStore(unittest.TestCase):
+    """列式存储测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "data.smc")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_append_and_read_range(self):
+        """测试追加并按时间范围读取"""
+        with ColumnarStore(self.path, chunk_rows=4) as store:
+            for i in range(10):
+                store.append(1000.0 + i, {"cpu_percent": float(i), "network_connections": i})
+
+            data = store.read_range(1003, 1006)
+            self.assertEqual(list(data["timestamp"]), [1003.0, 1004.0, 1005.0, 1006.0])
+            self.assertEqual(list(data["cpu_percent"]), [3.0, 4.0, 5.0, 6.0])
+            self.assertEqual(list(data["network_connections"]), [3, 4, 5, 6])
+            del data
+
+        self.assertTrue(is_columnar_store(self.path))
+
+    def test_new_column_backfilled(self):
+        """测试中途新增的列以缺失值补齐"""
+        with ColumnarStore(self.path, chunk_rows=4) as store:
+            store.export_single(make_metrics(0))
+            metrics = make_metrics(1)
+            metrics.disk_usage["/mnt/usb"] = 5.0
+            store.export_single(metrics)
+
+            column = list(store.read_range(columns=["disk:/mnt/usb"])["disk:/mnt/usb"])
+            self.assertTrue(math.isnan(column[0]))
+            self.assertEqual(column[1], 5.0)
+
+            records = list(store.iter_records())
+            self.assertNotIn("disk:/mnt/usb", records[0][1])
+            self.assertEqual(records[1][1]["cpu_core_1"], 16.0)
+
+    def test_reader_sees_writer_appends(self):
+        """测试只读方能读到写入方后续追加的数据"""
+        writer = ColumnarStore(self.path, chunk_rows=2)
+        writer.append(1.0, {"cpu_percent": 1.0})
+        reader = ColumnarStore(self.path, mode="r")
+        self.assertEqual(reader.rows, 1)
+
+        for i in range(2, 6):
+            writer.append(float(i), {"cpu_percent": float(i), "memory_percent": 50.0})
+        data = reader.read_range(start=4.0)
+        self.assertEqual(list(data["cpu_percent"]), [4.0, 5.0])
+        self.assertEqual(list(data["memory_percent"]), [50.0, 50.0])
+        del data
+
+        # 写入方与只读方返回的视图都不能修改
+        for store in (writer, reader):
+            view = store._column("cpu_percent").view(2)
+            self.assertTrue(view.readonly)
+            self.assertEqual(list(view), [1.0, 2.0])
+            del view
+
+        reader.close()
+        writer.close()
+        with self.assertRaises(FileNotFoundError):
+            ColumnarStore(os.path.join(self.tmpdir.name, "missing"), mode="r")
+
+
+class TestRollup(unittest.TestCase):
+    """多分辨率汇总测试"""
+
+    def test_tier_buckets(self):
+        """测试时间桶汇总"""
+        tier = RollupTier(resolution=10, retention=100)
+        for i in range(25):
+            tier.add(1000.0 + i, {"cpu_percent": float(i)})
+
+        points = tier.query("cpu_percent", 1000, 1030)
+        self.assertEqual([point.start for point in points], [1000.0, 1010.0, 1020.0])
+        self.assertEqual([point.count for point in points], [10, 10, 5])
+        self.assertEqual((points[1].min, points[1].max, points[1].mean), (10.0, 19.0, 14.5))
+        self.assertAlmostEqual(points[1].p95, 18.0, delta=0.2)
+
+    def test_retention_overwrites_old_buckets(self):
+        """测试超过保留时长的数据被覆盖"""
+        tier = RollupTier(resolution=10, retention=30)
+        for i in range(60):
+            tier.add(float(i), {"cpu_percent": 1.0})
+
+        points = tier.query("cpu_percent", 0, 60)
+        self.assertEqual([point.start for point in points], [30.0, 40.0, 50.0])
+        self.assertTrue(tier.covers(30))
+        self.assertFalse(tier.covers(20))
+
+    def test_arrays_grow_on_write(self):
+        """测试数组随写入增长，只增长到各指标最后写入的槽位"""
+        tier = RollupTier(resolution=1, retention=3600)
+        self.assertEqual(tier.nbytes, 0)
+        for i in range(10):
+            tier.add(1000.0 + i, {"cpu_percent": 1.0, "memory_percent": 2.0})
+        tier.add(1010.0, {"rare": 3.0})
+        tier.add(1011.0, {"cpu_percent": 1.0})
+
+        # 11个已完成的时间桶；前两个指标在最后一个桶没有数据，只增长到第10个槽位
+        self.assertEqual(tier.nbytes, 8 * (11 + 5 * (10 + 10 + 11)))
+        self.assertEqual([point.count for point in tier.query("rare", 1000, 1011)], [1])
+        self.assertEqual(len(tier.query("cpu_percent", 1000, 1011)), 11)
+
+    def test_default_tiers_month_footprint(self):
+        """测试默认层级写满一个月后每个指标约占120KB"""
+        pipeline = RollupPipeline()
+        values = {f"metric_{i}": float(i) for i in range(8)}
+        timestamp = 0.0
+        for step, count in ((3600, 31 * 24), (60, 24 * 60), (1, 1000)):
+            for _ in range(count):
+                pipeline.add(timestamp, values)
+                timestamp += step
+
+        self.assertEqual([len(tier._starts) for tier in pipeline.tiers], [tier.capacity for tier in pipeline.tiers])
+        self.assertLessEqual(pipeline.nbytes, len(values) * 128 * 1024)
+
+    def test_pipeline_selects_finest_covering_tier(self):
+        """测试查询选择覆盖时间范围的最细层级"""
+        pipeline = RollupPipeline(tiers=[(1, 60), (60, 3600), (3600, 86400)])
+        for i in range(0, 7200, 5):
+            pipeline.add(float(i), {"memory_percent": 50.0})
+
+        self.assertEqual(pipeline.select_tier(7180).resolution, 1)
+        self.assertEqual(pipeline.select_tier(6000).resolution, 60)
+        self.assertEqual(pipeline.select_tier(0).resolution, 3600)
+
+        points = pipeline.query("memory_percent", 0, 7200)
+        self.assertEqual([point.count for point in points], [720, 720])
+
+    def test_save_and_load(self):
+        """测试保存与加载"""
+        pipeline = RollupPipeline(tiers=[(60, 3600)])
+        pipeline.export_batch([make_metrics(i) for i in range(90)])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "rollup.json")
+            pipeline.save(path)
+            loaded = RollupPipeline.load(path)
+
+        start = make_metrics(0).timestamp.timestamp()
+        expected = pipeline.query("cpu_percent", start, start + 90)
+        self.assertEqual(loaded.query("cpu_percent", start, start + 90), expected)
+        self.assertEqual(sum(point.count for point in expected), 90)
+
+
+class TestRecordReader(unittest.TestCase):
+    """多格式流式读取测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.metrics = [make_metrics(i) for i in range(20)]
+        self.start = self.metrics[0].timestamp.timestamp()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmpdir.name, name)
+
+    def _write(self, name: str) -> str:
+        path = self._path(name)
+        if name.endswith(".csv"):
+            exporter = CSVExporter(path, schema="wide")
+        elif name.endswith(".smz"):
+            exporter = ArchiveExporter(path)
+        elif name.endswith(".smc"):
+            exporter = ColumnarStore(path)
+        else:
+            exporter = JSONExporter(path, max_records=0)
+        exporter.export_batch(self.metrics)
+        if hasattr(exporter, "close"):
+            exporter.close()
+        return path
+
+    def test_formats_agree(self):
+        """测试各格式读取出相同的指标"""
+        expected = [(m.timestamp.timestamp(), m.flatten()) for m in self.metrics]
+        for name in ("data.csv", "data.json", "data.ndjson", "data.smc", "data.smz"):
+            with self.subTest(name=name):
+                records = [(timestamp, dict(values)) for timestamp, values in iter_records(self._write(name))]
+                self.assertEqual(records, expected)
+
+    def test_json_document_streamed_in_chunks(self):
+        """测试JSON文档跨读取块边界时逐条解析"""
+        path = self._write("data.json")
+        original = reader._JSON_CHUNK
+        reader._JSON_CHUNK = 7
+        try:
+            records = list(iter_records(path))
+        finally:
+            reader._JSON_CHUNK = original
+        self.assertEqual(len(records), 20)
+        self.assertEqual(records[-1][1]["cpu_percent"], 29.0)
+
+    def test_time_filter(self):
+        """测试起止时间过滤"""
+        for name in ("data.csv", "data.smc", "data.smz"):
+            with self.subTest(name=name):
+                records = list(iter_records(self._write(name), self.start + 5, self.start + 9))
+                self.assertEqual([timestamp - self.start for timestamp, _ in records], [5, 6, 7, 8, 9])
+
+    def test_summarize(self):
+        """测试单遍统计所有指标"""
+        count, bounds, summaries = summarize(iter_records(self._write("data.ndjson")))
+
+        self.assertEqual(count, 20)
+        self.assertEqual(bounds, (self.start, self.start + 19))
+        cpu = summaries["cpu_percent"].to_dict()
+        self.assertEqual((cpu["min"], cpu["max"]), (10.0, 29.0))
+        self.assertAlmostEqual(cpu["mean"], 19.5)
+        self.assertAlmostEqual(cpu["p50"], 19.5, delta=1.0)
+        self.assertEqual(summaries["disk:/data"].to_dict()["stddev"], 0.0)
+        self.assertIn("cpu_core_1", summaries)
+
+    def test_reading_has_no_side_effects(self):
+        """测试读取不存在的记录时不创建文件"""
+        path = self._path("missing.csv")
+        self.assertEqual(list(iter_records(path)), [])
+        self.assertFalse(os.path.exists(path))
+
+    def test_json_items_keep_original_format(self):
+        """测试按原格式读取JSON记录，支持时间过滤"""
+        path = self._write("data.ndjson")
+        self.assertEqual(list(reader.iter_json_items(path)), JSONExporter(path).load_data())
+        items = list(reader.iter_json_items(path, self.start + 18))
+        self.assertEqual([item["cpu"]["total_percent"] for item in items], [28.0, 29.0])
+
+    def test_stats_command_output(self):
+        """测试stats默认输出与原先相同的JSON文档，--ndjson逐行输出展开的记录"""
+        path = self._write("data.json")
+        args = argparse.Namespace(file=path, summary=False, ndjson=False, start=None, end=None)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            stats_command(args)
+        self.assertEqual(output.getvalue(),
+                         json.dumps(JSONExporter(path).load_data(), indent=2, ensure_ascii=False) + "\n")
+
+        args.ndjson = True
+        output = io.StringIO()
+        with redirect_stdout(output):
+            stats_command(args)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 20)
+        self.assertEqual(json.loads(lines[0])["cpu_percent"], 10.0)
+
+    def test_unsupported_format(self):
+        """测试不支持的格式"""
+        with self.assertRaises(ValueError):
+            list(iter_records(self._path("data.txt")))
+
+
+class TestFleetQuery(unittest.TestCase):
+    """多主机并行查询测试"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = self.tmpdir.name
+        # 第n个主机的cpu_percent为10n + 0..9
+        for host in range(4):
+            metrics = [make_metrics(i) for i in range(10)]
+            for item in metrics:
+                item.cpu_percent += 10 * host - 10
+            exporter = ArchiveExporter(os.path.join(self.directory, f"node{host}.smz"), block_rows=4)
+            exporter.export_batch(metrics)
+            exporter.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_find_recordings(self):
+        """测试按文件名识别主机，CSV分段不单独作为主机"""
+        CSVExporter(os.path.join(self.directory, "web.csv"))
+        open(os.path.join(self.directory, "web.v2.csv"), "w").close()
+        open(os.path.join(self.directory, "notes.txt"), "w").close()
+
+        hosts = [host for host, _ in find_recordings(self.directory)]
+        self.assertEqual(hosts, ["node0", "node1", "node2", "node3", "web"])
+
+    def test_parallel_matches_serial(self):
+        """测试多进程扫描与单进程扫描结果一致"""
+        serial = fleet_query(self.directory, workers=1)
+        parallel = fleet_query(self.directory, workers=2)
+
+        for result in (serial, parallel):
+            self.assertEqual(sorted(result.hosts), ["node0", "node1", "node2", "node3"])
+            cpu = result.fleet["cpu_percent"]
+            self.assertEqual(cpu.stats.count, 40)
+            self.assertEqual((cpu.value("min"), cpu.value("max")), (0.0, 39.0))
+            self.assertAlmostEqual(cpu.value("mean"), 19.5)
+            self.assertAlmostEqual(cpu.value("p95"), 37.0, delta=0.5)
+        self.assertEqual(serial.rank("cpu_percent", "p95"), parallel.rank("cpu_percent", "p95"))
+
+    def test_rank_and_time_range(self):
+        """测试按统计量排序和时间范围过滤"""
+        start = make_metrics(0).timestamp.timestamp()
+        result = fleet_query(self.directory, start + 5, start + 9, metrics=["cpu_percent"], workers=1)
+
+        ranked = result.rank("cpu_percent", "max", top=2)
+        self.assertEqual(ranked, [("node3", 39.0), ("node2", 29.0)])
+        self.assertEqual(result.rank("cpu_percent", "last", ascending=True)[0], ("node0", 9.0))
+        self.assertEqual(result.hosts["node1"].count, 5)
+        self.assertEqual(set(result.fleet), {"cpu_percent"})
+        with self.assertRaises(ValueError):
+            result.rank("cpu_percent", "median")
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
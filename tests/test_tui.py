@@ -0,0 +1,163 @@
+"""
+终端界面测试
+"""
+
+import curses
+import math
+import time
+import unittest
+from unittest.mock import patch
+
+from system_monitor.history import MetricsHistory
+from system_monitor.tui import FrameDiff, TopView, display_width, fit, rates, render_frame, sparkline
+from tests.test_exporters import make_metrics
+
+
+class FakeScreen:
+    """记录写入内容的假终端"""
+
+    def __init__(self, height: int = 40, width: int = 100):
+        self.size = (height, width)
+        self.writes = []
+
+    def getmaxyx(self):
+        return self.size
+
+    def move(self, row, col):
+        pass
+
+    def clrtoeol(self):
+        pass
+
+    def addstr(self, row, col, text):
+        self.writes.append((row, text))
+
+    def noutrefresh(self):
+        pass
+
+
+class ScriptedScreen(FakeScreen):
+    """按顺序返回预设按键的假终端，没有按键时按timeout()等待"""
+
+    def __init__(self, keys, height: int = 40, width: int = 100):
+        super().__init__(height, width)
+        self.keys = list(keys)
+        self.delay = -1
+        self.timeouts = []
+
+    def keypad(self, flag):
+        pass
+
+    def erase(self):
+        pass
+
+    def timeout(self, delay):
+        self.delay = delay
+        self.timeouts.append(delay)
+
+    def getch(self):
+        if self.keys:
+            key = self.keys.pop(0)
+            if key == curses.KEY_RESIZE:
+                self.size = (20, 60)
+            return key
+        time.sleep(self.delay / 1000)
+        return -1
+
+
+class TestTUIHelpers(unittest.TestCase):
+    """界面辅助函数测试"""
+
+    def test_sparkline(self):
+        """测试走势图字符映射"""
+        self.assertEqual(sparkline([0, 50, 100, math.nan], 10), "▁▅█ ")
+        self.assertEqual(sparkline([1, 2, 3, 4, 5], 3), "▁▁▁")
+        self.assertEqual(sparkline([1, 2, 3], 3, None, None), "▁▅█")
+        self.assertEqual(sparkline([], 5), "")
+
+    def test_display_width(self):
+        """测试按显示宽度截断中文"""
+        self.assertEqual(display_width("内存ab"), 6)
+        self.assertEqual(fit("内存ab", 3), "内")
+        self.assertEqual(fit("abc", 5), "abc")
+
+    def test_rates(self):
+        """测试计数器变化率与重置"""
+        self.assertEqual(rates([0, 1, 3, 4], [10, 12, 16, 1]), [2.0, 2.0, 1.0])
+
+    def test_frame_diff(self):
+        """测试只返回变化的行"""
+        diff = FrameDiff()
+        self.assertEqual(diff.changes(["a", "b"]), [(0, "a"), (1, "b")])
+        self.assertEqual(diff.changes(["a", "c"]), [(1, "c")])
+        diff.reset()
+        self.assertEqual(len(diff.changes(["a", "c"])), 2)
+
+
+class TestTopView(unittest.TestCase):
+    """全屏界面绘制测试"""
+
+    def setUp(self):
+        self.history = MetricsHistory(100)
+        for index in range(10):
+            self.history.append(make_metrics(index))
+
+    def test_render_frame(self):
+        """测试画面内容与尺寸"""
+        lines = render_frame(make_metrics(9), self.history, 80, 30)
+        self.assertEqual(len(lines), 30)
+        self.assertTrue(all(display_width(line) <= 79 for line in lines))
+        text = "\n".join(lines)
+        self.assertIn("19.0%", text)
+        self.assertIn("/data 70.0%", text)
+        self.assertIn("1.00MB/s", text)
+        self.assertIn("init", text)
+        self.assertEqual(len(render_frame(make_metrics(9), self.history, 80, 5)), 5)
+
+    def test_draw_only_changed_rows(self):
+        """测试第二帧只重绘变化的行"""
+        monitor = type("Monitor", (), {"history": self.history})()
+        view = TopView(monitor, interval=0.1, refresh_interval=0.5)
+
+        screen = FakeScreen()
+        view.draw(screen, make_metrics(9))
+        first = len(screen.writes)
+        self.assertEqual(first, 40)
+
+        screen.writes.clear()
+        view.draw(screen, make_metrics(9))
+        self.assertEqual(screen.writes, [])
+
+        metrics = make_metrics(9)
+        metrics.network_connections = 99
+        view.draw(screen, metrics)
+        self.assertEqual(len(screen.writes), 1)
+        self.assertIn("99", screen.writes[0][1])
+        self.assertEqual(view.frames, 3)
+
+    def test_keys_handled_between_samples(self):
+        """测试两次采样之间立即响应退出和终端尺寸变化"""
+        samples = []
+
+        def get_metrics():
+            samples.append(1)
+            return make_metrics(9)
+
+        monitor = type("Monitor", (), {"history": self.history, "get_metrics": staticmethod(get_metrics)})()
+        view = TopView(monitor, interval=10.0, refresh_interval=10.0)
+        screen = ScriptedScreen([curses.KEY_RESIZE, ord("q")])
+
+        start = time.monotonic()
+        with patch("curses.curs_set"), patch("curses.doupdate"):
+            view.run(screen)
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(len(samples), 1)
+        # 尺寸变化后按新的尺寸重绘
+        self.assertEqual(view.frames, 2)
+        self.assertEqual(len(screen.writes), 40 + 20)
+        self.assertTrue(all(0 < delay <= 100 for delay in screen.timeouts))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file